@@ -3,23 +3,162 @@
 # [ÄNDERUNG] sep="\t" statt "\\t" (verhindert ParserWarning).
 # [ÄNDERUNG] _flush_graph() führt IMMER einen harten Reset durch (kein langsames graph.remove mehr).
 # [ÄNDERUNG] Preview stark reduziert und sofort freigegeben.
-
-from rdflib import Dataset, URIRef, Namespace, Literal, XSD, RDFS, RDF
-from iribaker import to_iri
+# [ÄNDERUNG] Checkpoint nach jedem Chunk, mit --resume wird nach einem Abbruch fortgesetzt.
+# [ÄNDERUNG] OUT_SHARDS: direkt rollierende .nt.gz-Shards + Manifest, rdf_zip_and_split.py entfällt.
+# [ÄNDERUNG] OUT_TERMS: Term-Wörterbuch + Integer-Tripel statt Text (Export mit rdf_terms.py).
+# [ÄNDERUNG] Messung pro Stufe (rdf_metrics): JSON-Bericht, optional Prometheus-Datei und --profile.
+# [ÄNDERUNG] Statistik-Graph (rdf_stats): Aggregate der Notebook-Abfragen als N-Quads neben der Ausgabe.
+# [ÄNDERUNG] OUT_TURTLE: echtes Turtle (Präfixe, nach Subjekt gruppiert) statt N-Triples mit ungenutztem @prefix-Kopf.
+# [ÄNDERUNG] MERGE_TITLES: alle title.*-Tabellen in einem Durchlauf (Merge-Join nach tconst, rdf_merge).
+# [ÄNDERUNG] INTEGRITY: Verweise auf nicht angelegte Titel/Personen zählen oder entfernen (rdf_integrity).
+# [ÄNDERUNG] Parquet-Kopie (rdf_parquet.py einmalig aufrufen): wird statt der .tsv.gz gelesen, solange sie aktuell ist.
+
+from rdflib import Dataset, Graph, Namespace, Literal, XSD, RDFS, RDF
 import pandas as pd
 import re
 from os import listdir
 from os.path import isfile, join
 from tqdm import tqdm
+import argparse
 import gc
+import os
+import sys
+import time
+
+# Gemeinsame Module liegen eine Ebene höher in scripts/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from rdf_checkpoint import Checkpoint
+from rdf_emit import emit_chunk
+from rdf_integrity import Integrity, declare_tsv
+from rdf_iri import iris
+from rdf_literals import lits
+from rdf_merge import TITLE_TABLES, emit_titles, merge_blocks
+from rdf_metrics import Metrics, PredicateSink
+from rdf_reader import iter_blocks, read_block, staged_source
+from rdf_shards import ShardedWriter
+from rdf_stats import DatasetStats, scan
+from rdf_terms import TermStore
+from rdf_writer import NTriplesWriter, TurtleWriter
 
 # Namespaces
 RES = Namespace('http://example.org/imdb/resource/')
 IMD = Namespace('http://example.org/imdb#')
 
+# Pfad zu den IMDb-Daten
+IMDB_PATH = "../uncutted files"
+
+# Streaming-Ziel und Flush-Schwelle
+OUT_TTL = 'imdb_transformed.ttl'
+FLUSH_TRIPLES = 200_000
+
+# "vectorized" = spaltenweise N-Triples aus rdf_emit, "rows" = bisheriger iterrows-Pfad
+EMIT_MODE = "vectorized"
+
+# True: title.* gemeinsam nach tconst lesen, Tripel titelweise zusammenhängend (nur "vectorized")
+MERGE_TITLES = False
+
+# "stream" = Tripel je Chunk ohne Duplikate direkt in den gepufferten Writer, "graph" = rdflib-Dataset pro Flush (alt)
+SINK = "stream"
+OUT_GZIP = False  # True: gzip-komprimiertes N-Triples ohne @prefix-Kopf
+
+# True: kompaktes Turtle (Präfixe, ein Subjekt je Aussage mit ;/,-Listen), nur ohne Shards/Terms
+OUT_TURTLE = False
+
+if OUT_GZIP:
+    OUT_TTL = 'imdb_transformed.ttl.gz' if OUT_TURTLE else 'imdb_transformed.nt.gz'
+
+# True: statt einer Datei rollierende Shards imdb_shard_NNNN.nt.gz mit Manifest
+OUT_SHARDS = False
+SHARD_PREFIX = 'imdb_shard_'
+SHARD_MAX_TRIPLES = 5_000_000
+SHARD_MAX_BYTES = None  # z. B. 1 << 30 für höchstens ~1 GiB pro Shard
+
+if OUT_SHARDS:
+    OUT_GZIP = True
+    OUT_TTL = SHARD_PREFIX + 'manifest.json'
+
+# True: kompaktes Zwischenformat (rdf_terms.TermStore) in TERMS_DIR statt Text
+OUT_TERMS = False
+TERMS_DIR = 'imdb_terms'
+
+if OUT_TERMS:
+    OUT_TTL = TERMS_DIR
+CHECKPOINT_FILE = OUT_TTL + '.checkpoint.jsonl'
+CHUNKSIZE = 100_000
+
+# Laufbericht (Zeit pro Stufe, Zähler, RSS nach jedem Flush)
+REPORT_FILE = OUT_TTL + '.report.json'
+# Tripel pro Prädikat zählen (im Writer: ein Regex-Durchlauf je Text-Chunk bzw. je add() im rows-Pfad)
+COUNT_PREDICATES = True
+
+# Verweise ohne Ziel (knownFor, parentSeries, Rollen, ...): None, "report" = nur zählen, "drop" = entfernen
+INTEGRITY = None
+
+# Statistik-Graph (VoID, Ranglisten, Rollennamen) für die Dashboard-Abfragen
+STATS_FILE = OUT_TTL + '.stats.nq'
+
+parser = argparse.ArgumentParser(description="IMDb -> RDF, chunkweise")
+parser.add_argument("--resume", action="store_true",
+                    help="nach einem Abbruch ab dem letzten Checkpoint fortsetzen")
+parser.add_argument("--report", default=REPORT_FILE, help="JSON-Laufbericht")
+parser.add_argument("--prometheus", default=None,
+                    help="Metriken im Prometheus-Textformat (nach jedem Chunk aktualisiert)")
+parser.add_argument("--profile", action="store_true",
+                    help="cProfile + tracemalloc pro Tabelle (.prof-Dateien neben dem Bericht)")
+parser.add_argument("--stats", default=STATS_FILE, help="Statistik-Graph als N-Quads ('' = keiner)")
+# Überschreiben die Parameter oben (z. B. für rdf_benchmark, das alle Varianten misst)
+parser.add_argument("--path", default=IMDB_PATH, help="Ordner mit den .tsv.gz")
+parser.add_argument("--emit-mode", default=EMIT_MODE, choices=["vectorized", "rows"])
+parser.add_argument("--sink", default=SINK, choices=["stream", "graph"])
+parser.add_argument("--merge-titles", action="store_true", default=MERGE_TITLES)
+parser.add_argument("--chunksize", type=int, default=CHUNKSIZE)
+args = parser.parse_args()
+EMIT_MODE, SINK, MERGE_TITLES, CHUNKSIZE = args.emit_mode, args.sink, args.merge_titles, args.chunksize
+
+metrics = Metrics(profile=args.profile, profile_dir=args.report + '.prof' if args.profile else None)
+stats = DatasetStats()
+
+# Checkpoint laden; beim Fortsetzen die Ausgabe auf den letzten gesicherten Stand kürzen
+ckpt = Checkpoint(CHECKPOINT_FILE)
+if args.resume and ckpt.last():
+    shard, done_triples = ckpt.truncate_output()
+    if OUT_TERMS:
+        sink = TermStore(TERMS_DIR, resume=done_triples)
+    elif OUT_SHARDS:
+        sink = ShardedWriter(SHARD_PREFIX, SHARD_MAX_TRIPLES, SHARD_MAX_BYTES,
+                             resume=(shard, done_triples))
+    else:
+        writer = TurtleWriter if OUT_TURTLE else NTriplesWriter
+        sink = writer(OUT_TTL, compress=OUT_GZIP, mode='ab')
+        sink.triples = done_triples
+    last = ckpt.last()
+    print(f"[Info] Setze fort nach {last['table']} (Chunk {last.get('chunk', '-')}, {done_triples} Tripel)")
+else:
+    ckpt.reset()
+    if OUT_TERMS:
+        sink = TermStore(TERMS_DIR)
+    elif OUT_SHARDS:
+        sink = ShardedWriter(SHARD_PREFIX, SHARD_MAX_TRIPLES, SHARD_MAX_BYTES)
+    elif OUT_TURTLE:
+        sink = TurtleWriter(OUT_TTL, compress=OUT_GZIP)
+    else:
+        sink = NTriplesWriter(OUT_TTL, compress=OUT_GZIP)
+if COUNT_PREDICATES:
+    sink = PredicateSink(sink, metrics)
+
+# Tripel eines Chunks für SINK = "stream": Einfügereihenfolge, Duplikate nur einmal
+# (wie im rdflib-Store bzw. dict.fromkeys in rdf_emit)
+class _ChunkTriples(dict):
+    def add(self, triple):
+        self[triple] = None
+
 # Hilfsfunktion: neuen Graph/Dataset erzeugen und Namespaces binden
 def _new_graph():
     global dataset, graph
+    if SINK == "stream":
+        # graph.add() im rows-Pfad sammelt nur, _flush_graph() schreibt in den Writer
+        dataset, graph = None, _ChunkTriples()
+        return
     dataset = Dataset()
     dataset.bind('res', RES)
     dataset.bind('imd', IMD)
@@ -28,19 +167,45 @@ def _new_graph():
 # Graph initialisieren
 _new_graph()
 
-# Streaming-Ziel und Flush-Schwelle
-OUT_TTL = 'imdb_transformed.ttl'
-FLUSH_TRIPLES = 200_000
+# N-Triples-Text an die Ausgabedatei anhängen
+def _append_nt(data):
+    if integrity is not None:
+        with metrics.stage("integrity", _table):
+            data = integrity.check(data, drop=INTEGRITY == "drop")
+    if args.stats:
+        with metrics.stage("stats", _table):
+            stats.observe(data)
+    with metrics.stage("write", _table):
+        sink.write(data)
+
+# Tripel eines Chunks spaltenweise erzeugen
+def _emit(table, df):
+    with metrics.stage("emit", table):
+        return emit_chunk(table, df)
+
+# Bisher geschriebene Bytes (alle Shards bzw. alle Dateien des Term-Ordners)
+def _bytes_out():
+    if OUT_TERMS:
+        return sum(os.path.getsize(join(TERMS_DIR, f)) for f in listdir(TERMS_DIR))
+    if OUT_SHARDS:
+        return sum(s["bytes"] for s in sink.shards) + os.path.getsize(sink.path)
+    return os.path.getsize(sink.path)
 
 # [ÄNDERUNG] Tripel anhängen und IMMER hart resetten, um Speicherfragmentierung zu vermeiden
 def _flush_graph():
     global dataset, graph
+    if SINK == "stream":
+        with metrics.stage("write", _table):
+            for triple in graph:
+                sink.add(triple)
+        graph.clear()
+        return
     if len(graph):
-        data = graph.serialize(format='nt')
+        with metrics.stage("serialize", _table):
+            data = graph.serialize(format='nt')
         if isinstance(data, bytes):
             data = data.decode('utf-8')
-        with open(OUT_TTL, 'a', encoding='utf-8') as f:
-            f.write(data)
+        _append_nt(data)
     # harter Reset statt graph.remove((None,None,None))
     try:
         dataset.close()
@@ -51,17 +216,27 @@ def _flush_graph():
     gc.collect()
     _new_graph()
 
-# Turtle-Prefixe einmalig schreiben
-with open(OUT_TTL, 'w', encoding='utf-8') as f:
-    f.write('@prefix res: <http://example.org/imdb/resource/> .\n')
-    f.write('@prefix imd: <http://example.org/imdb#> .\n\n')
-
-# Ontologie laden und sofort persistieren
-dataset.default_context.parse('imdb_ontology.ttl', format='turtle')
-_flush_graph()  # [ÄNDERUNG]
+_table = "ontology"
+if not ckpt.is_done("ontology"):
+    metrics.begin_table("ontology")
+    # Turtle-Prefixe einmalig schreiben (TurtleWriter schreibt seinen Kopf selbst)
+    if not OUT_GZIP and not OUT_TURTLE:
+        sink.write_raw('@prefix res: <http://example.org/imdb/resource/> .\n')
+        sink.write_raw('@prefix imd: <http://example.org/imdb#> .\n\n')
+
+    # Ontologie laden und sofort persistieren (rdflib-Graph nur noch hierfür)
+    ontology = Graph()
+    ontology.parse('imdb_ontology.ttl', format='turtle')
+    sink.write_graph(ontology)
+    if args.stats:
+        stats.observe(ontology.serialize(format='nt'))
+    del ontology
+    ckpt.finish("ontology", sink.path, sink.sync(), sink.triples)
+    metrics.add("triples", sink.triples, "ontology")
+    metrics.end_table("ontology")
 
 # Pfad zu den IMDb-Daten
-path = "../uncutted files"
+path = args.path
 
 # [ÄNDERUNG] Alle .tsv.gz-Dateien unverändert aufnehmen
 files = [f for f in listdir(path) if isfile(join(path, f)) and f.endswith(".tsv.gz")]
@@ -71,27 +246,97 @@ print("[Info] Gefundene Dateien:")
 for f in files:
     print(" -", f)
 
+# Angelegte Titel/Personen vorab aus der ID-Spalte (Bitfelder), dann wird jeder Chunk
+# vor dem Schreiben geprüft; nach --resume zählt der Bericht nur den fortgesetzten Teil
+integrity = None
+if INTEGRITY and EMIT_MODE == "rows" and SINK == "stream":
+    print("[!] INTEGRITY braucht Text-Chunks (vectorized oder SINK = 'graph'), übersprungen")
+elif INTEGRITY:
+    integrity = Integrity()
+    with metrics.stage("integrity", "declare"):
+        declare_tsv(integrity, {"title": f"{path}/title.basics.tsv.gz",
+                                "person": f"{path}/name.basics.tsv.gz"})
+
 # [ÄNDERUNG] Chunk-Iterator akzeptiert den echten Dateinamen
+# [ÄNDERUNG] Checkpoint nach jedem verarbeiteten Chunk, fertige Chunks werden beim Fortsetzen übersprungen
+# [ÄNDERUNG] Zeit pro Stufe: decompress (Warten auf den nächsten Block), parse,
+#            process (Schleife des Aufrufers ohne die darin gemessenen Stufen emit/write/...),
+#            flush, checkpoint; mit Parquet-Kopie "read" statt decompress/parse
+def _frames(filename, table, start):
+    staged = staged_source(f"{path}/{filename}", start)
+    if staged is not None:
+        yield from metrics.timed(staged.iter_frames(CHUNKSIZE, start), "read", table)
+        return
+    blocks = metrics.timed(iter_blocks(f"{path}/{filename}", CHUNKSIZE, start), "decompress", table)
+    for header, block, pos, src_offset in blocks:
+        with metrics.stage("parse", table):
+            df = read_block(header, block, table)
+        yield df, pos, src_offset
+
 def _iter_chunks(filename):
-    file_path = f"{path}/{filename}"
-    yield from pd.read_csv(
-        file_path,
-        sep="\t",                 # [ÄNDERUNG] keine Regex, keine Warnung
-        compression="gzip",
-        on_bad_lines="skip",
-        chunksize=100_000
-    )
+    global _table
+    table = _table = _base(filename)
+    if ckpt.is_done(table):
+        print(f"[Info] {table}: laut Checkpoint fertig, übersprungen")
+        return
+    first, start = ckpt.resume_point(table)
+    metrics.begin_table(table)
+    for idx, (df, pos, src_offset) in enumerate(_frames(filename, table, start), first):
+        metrics.add("rows", len(df), table)
+        triples, written = sink.triples, _bytes_out()
+        with metrics.stage("process", table):
+            yield df
+        # hier ist der Chunk vollständig verarbeitet
+        t = time.perf_counter()
+        _flush_graph()
+        metrics.flushed(table, time.perf_counter() - t)
+        with metrics.stage("checkpoint", table):
+            ckpt.record(table, idx, pos, src_offset, sink.path, sink.sync(), sink.triples)
+        metrics.add("triples", sink.triples - triples, table)
+        metrics.add("bytes", _bytes_out() - written, table)
+        if args.prometheus:
+            metrics.write_prometheus(args.prometheus)
+    ckpt.finish(table, sink.path, sink.sync(), sink.triples)
+    metrics.end_table(table)
 
 # [ÄNDERUNG] Dateiname -> logische Basis (entscheidet Routing)
 def _base(name: str) -> str:
     # Entfernt nur die Endung .tsv.gz, ohne den Rest zu verändern
     return re.sub(r"\.tsv\.gz$", "", name)
 
+# -------- Titel-Tabellen gemeinsam (Merge-Join nach tconst) --------
+# Checkpoint "titles" mit Stapelgrenze und Startposition je Datei; danach gelten
+# die title.*-Tabellen als fertig und die Einzeldurchläufe unten werden übersprungen.
+if MERGE_TITLES and EMIT_MODE == "vectorized" and not ckpt.is_done("titles"):
+    _table = "titles"
+    first, state = ckpt.resume_point("titles")
+    metrics.begin_table("titles")
+    batches = merge_blocks({t: f"{path}/{t}.tsv.gz" for t in TITLE_TABLES}, CHUNKSIZE,
+                           resume=state or None)
+    for idx, (batch, state) in enumerate(metrics.timed(batches, "merge", "titles"), first):
+        metrics.add("rows", sum(len(df) for df in batch.values()), "titles")
+        triples, written = sink.triples, _bytes_out()
+        with metrics.stage("emit", "titles"):
+            data = emit_titles(batch)
+        _append_nt(data)
+        with metrics.stage("checkpoint", "titles"):
+            ckpt.record("titles", idx, state, state["src_offsets"], sink.path, sink.sync(), sink.triples)
+        metrics.add("triples", sink.triples - triples, "titles")
+        metrics.add("bytes", _bytes_out() - written, "titles")
+        if args.prometheus:
+            metrics.write_prometheus(args.prometheus)
+    for t in ("titles", *TITLE_TABLES):
+        ckpt.finish(t, sink.path, sink.sync(), sink.triples)
+    metrics.end_table("titles")
+
 # -------- Title (basics) --------
 for df in _iter_chunks("title.basics.tsv.gz"):
+    if EMIT_MODE == "vectorized":
+        _append_nt(_emit("title.basics", df))
+        continue
     for _, row in tqdm(df.iterrows(), total=len(df)):
         tconst = row["tconst"]
-        t = URIRef(to_iri(f"{RES}title/{tconst}"))
+        t = iris.title(tconst)
         graph.add((t, RDF.type, IMD.Title))
 
         tt = "" if pd.isna(row.get("titleType")) else str(row.get("titleType"))
@@ -114,19 +359,19 @@ for df in _iter_chunks("title.basics.tsv.gz"):
         if not pd.isna(v) and str(v) not in {r'\N', '\\N', ''}:
             s = str(v).lower()
             b = True if s in {'1', 'true', 't'} else False
-            graph.add((t, IMD.isAdult, Literal(b, datatype=XSD.boolean)))
+            graph.add((t, IMD.isAdult, lits.boolean(b)))
 
         v = row.get("startYear")
         if not pd.isna(v) and str(v) not in {r'\N', '\\N', ''}:
             try:
-                graph.add((t, IMD.startYear, Literal(str(v), datatype=XSD.string)))
+                graph.add((t, IMD.startYear, lits.string(v)))
             except:
                 pass
 
         v = row.get("endYear")
         if not pd.isna(v) and str(v) not in {r'\N', '\\N', ''}:
             try:
-                graph.add((t, IMD.endYear, Literal(str(v), datatype=XSD.string)))
+                graph.add((t, IMD.endYear, lits.string(v)))
             except:
                 pass
 
@@ -139,24 +384,26 @@ for df in _iter_chunks("title.basics.tsv.gz"):
 
         v = row.get("titleType")
         if not pd.isna(v) and str(v) not in {r'\N', '\\N', ''}:
-            graph.add((t, IMD.type, Literal(str(v), datatype=XSD.string)))
+            graph.add((t, IMD.type, lits.string(v)))
 
         v = row.get("genres")
         if not pd.isna(v) and str(v) not in {r'\N', '\\N', ''}:
             for g_ in str(v).split(','):
                 g = g_.strip()
                 if g:
-                    graph.add((t, IMD.genre, Literal(g, datatype=XSD.string)))
-        # [ÄNDERUNG] Nur am Chunkende flushen, nicht zwischendurch
-    _flush_graph()
+                    graph.add((t, IMD.genre, lits.string(g)))
+        # [ÄNDERUNG] Nur am Chunkende flushen (in _iter_chunks), nicht zwischendurch
     del df
     gc.collect()
 
 # -------- Ratings --------
 for df in _iter_chunks("title.ratings.tsv.gz"):
+    if EMIT_MODE == "vectorized":
+        _append_nt(_emit("title.ratings", df))
+        continue
     for _, row in tqdm(df.iterrows(), total=len(df)):
         tconst = row["tconst"]
-        r = URIRef(to_iri(f"{RES}rating/{tconst}"))
+        r = iris.rating(tconst)
         graph.add((r, RDF.type, IMD.Rating))
 
         v = row.get("averageRating")
@@ -173,18 +420,20 @@ for df in _iter_chunks("title.ratings.tsv.gz"):
             except:
                 pass
 
-        t = URIRef(to_iri(f"{RES}title/{tconst}"))
+        t = iris.title(tconst)
         graph.add((t, IMD.hasRating, r))
-    _flush_graph()
     del df
     gc.collect()
 
 # -------- Alternate titles (akas) --------
 for df in _iter_chunks("title.akas.tsv.gz"):
+    if EMIT_MODE == "vectorized":
+        _append_nt(_emit("title.akas", df))
+        continue
     for _, row in tqdm(df.iterrows(), total=len(df)):
         titleId = row["titleId"]
         ordering = row.get("ordering")
-        a = URIRef(to_iri(f"{RES}akas/{titleId}/{ordering}"))
+        a = iris.akas(titleId, ordering)
         graph.add((a, RDF.type, IMD.AlternateTitle))
 
         if not pd.isna(ordering):
@@ -199,23 +448,25 @@ for df in _iter_chunks("title.akas.tsv.gz"):
 
         v = row.get("region")
         if not pd.isna(v) and str(v) not in {r'\N', '\\N', ''}:
-            graph.add((a, IMD.region, Literal(str(v), datatype=XSD.string)))
+            graph.add((a, IMD.region, lits.string(v)))
 
         v = row.get("language")
         if not pd.isna(v) and str(v) not in {r'\N', '\\N', ''}:
-            graph.add((a, IMD.language, Literal(str(v), datatype=XSD.string)))
+            graph.add((a, IMD.language, lits.string(v)))
 
-        t = URIRef(to_iri(f"{RES}title/{titleId}"))
+        t = iris.title(titleId)
         graph.add((t, IMD.hasAlternateTitle, a))
-    _flush_graph()
     del df
     gc.collect()
 
 # -------- Episodes --------
 for df in _iter_chunks("title.episode.tsv.gz"):
+    if EMIT_MODE == "vectorized":
+        _append_nt(_emit("title.episode", df))
+        continue
     for _, row in tqdm(df.iterrows(), total=len(df)):
         tconst = row["tconst"]
-        t = URIRef(to_iri(f"{RES}title/{tconst}"))
+        t = iris.title(tconst)
         graph.add((t, RDF.type, IMD.Episode))
 
         v = row.get("seasonNumber")
@@ -234,17 +485,19 @@ for df in _iter_chunks("title.episode.tsv.gz"):
 
         parent = row.get("parentTconst")
         if not pd.isna(parent) and str(parent) not in {r'\N', '\\N', ''}:
-            p = URIRef(to_iri(f"{RES}title/{parent}"))
+            p = iris.title(parent)
             graph.add((t, IMD.parentSeries, p))
-    _flush_graph()
     del df
     gc.collect()
 
 # -------- Persons --------
 for df in _iter_chunks("name.basics.tsv.gz"):
+    if EMIT_MODE == "vectorized":
+        _append_nt(_emit("name.basics", df))
+        continue
     for _, row in tqdm(df.iterrows(), total=len(df)):
         nconst = row["nconst"]
-        p = URIRef(to_iri(f"{RES}person/{nconst}"))
+        p = iris.person(nconst)
         graph.add((p, RDF.type, IMD.Person))
         graph.add((p, IMD.personID, Literal(str(nconst), datatype=XSD.string)))
 
@@ -255,36 +508,38 @@ for df in _iter_chunks("name.basics.tsv.gz"):
         v = row.get("birthYear")
         if not pd.isna(v) and str(v) not in {r'\N', '\\N', ''}:
             try:
-                graph.add((p, IMD.birthYear, Literal(str(v), datatype=XSD.string)))
+                graph.add((p, IMD.birthYear, lits.string(v)))
             except:
                 pass
 
         v = row.get("deathYear")
         if not pd.isna(v) and str(v) not in {r'\N', '\\N', ''}:
             try:
-                graph.add((p, IMD.deathYear, Literal(str(v), datatype=XSD.string)))
+                graph.add((p, IMD.deathYear, lits.string(v)))
             except:
                 pass
 
         prof = "" if pd.isna(row.get("primaryProfession")) else str(row.get("primaryProfession"))
         if "actress" in prof:
-            graph.add((p, IMD.gender, Literal("female", datatype=XSD.string)))
+            graph.add((p, IMD.gender, lits.string("female")))
         elif "actor" in prof:
-            graph.add((p, IMD.gender, Literal("male", datatype=XSD.string)))
+            graph.add((p, IMD.gender, lits.string("male")))
 
         kf = row.get("knownForTitles")
         if not pd.isna(kf) and str(kf) not in {r'\N', '\\N', ''}:
             for tt in str(kf).split(","):
                 tt_ = tt.strip()
                 if tt_:
-                    t = URIRef(to_iri(f"{RES}title/{tt_}"))
+                    t = iris.title(tt_)
                     graph.add((p, IMD.knownFor, t))
-    _flush_graph()
     del df
     gc.collect()
 
 # -------- Roles aus crew --------
 for df in _iter_chunks("title.crew.tsv.gz"):
+    if EMIT_MODE == "vectorized":
+        _append_nt(_emit("title.crew", df))
+        continue
     for _, row in tqdm(df.iterrows(), total=len(df)):
         tconst = row["tconst"]
         for role_name, col in [("director", "directors"), ("writer", "writers")]:
@@ -295,20 +550,22 @@ for df in _iter_chunks("title.crew.tsv.gz"):
                 nconst = n.strip()
                 if not nconst:
                     continue
-                person = URIRef(to_iri(f"{RES}person/{nconst}"))
-                role = URIRef(to_iri(f"{RES}role/{tconst}/{role_name}/{nconst}"))
-                t = URIRef(to_iri(f"{RES}title/{tconst}"))
+                person = iris.person(nconst)
+                role = iris.role(tconst, role_name, nconst)
+                t = iris.title(tconst)
 
                 graph.add((role, RDF.type, IMD.Role))
-                graph.add((role, IMD.roleName, Literal(role_name, datatype=XSD.string)))
+                graph.add((role, IMD.roleName, lits.string(role_name)))
                 graph.add((person, IMD.hasRole, role))
                 graph.add((role, IMD.roleIn, t))
-    _flush_graph()
     del df
     gc.collect()
 
 # -------- Roles aus principals --------
 for df in _iter_chunks("title.principals.tsv.gz"):
+    if EMIT_MODE == "vectorized":
+        _append_nt(_emit("title.principals", df))
+        continue
     for _, row in tqdm(df.iterrows(), total=len(df)):
         tconst = row.get("tconst")
         nconst = row.get("nconst")
@@ -324,18 +581,45 @@ for df in _iter_chunks("title.principals.tsv.gz"):
         if not cat:
             cat = "role"
 
-        person = URIRef(to_iri(f"{RES}person/{nconst}"))
-        role = URIRef(to_iri(f"{RES}role/{tconst}/{cat}/{nconst}"))
-        t = URIRef(to_iri(f"{RES}title/{tconst}"))
+        person = iris.person(nconst)
+        role = iris.role(tconst, cat, nconst)
+        t = iris.title(tconst)
 
         graph.add((role, RDF.type, IMD.Role))
-        graph.add((role, IMD.roleName, Literal(cat, datatype=XSD.string)))
+        graph.add((role, IMD.roleName, lits.string(cat)))
         graph.add((person, IMD.hasRole, role))
         graph.add((role, IMD.roleIn, t))
-    _flush_graph()
     del df
     gc.collect()
 
 # Abschluss
 _flush_graph()
-print(f"[✓] Fertig. Tripel in '{OUT_TTL}' geschrieben.")
\ No newline at end of file
+sink.close()
+print(f"[✓] Fertig. Tripel in '{OUT_TTL}' geschrieben.")
+iris.report()
+lits.report()
+if integrity is not None:
+    integrity.report()
+
+# Statistik: nach --resume fehlt der Teil vor dem Abbruch, im rows-Pfad ohne Graph
+# geht kein Text durch _append_nt -> dann einmal über die fertige Ausgabe zählen
+recount = args.resume or (EMIT_MODE == "rows" and SINK == "stream")
+if args.stats and recount and OUT_TURTLE:
+    # rdf_stats liest nur N-Triples
+    print("[!] Kein Statistik-Graph: Turtle-Ausgabe lässt sich nicht nachzählen")
+    args.stats = None
+elif args.stats:
+    with metrics.stage("stats"):
+        if recount:
+            print("[Info] Statistik wird aus der fertigen Ausgabe gezählt")
+            stats = scan(OUT_TTL)
+        stats.write(args.stats)
+    print(f"[✓] Statistik-Graph: '{args.stats}'")
+
+metrics.write_json(args.report, output=OUT_TTL, triples=sink.triples, iri_cache=iris.stats(),
+                   literal_cache=lits.stats(), statistics=stats.summary() if args.stats else None,
+                   integrity=integrity.summary() if integrity is not None else None)
+if args.prometheus:
+    metrics.write_prometheus(args.prometheus)
+metrics.summary()
+print(f"[✓] Laufbericht: '{args.report}'")
\ No newline at end of file
@@ -1,4 +1,11 @@
-import gzip
+# Nur noch für bereits vorhandene imdb_transformed.ttl nötig:
+# rdf_transform_chunked_working.py schreibt mit OUT_SHARDS = True direkt in Shards.
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from rdf_gzip import WRITE_THREADS
+from rdf_shards import ShardedWriter
 
 # input
 INPUT_FILE = "imdb_transformed.ttl"
@@ -9,29 +16,19 @@ OUTPUT_PREFIX = "imdb_shard_"
 # Shard-Größe in Zeilen
 LINES_PER_SHARD = 5_000_000  # (~0.5–2 GB per File)
 
-def shard_ttl(input_file, output_prefix, lines_per_shard):
-    shard_index = 1
-    line_count = 0
-    out_f = gzip.open(f"{output_prefix}{shard_index:04d}.nt.gz", "wt", encoding="utf-8")
+# Kompressions-Threads (pigz-artig, Ausgabe bleibt Standard-gzip)
+GZIP_THREADS = WRITE_THREADS
+
 
-    with open(input_file, "r", encoding="utf-8") as f:
+def shard_ttl(input_file, output_prefix, lines_per_shard):
+    with ShardedWriter(output_prefix, lines_per_shard, threads=GZIP_THREADS) as out_f, \
+            open(input_file, "r", encoding="utf-8") as f:
         for line in f:
             # Turtle-Prefix skip
             if line.startswith("@prefix") or not line.strip():
                 continue
 
             out_f.write(line)
-            line_count += 1
-
-            if line_count >= lines_per_shard:
-                out_f.close()
-                print(f"Shard {shard_index:04d} fertig ({line_count} Zeilen)")
-                shard_index += 1
-                line_count = 0
-                out_f = gzip.open(f"{output_prefix}{shard_index:04d}.nt.gz", "wt", encoding="utf-8")
-
-    out_f.close()
-    print(f"Shard {shard_index:04d} fertig ({line_count} Zeilen, letzter Shard)")
 
 if __name__ == "__main__":
     shard_ttl(INPUT_FILE, OUTPUT_PREFIX, LINES_PER_SHARD)
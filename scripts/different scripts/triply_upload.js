@@ -1,9 +1,11 @@
+// Einfacher sequentieller Upload; parallel, mit Wiederholungen und Zustandsdatei: scripts/rdf_upload.py
 import App from '@triply/triplydb'
 import fs from 'fs'
 import path from 'path'
 
 const DATASET = 'imdb'
 const GLOB    = /^imdb_shard_.*\.nt\.gz$/ // Upload-Muster
+const MANIFEST = 'imdb_shard_manifest.json' // von rdf_shards.py geschrieben
 
 const triply = App.get({ token: process.env.TOKEN }) // API-Token aus Env
 
@@ -12,9 +14,17 @@ async function main() {
     const dataset = await account.getDataset(DATASET)
     //const dataset = await account.addDataset(DATASET)
 
-    // alle passenden Dateien im aktuellen Ordner hochladen
+    // Shards laut Manifest hochladen, ohne Manifest alle passenden Dateien im Ordner
     const cwd = process.cwd()
-    const files = fs.readdirSync(process.cwd()).filter(f => GLOB.test(f))
+    let files
+    if (fs.existsSync(MANIFEST)) {
+        const manifest = JSON.parse(fs.readFileSync(MANIFEST, 'utf8'))
+        if (!manifest.complete) throw new Error(`${MANIFEST}: Transformation noch nicht abgeschlossen`)
+        files = manifest.shards.map(s => s.file)
+        console.log(`Manifest: ${files.length} Shards, ${manifest.triples} Tripel`)
+    } else {
+        files = fs.readdirSync(cwd).filter(f => GLOB.test(f))
+    }
     for (const f of files) {
         const full = path.resolve(cwd, f)
         console.log(`Uploading ${f} ...`)
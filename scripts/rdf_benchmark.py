@@ -0,0 +1,337 @@
+# ---------------------- BENCHMARK: TABELLEN × AUSGABE-MODI -------------------------------
+"""
+Misst die Transformation pro Tabelle und Modus auf synthetischen Daten
+(``rdf_synth``) oder auf vorhandenen .tsv.gz.
+
+Je Tabelle und Modus läuft ein eigener Prozess (frischer Speicher, damit der
+Spitzenwert pro Messung stimmt): lesen (``rdf_reader``), Tripel erzeugen
+(``rdf_emit``) und in die Senke des Modus schreiben. Gemessen werden Zeilen/s,
+Tripel/s, Spitzen-RSS und geschriebene Bytes.
+
+Modi (``MODES``):
+    nt        N-Triples, unkomprimiert
+    nt.gz     N-Triples, gzip
+    ttl       Turtle mit Präfixen, nach Subjekt gruppiert (rdf_writer.TurtleWriter)
+    terms     Integer-Tripel + Wörterbuch (rdf_terms)
+    pyarrow   wie "nt", aber mit pyarrow.csv als Parser (nur falls installiert)
+    parquet   wie "nt", aber aus der Parquet-Kopie (rdf_parquet, vorab und
+              ungemessen im Arbeitsordner angelegt; braucht pyarrow)
+
+Ganze Läufe (``PIPELINE_MODES``): das echte Skript als eigener Prozess über
+alle Tabellen samt Ontologie bis zur fertigen Ausgabedatei, Start und Imports
+eingeschlossen. Untereinander vergleichbar (vektorisiert gegen iterrows,
+seriell gegen parallel), mit den Modi oben nur grob:
+    serial    rdf_transform_chunked_working.py, EMIT_MODE="vectorized"
+    rows      dasselbe mit EMIT_MODE="rows" (iterrows, Writer als Senke)
+    graph     EMIT_MODE="rows", SINK="graph" (rdflib-Dataset, serialize je Flush)
+    merge     MERGE_TITLES=True (title.* per Merge-Join nach tconst)
+    parallel  rdf_transform_parallel.run mit ``--workers`` Prozessen
+Spitzen-RSS ist dort der größte einzelne Prozess (bei "parallel" also ein
+Worker oder der Hauptprozess). "rows" und "graph" laufen nur auf Anfrage
+(``--mode rows``), sie brauchen ein Vielfaches der Zeit.
+
+Ergebnis als Tabelle auf der Konsole und als JSON (``--json``), damit sich
+Läufe vor/nach einer Änderung vergleichen lassen.
+
+Aufruf:  python rdf_benchmark.py --titles 100000
+         python rdf_benchmark.py --path "../uncutted files" --mode nt --mode terms
+"""
+
+import argparse
+import gzip
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from rdf_emit import EMITTERS, emit_chunk
+from rdf_parquet import open_staged, stage
+from rdf_reader import CHUNKSIZE, iter_blocks, read_block
+from rdf_synth import generate
+from rdf_terms import TermStore
+from rdf_writer import NTriplesWriter, TurtleWriter
+
+# ------------------ Parameter ------------------
+TITLES = 100_000          # Größe der synthetischen Daten (Anzahl Titel)
+SEED = 0
+JSON_OUT = "benchmark.json"
+
+# Modus -> (Senke, Parser)
+MODES = {
+    "nt": ("nt", "c"),
+    "nt.gz": ("nt.gz", "c"),
+    "ttl": ("ttl", "c"),
+    "terms": ("terms", "c"),
+    "pyarrow": ("nt", "pyarrow"),
+    "parquet": ("nt", "parquet"),
+}
+
+# Modi, die pyarrow brauchen
+PYARROW_MODES = ("pyarrow", "parquet")
+
+# Ganze Läufe: Modus -> (Skript, zusätzliche Argumente)
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+CHUNKED_SCRIPT = os.path.join(SCRIPT_DIR, "different scripts", "rdf_transform_chunked_working.py")
+PARALLEL_SCRIPT = os.path.join(SCRIPT_DIR, "rdf_transform_parallel.py")
+ONTOLOGY_FILE = os.path.join(SCRIPT_DIR, "..", "ontologies", "imdb_ontology.ttl")
+PIPELINE_MODES = {
+    "serial": (CHUNKED_SCRIPT, ["--emit-mode", "vectorized"]),
+    "rows": (CHUNKED_SCRIPT, ["--emit-mode", "rows"]),
+    "graph": (CHUNKED_SCRIPT, ["--emit-mode", "rows", "--sink", "graph"]),
+    "merge": (CHUNKED_SCRIPT, ["--merge-titles"]),
+    "parallel": (PARALLEL_SCRIPT, []),
+}
+# Ausgabedatei beider Skripte (im Arbeitsordner des Laufs)
+PIPELINE_OUT = "imdb_transformed.ttl"
+
+# Modi, die nur auf Anfrage laufen (iterrows)
+SLOW_MODES = ("rows", "graph")
+
+
+def _has_pyarrow():
+    try:
+        import pyarrow.csv  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _open_sink(kind, target):
+    if kind == "terms":
+        return TermStore(target)
+    if kind == "ttl":
+        return TurtleWriter(target)
+    return NTriplesWriter(target, compress=kind == "nt.gz")
+
+
+def _size(path):
+    if os.path.isdir(path):
+        return sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+    return os.path.getsize(path)
+
+
+def _maxrss_bytes(usage):
+    # ru_maxrss ist unter Linux KiB, unter macOS Bytes
+    return usage.ru_maxrss if sys.platform == "darwin" else usage.ru_maxrss * 1024
+
+
+def _peak_rss():
+    """Spitzen-RSS des Prozesses in Bytes."""
+    return _maxrss_bytes(resource.getrusage(resource.RUSAGE_SELF))
+
+
+def _frames(src, table, engine, chunksize, stage_dir):
+    if engine == "parquet":
+        for df, _, _ in open_staged(src, stage_dir).iter_frames(chunksize):
+            yield df
+        return
+    for header, block, _, _ in iter_blocks(src, chunksize):
+        yield read_block(header, block, table, engine)
+
+
+def measure(src, table, mode, work_dir, chunksize=CHUNKSIZE):
+    """Eine Tabelle in einem Modus transformieren; läuft im eigenen Prozess."""
+    kind, engine = MODES[mode]
+    target = os.path.join(work_dir, f"{table}.{mode}")
+    rss_before = _peak_rss()
+    rows = 0
+    t_read = t_emit = 0.0
+    start = time.perf_counter()
+    with _open_sink(kind, target) as sink:
+        t0 = time.perf_counter()
+        for df in _frames(src, table, engine, chunksize, os.path.join(work_dir, "parquet")):
+            t1 = time.perf_counter()
+            data = emit_chunk(table, df)
+            t2 = time.perf_counter()
+            sink.write(data)
+            t_read += t1 - t0
+            t_emit += t2 - t1
+            rows += len(df)
+            t0 = time.perf_counter()
+        triples = sink.triples
+    seconds = time.perf_counter() - start
+    written = _size(target)
+    if os.path.isdir(target):
+        shutil.rmtree(target)
+    else:
+        os.remove(target)
+    return {
+        "table": table, "mode": mode, "rows": rows, "triples": triples,
+        "seconds": round(seconds, 4),
+        "rows_per_s": round(rows / seconds, 1) if seconds else None,
+        "triples_per_s": round(triples / seconds, 1) if seconds else None,
+        "read_s": round(t_read, 4), "emit_s": round(t_emit, 4),
+        "write_s": round(seconds - t_read - t_emit, 4),
+        "bytes": written, "peak_rss": _peak_rss(), "rss_at_start": rss_before,
+    }
+
+
+def _count_rows(path):
+    """Datenzeilen aller .tsv.gz im Ordner (ohne Kopfzeile)."""
+    rows = 0
+    for table in EMITTERS:
+        src = os.path.join(path, f"{table}.tsv.gz")
+        if os.path.isfile(src):
+            with gzip.open(src, "rb") as f:
+                rows += sum(block.count(b"\n") for block in iter(lambda: f.read(1 << 20), b"")) - 1
+    return rows
+
+
+def _count_triples(path):
+    with open(path, encoding="utf-8") as f:
+        return sum(1 for line in f if line.strip() and not line.startswith("@prefix"))
+
+
+def measure_pipeline(path, mode, work_dir, chunksize=CHUNKSIZE, workers=None, rows=None):
+    """Ein ganzes Skript über alle Tabellen als Kindprozess; RSS aus os.wait4 (inkl. Worker)."""
+    script, extra = PIPELINE_MODES[mode]
+    run_dir = tempfile.mkdtemp(prefix=f"{mode}_", dir=work_dir)
+    shutil.copy(ONTOLOGY_FILE, run_dir)
+    cmd = [sys.executable, script, "--path", os.path.abspath(path), "--chunksize", str(chunksize), *extra]
+    if script == PARALLEL_SCRIPT:
+        cmd += ["--workers", str(workers or os.cpu_count()), "--shard-dir", os.path.join(run_dir, "shards")]
+    else:
+        # Statistik-Graph aus, sonst misst "serial" eine Stufe mit, die "parallel" nicht hat
+        cmd += ["--stats", "", "--report", os.path.join(run_dir, "report.json")]
+    log = os.path.join(run_dir, "run.log")
+    try:
+        with open(log, "wb") as out:
+            start = time.perf_counter()
+            proc = subprocess.Popen(cmd, cwd=run_dir, stdout=out, stderr=subprocess.STDOUT)
+            _, status, usage = os.wait4(proc.pid, 0)
+            seconds = time.perf_counter() - start
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        if proc.returncode:
+            with open(log, encoding="utf-8", errors="replace") as f:
+                tail = f.read()[-2000:]
+            raise RuntimeError(f"Modus '{mode}' fehlgeschlagen (Exit {proc.returncode}):\n{tail}")
+        out_file = os.path.join(run_dir, PIPELINE_OUT)
+        rows = _count_rows(path) if rows is None else rows
+        triples = _count_triples(out_file)
+        written = os.path.getsize(out_file)
+    finally:
+        shutil.rmtree(run_dir, ignore_errors=True)
+    return {
+        "table": "*", "mode": mode, "rows": rows, "triples": triples,
+        "seconds": round(seconds, 4),
+        "rows_per_s": round(rows / seconds, 1) if seconds else None,
+        "triples_per_s": round(triples / seconds, 1) if seconds else None,
+        "read_s": None, "emit_s": None, "write_s": None,
+        "bytes": written, "peak_rss": _maxrss_bytes(usage), "rss_at_start": None,
+        "workers": (workers or os.cpu_count()) if script == PARALLEL_SCRIPT else 1,
+    }
+
+
+def _print_result(r):
+    table = "(alle)" if r["table"] == "*" else r["table"]
+    print(f"    {table:<17} {r['mode']:<8} {r['rows']:>10} Zeilen {r['rows_per_s'] or 0:>12,.0f} Z/s "
+          f"{r['triples_per_s'] or 0:>12,.0f} T/s {r['peak_rss'] / 2**20:>8.1f} MiB "
+          f"{r['bytes'] / 2**20:>9.2f} MiB")
+
+
+def run(path, modes, tables=None, chunksize=CHUNKSIZE, work_dir=None, workers=None):
+    """Alle (Tabelle, Modus)-Paare nacheinander, je in einem frischen Prozess; ganze Läufe danach."""
+    tables = [t for t in (tables or EMITTERS) if os.path.isfile(os.path.join(path, f"{t}.tsv.gz"))]
+    table_modes = [m for m in modes if m in MODES]
+    pipeline_modes = [m for m in modes if m in PIPELINE_MODES]
+    work = tempfile.mkdtemp(prefix="bench_", dir=work_dir)
+    ctx = multiprocessing.get_context("spawn")
+    results = []
+    try:
+        if "parquet" in table_modes:
+            stage(path, os.path.join(work, "parquet"), tables, chunksize)
+        for table in tables:
+            for mode in table_modes:
+                with ProcessPoolExecutor(1, mp_context=ctx) as pool:
+                    r = pool.submit(measure, os.path.join(path, f"{table}.tsv.gz"),
+                                    table, mode, work, chunksize).result()
+                results.append(r)
+                _print_result(r)
+        if pipeline_modes:
+            rows = _count_rows(path)
+        for mode in pipeline_modes:
+            r = measure_pipeline(path, mode, work, chunksize, workers, rows)
+            results.append(r)
+            _print_result(r)
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+    return results
+
+
+def summary(results):
+    """Summen pro Modus über alle Tabellen."""
+    out = {}
+    for r in results:
+        s = out.setdefault(r["mode"], {"rows": 0, "triples": 0, "seconds": 0.0, "bytes": 0, "peak_rss": 0})
+        s["rows"] += r["rows"]
+        s["triples"] += r["triples"]
+        s["seconds"] += r["seconds"]
+        s["bytes"] += r["bytes"]
+        s["peak_rss"] = max(s["peak_rss"], r["peak_rss"])
+    for s in out.values():
+        s["seconds"] = round(s["seconds"], 4)
+        s["rows_per_s"] = round(s["rows"] / s["seconds"], 1) if s["seconds"] else None
+        s["triples_per_s"] = round(s["triples"] / s["seconds"], 1) if s["seconds"] else None
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Durchsatz/Speicher der Transformation messen")
+    ap.add_argument("--path", default=None, help="vorhandene .tsv.gz statt synthetischer Daten")
+    ap.add_argument("--titles", type=int, default=TITLES, help="Größe der synthetischen Daten")
+    ap.add_argument("--seed", type=int, default=SEED)
+    ap.add_argument("--mode", action="append", choices=[*MODES, *PIPELINE_MODES],
+                    help=f"Standard: alle außer {', '.join(SLOW_MODES)}")
+    ap.add_argument("--table", action="append", help="Standard: alle (ganze Läufe immer alle)")
+    ap.add_argument("--chunksize", type=int, default=CHUNKSIZE)
+    ap.add_argument("--json", default=JSON_OUT, help="Ergebnisdatei")
+    ap.add_argument("--work-dir", default=None, help="Ordner für Zwischendateien")
+    ap.add_argument("--workers", type=int, default=None, help="Worker für 'parallel' (Standard: alle Kerne)")
+    args = ap.parse_args()
+
+    modes = args.mode or [m for m in [*MODES, *PIPELINE_MODES]
+                          if m not in SLOW_MODES and (m not in PYARROW_MODES or _has_pyarrow())]
+    for mode in PYARROW_MODES:
+        if mode in modes and not _has_pyarrow():
+            print(f"[!] pyarrow nicht installiert, Modus '{mode}' übersprungen")
+            modes.remove(mode)
+
+    data_dir = args.path
+    synth_dir = None
+    if data_dir is None:
+        synth_dir = data_dir = tempfile.mkdtemp(prefix="synth_", dir=args.work_dir)
+        t = time.perf_counter()
+        generate(data_dir, args.titles, args.seed)
+        print(f"[Info] Daten erzeugt in {time.perf_counter() - t:.1f}s")
+    try:
+        results = run(data_dir, modes, args.table, args.chunksize, args.work_dir, args.workers)
+    finally:
+        if synth_dir:
+            shutil.rmtree(synth_dir, ignore_errors=True)
+
+    report = {
+        "source": args.path or {"synthetic_titles": args.titles, "seed": args.seed},
+        "chunksize": args.chunksize,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "results": results,
+        "summary": summary(results),
+    }
+    with open(args.json, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=1)
+    for mode, s in report["summary"].items():
+        print(f"[✓] {mode}: {s['rows']} Zeilen, {s['triples']} Tripel, "
+              f"{s['triples_per_s'] or 0:,.0f} Tripel/s, {s['bytes'] / 2**20:.1f} MiB")
+    print(f"[OK] Ergebnis in '{args.json}'")
+
+
+if __name__ == "__main__":
+    main()
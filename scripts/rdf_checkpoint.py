@@ -0,0 +1,74 @@
+# ---------------------- CHECKPOINTS FÜR DEN VOLLEN LAUF -------------------------------
+"""
+Manifest für die Wiederaufnahme einer abgebrochenen Transformation.
+
+Nach jedem Flush wird eine Zeile (JSON Lines) angehängt und per fsync
+gesichert: Tabelle, Chunk-Index, Position in der Quelle (unkomprimiert zum
+Fortsetzen, dazu der Byte-Offset in der .gz-Datei), Ausgabedatei, deren
+Größe nach dem Flush und die bis dahin geschriebenen Tripel.
+
+Beim Fortsetzen wird die Ausgabe auf die zuletzt gesicherte Größe
+abgeschnitten, fertige Tabellen werden übersprungen und angefangene ab dem
+nächsten Chunk gelesen. Verloren ist höchstens der Chunk, der gerade lief.
+"""
+
+import json
+import os
+
+
+class Checkpoint:
+    def __init__(self, path):
+        self.path = path
+        self.entries = []
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        self.entries.append(json.loads(line))
+                    except ValueError:
+                        break  # halb geschriebene letzte Zeile vom Absturz
+
+    def reset(self):
+        self.entries = []
+        open(self.path, "w").close()
+
+    def _append(self, entry):
+        self.entries.append(entry)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    # -------- Schreiben --------
+    def record(self, table, chunk, pos, src_offset, shard, out_bytes, triples):
+        """Ein fertig geschriebener Chunk."""
+        self._append({"table": table, "chunk": chunk, "pos": pos, "src_offset": src_offset,
+                      "shard": shard, "out_bytes": out_bytes, "triples": triples})
+
+    def finish(self, table, shard, out_bytes, triples):
+        """Tabelle (oder Kopf/Ontologie) vollständig geschrieben."""
+        self._append({"table": table, "done": True,
+                      "shard": shard, "out_bytes": out_bytes, "triples": triples})
+
+    # -------- Lesen --------
+    def last(self):
+        return self.entries[-1] if self.entries else None
+
+    def is_done(self, table):
+        return any(e["table"] == table and e.get("done") for e in self.entries)
+
+    def resume_point(self, table):
+        """(nächster Chunk-Index, unkomprimierte Startposition) für eine Tabelle."""
+        chunks = [e for e in self.entries if e["table"] == table and "chunk" in e]
+        if not chunks:
+            return 0, 0
+        return chunks[-1]["chunk"] + 1, chunks[-1]["pos"]
+
+    def truncate_output(self):
+        """Ausgabedatei auf den Stand des letzten Eintrags kürzen; liefert (Datei, Tripel)."""
+        last = self.last()
+        if last is None:
+            return None, 0
+        with open(last["shard"], "r+b") as f:
+            f.truncate(last["out_bytes"])
+        return last["shard"], last["triples"]
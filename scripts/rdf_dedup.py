@@ -0,0 +1,232 @@
+# ---------------------- DUPLIKATE ENTFERNEN (EXTERNER SPEICHER) -------------------------------
+"""
+Entfernt doppelte Tripel über die ganze Ausgabe, mit begrenztem RAM.
+
+Doppelt entstehen z. B. ``rdf:type imd:Episode`` (title.basics und
+title.episode) und die ``imd:Role``-Knoten aus title.crew und title.principals.
+Innerhalb eines Chunks fängt das der Writer ab, über Chunk-/Tabellengrenzen nicht.
+
+Arbeitet auf dem Integer-Format aus ``rdf_terms`` (ein Tripel = drei IDs):
+
+1. Partitionieren: jedes Tripel wird per Hash in einen von ``K`` Buckets auf
+   der Platte geschrieben (IDs + Zeilennummer). ``K`` ergibt sich aus
+   ``MEM_BYTES``, damit ein Bucket sicher in den Speicher passt.
+2. Pro Bucket: nach (Tripel, Zeilennummer) sortieren, vom jeweils ersten
+   Vorkommen die Zeilennummer in einer Maske (memmap, 1 Byte/Tripel) markieren.
+3. Spalten entlang der Maske kopieren. Die Reihenfolge bleibt die der Eingabe,
+   behalten wird immer das erste Vorkommen.
+
+N-Triples-Dateien laufen ohne Wörterbuch: Schlüssel ist ein 128-Bit-Hash der
+Zeile (zwei 64-Bit-Hashes mit verschiedenen Schlüsseln), sonst dieselben
+Schritte; im dritten Schritt wird die Datei ein zweites Mal gelesen und nur
+die markierten Zeilen geschrieben. Der Speicher hängt damit weder von der
+Zahl der Terme noch der Tripel ab.
+
+Aufruf:  python rdf_dedup.py imdb_terms imdb_terms_dedup
+         python rdf_dedup.py imdb_transformed.nt imdb_dedup.nt
+"""
+
+import argparse
+import gzip
+import json
+import os
+import shutil
+import tempfile
+from itertools import islice
+
+import numpy as np
+import pandas as pd
+
+from rdf_terms import COLUMNS, TermTable
+from rdf_writer import check_ntriples
+
+# Speicher für einen Bucket (Bytes); bestimmt die Anzahl Buckets
+MEM_BYTES = 1 << 30
+
+# Tripel pro Lese-/Schreibblock
+BLOCK = 4_000_000
+
+# Zeilen pro Block beim Einlesen von N-Triples-Dateien
+NT_BLOCK_LINES = 1_000_000
+
+# Kürzeste erwartete N-Triples-Zeile und Kompressionsfaktor von .gz, nur für
+# die Schätzung der Bucket-Zahl (die Zeilenzahl ist vorher nicht bekannt)
+NT_MIN_LINE = 40
+NT_GZ_RATIO = 10
+
+# s, p, o als IDs + Zeilennummer
+RECORD = np.dtype([("s", "<u4"), ("p", "<u4"), ("o", "<u4"), ("row", "<u8")])
+
+# 128-Bit-Hash einer Zeile + Zeilennummer
+LINE_RECORD = np.dtype([("h1", "<u8"), ("h2", "<u8"), ("row", "<u8")])
+HASH_KEYS = ("imdb-dedup-key-1", "imdb-dedup-key-2")
+
+
+def _bucket_of(s, p, o, k):
+    # einfache Multiplikations-Mischung, verteilt auch schiefe Subjekt-IDs gleichmäßig
+    h = (s.astype(np.uint64) * np.uint64(0x9E3779B97F4A7C15)
+         ^ p.astype(np.uint64) * np.uint64(0xC2B2AE3D27D4EB4F)
+         ^ o.astype(np.uint64) * np.uint64(0x165667B19E3779F9))
+    return (h >> np.uint64(32)) % np.uint64(k)
+
+
+def _open_buckets(tmp_dir, k):
+    return [open(os.path.join(tmp_dir, f"bucket{b:04d}.bin"), "wb") for b in range(k)]
+
+
+def _scatter(rec, bucket, files):
+    order = np.argsort(bucket, kind="stable")
+    bounds = np.searchsorted(bucket[order], np.arange(len(files) + 1, dtype=np.uint64))
+    for b, f in enumerate(files):
+        if bounds[b] < bounds[b + 1]:
+            rec[order[bounds[b]:bounds[b + 1]]].tofile(f)
+
+
+def _partition(table, tmp_dir, k):
+    s, p, o = table.triples()
+    files = _open_buckets(tmp_dir, k)
+    try:
+        for a in range(0, len(table), BLOCK):
+            rec = np.empty(min(BLOCK, len(table) - a), dtype=RECORD)
+            rec["s"], rec["p"], rec["o"] = s[a:a + BLOCK], p[a:a + BLOCK], o[a:a + BLOCK]
+            rec["row"] = np.arange(a, a + len(rec), dtype=np.uint64)
+            _scatter(rec, _bucket_of(rec["s"], rec["p"], rec["o"], k), files)
+    finally:
+        for f in files:
+            f.close()
+
+
+def _mark_first(tmp_dir, k, keep, dtype=RECORD, keys=("s", "p", "o")):
+    """Pro Bucket das erste Vorkommen jedes Schlüssels (Felder ``keys``) in ``keep`` markieren."""
+    for b in range(k):
+        path = os.path.join(tmp_dir, f"bucket{b:04d}.bin")
+        rec = np.fromfile(path, dtype=dtype)
+        os.remove(path)
+        if not len(rec):
+            continue
+        rec = rec[np.lexsort((rec["row"],) + tuple(rec[c] for c in reversed(keys)))]
+        first = np.ones(len(rec), dtype=bool)
+        first[1:] = np.logical_or.reduce([rec[c][1:] != rec[c][:-1] for c in keys])
+        keep[rec["row"][first]] = 1
+
+
+def _link_or_copy(src, dst):
+    if os.path.exists(dst):
+        os.remove(dst)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
+
+
+def dedup_store(src_dir, dst_dir, mem_bytes=MEM_BYTES, tmp_dir=None):
+    """Term-Ordner ohne doppelte Tripel nach ``dst_dir`` schreiben; liefert (vorher, nachher)."""
+    table = TermTable(src_dir)
+    n = len(table)
+    if table.dtype != np.uint32:
+        raise ValueError("rdf_dedup erwartet ID_DTYPE = np.uint32")
+    k = max(1, -(-n * RECORD.itemsize // mem_bytes))
+    os.makedirs(dst_dir, exist_ok=True)
+    work = tempfile.mkdtemp(prefix="dedup_", dir=tmp_dir or dst_dir)
+    try:
+        keep = np.lib.format.open_memmap(os.path.join(work, "keep.npy"), mode="w+",
+                                         dtype=np.uint8, shape=(n,))
+        _partition(table, work, k)
+        _mark_first(work, k, keep)
+
+        # Wörterbuch unverändert übernehmen, nur die Spalten filtern
+        for name in ("terms.bin", "terms.idx"):
+            _link_or_copy(os.path.join(src_dir, name), os.path.join(dst_dir, name))
+        cols = table.triples()
+        for c, col in zip(COLUMNS, cols):
+            with open(os.path.join(dst_dir, f"{c}.bin"), "wb") as f:
+                for a in range(0, n, BLOCK):
+                    col[a:a + BLOCK][keep[a:a + BLOCK].astype(bool)].tofile(f)
+        kept = int(np.count_nonzero(keep))
+        del keep, cols
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+    with open(os.path.join(dst_dir, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump({**table.meta, "triples": kept}, f)
+    print(f"[✓] Duplikate entfernt: {n} -> {kept} Tripel ({n - kept} doppelt, {k} Buckets)")
+    return n, kept
+
+
+def _open_text(path, mode="rt"):
+    if path.endswith(".gz"):
+        return gzip.open(path, mode, encoding="utf-8")
+    return open(path, mode[0], encoding="utf-8")
+
+
+def _nt_blocks(path):
+    """Blöcke von Tripelzeilen (ohne ``@prefix``- und Leerzeilen, mit genau einem \\n)."""
+    with _open_text(path) as f:
+        while True:
+            block = list(islice(f, NT_BLOCK_LINES))
+            if not block:
+                break
+            # echtes Turtle hätte Fortsetzungszeilen, die hier einzeln dedupliziert würden
+            check_ntriples("".join(block), path)
+            yield [l.rstrip() + "\n" for l in block if l.strip() and not l.startswith("@prefix")]
+
+
+def hash128(values):
+    """Zwei 64-Bit-Hashes je String (verschiedene Schlüssel), zusammen 128 Bit."""
+    values = np.asarray(values, dtype=object)
+    return [pd.util.hash_array(values, hash_key=key, categorize=False) for key in HASH_KEYS]
+
+
+def dedup_nt(in_file, out_file, mem_bytes=MEM_BYTES, tmp_dir=None):
+    """N-Triples(.gz)-Datei deduplizieren; ``@prefix``- und Leerzeilen werden übersprungen."""
+    size = os.path.getsize(in_file) * (NT_GZ_RATIO if in_file.endswith(".gz") else 1)
+    k = max(1, -(-(size // NT_MIN_LINE) * LINE_RECORD.itemsize // mem_bytes))
+    work = tempfile.mkdtemp(prefix="dedup_nt_", dir=tmp_dir or os.path.dirname(os.path.abspath(out_file)))
+    try:
+        # 1. Hashes der Zeilen in Buckets verteilen
+        n = 0
+        files = _open_buckets(work, k)
+        try:
+            for lines in _nt_blocks(in_file):
+                rec = np.empty(len(lines), dtype=LINE_RECORD)
+                rec["h1"], rec["h2"] = hash128(lines)
+                rec["row"] = np.arange(n, n + len(rec), dtype=np.uint64)
+                _scatter(rec, rec["h1"] % np.uint64(k), files)
+                n += len(rec)
+        finally:
+            for f in files:
+                f.close()
+
+        # 2. erstes Vorkommen markieren, 3. Eingabe erneut lesen und filtern
+        keep = np.lib.format.open_memmap(os.path.join(work, "keep.npy"), mode="w+",
+                                         dtype=np.uint8, shape=(n,))
+        _mark_first(work, k, keep, LINE_RECORD, ("h1", "h2"))
+        row = 0
+        with _open_text(out_file, "wt") as out:
+            for lines in _nt_blocks(in_file):
+                mask = keep[row:row + len(lines)]
+                out.write("".join(l for l, m in zip(lines, mask) if m))
+                row += len(lines)
+        kept = int(np.count_nonzero(keep))
+        del keep
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+    print(f"[✓] Duplikate entfernt: {n} -> {kept} Tripel ({n - kept} doppelt, {k} Buckets)")
+    return n, kept
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Doppelte Tripel entfernen (begrenzter Speicher)")
+    ap.add_argument("src", help="Term-Ordner (rdf_terms) oder .nt/.nt.gz-Datei")
+    ap.add_argument("dst", help="Ziel-Ordner bzw. -Datei")
+    ap.add_argument("--mem", type=int, default=MEM_BYTES, help="Bytes pro Bucket")
+    ap.add_argument("--tmp", default=None, help="Ordner für Zwischendateien")
+    args = ap.parse_args()
+    if os.path.isdir(args.src):
+        dedup_store(args.src, args.dst, args.mem, args.tmp)
+    else:
+        dedup_nt(args.src, args.dst, args.mem, args.tmp)
+
+
+if __name__ == "__main__":
+    main()
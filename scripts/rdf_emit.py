@@ -0,0 +1,293 @@
+# ---------------------- VEKTORISIERTE TRIPEL-AUSGABE -------------------------------
+"""
+Spaltenweise Erzeugung von N-Triples-Zeilen für einen ganzen DataFrame-Chunk.
+
+Ersetzt die ``df.iterrows()``-Schleifen der Transformationsskripte: Statt pro
+Zelle ``pd.isna``/``str()``/``Literal(...)`` aufzurufen, werden ``\\N``/NaN per
+Maske ausgefiltert, Subjekt-IRIs und Lexikalformen für den ganzen Chunk gebaut
+und die Zeilen spaltenweise als Text erzeugt.
+
+Die Zeilen entsprechen Byte für Byte dem, was rdflib beim ``serialize(format='nt')``
+für den zeilenweisen Pfad schreibt (gleiche Literal-Normalisierung, gleiches
+Escaping). Innerhalb eines Chunks werden Duplikate wie im rdflib-Store entfernt;
+nur die Reihenfolge der Zeilen ist eine andere.
+"""
+
+from decimal import Decimal
+from typing import Callable, Dict, Iterator
+
+import pandas as pd
+
+from rdf_iri import iris
+from rdf_literals import lits
+
+# Namespaces (als Strings, rdflib wird im Hot-Path nicht gebraucht)
+RES = 'http://example.org/imdb/resource/'
+IMD = 'http://example.org/imdb#'
+RDF_NS = 'http://www.w3.org/1999/02/22-rdf-syntax-ns#'
+RDFS_NS = 'http://www.w3.org/2000/01/rdf-schema#'
+XSD_NS = 'http://www.w3.org/2001/XMLSchema#'
+
+NULLS = {r'\N', ''}
+
+
+def _u(iri: str) -> str:
+    return f"<{iri}>"
+
+
+# Feste Terme in N-Triples-Schreibweise
+RDF_TYPE = _u(RDF_NS + 'type')
+RDFS_LABEL = _u(RDFS_NS + 'label')
+XSD_STRING = XSD_NS + 'string'
+XSD_INTEGER = XSD_NS + 'integer'
+XSD_DECIMAL = XSD_NS + 'decimal'
+XSD_BOOLEAN = XSD_NS + 'boolean'
+
+
+def imd(name: str) -> str:
+    return _u(IMD + name)
+
+
+# ------------------ Masken und Lexikalformen ------------------
+def valid(s: pd.Series) -> pd.Series:
+    """Entspricht ``not pd.isna(v) and str(v) not in {r'\\N', ''}``."""
+    return s.notna() & ~s.astype(str).isin(NULLS)
+
+
+def as_str(s: pd.Series) -> pd.Series:
+    """``str(v)`` für jede Zelle (NaN wird zu 'nan', wie im f-String)."""
+    return s.astype(str)
+
+
+def str_or_empty(s: pd.Series) -> pd.Series:
+    """``"" if pd.isna(v) else str(v)`` (auch für category- und Int64-Spalten)."""
+    return s.astype(object).where(s.notna(), '').astype(str)
+
+
+def map_unique(s: pd.Series, fn: Callable) -> pd.Series:
+    """Wendet ``fn`` nur einmal pro distinktem Wert an (für Spalten mit wenigen Werten)."""
+    if s.empty:
+        return s.astype(object)
+    lookup = {v: fn(v) for v in pd.unique(s)}
+    return s.map(lookup)
+
+
+def _try_int(v):
+    try:
+        return str(int(v))
+    except Exception:
+        return None
+
+
+def _try_decimal(v):
+    try:
+        # rdflib normalisiert xsd:decimal über Decimal -> f"{:f}"
+        return format(Decimal(str(float(v))), 'f')
+    except Exception:
+        return None
+
+
+def int_lex(s: pd.Series) -> pd.Series:
+    """Lexikalform wie ``Literal(int(v), datatype=XSD.integer)``; None, wenn int() scheitert."""
+    if pd.api.types.is_integer_dtype(s):
+        return s.astype(str)  # typisiert gelesen (Int64), NA ist bereits ausmaskiert
+    return map_unique(s, _try_int)
+
+
+def decimal_lex(s: pd.Series) -> pd.Series:
+    """Lexikalform wie ``Literal(str(float(v)), datatype=XSD.decimal)``."""
+    return map_unique(s, _try_decimal)
+
+
+def escape(s: pd.Series) -> pd.Series:
+    """Escaping wie ``rdflib.plugins.serializers.nt._quote_encode``."""
+    return (s.str.replace('\\', '\\\\', regex=False)
+             .str.replace('\n', '\\n', regex=False)
+             .str.replace('"', '\\"', regex=False)
+             .str.replace('\r', '\\r', regex=False))
+
+
+def literal(lex: pd.Series, datatype: str = XSD_STRING) -> pd.Series:
+    return '"' + escape(lex) + '"^^<' + datatype + '>'
+
+
+def category(values: pd.Series, datatype: str = XSD_STRING) -> pd.Series:
+    """``literal(as_str(values))`` für Spalten mit wenigen Werten (über den Literal-Cache)."""
+    return lits.series(values, datatype)
+
+
+def iri(kind: str, ids: pd.Series) -> pd.Series:
+    """``URIRef(to_iri(f"{RES}{kind}/{id}")).n3()`` für eine ganze Spalte (über die IRI-Fabrik)."""
+    return '<' + iris.series(kind, ids) + '>'
+
+
+def lines(s: pd.Series, p: str, o) -> pd.Series:
+    """Baut ``s p o .`` für alle Zeilen; ``o`` darf Series oder fester Term sein."""
+    if isinstance(o, pd.Series):
+        o = o.to_numpy()  # positionsgleich, Index kann durch explode() doppelt sein
+    return s + (' ' + p + ' ') + o + ' .\n'
+
+
+def split_list(s: pd.Series) -> pd.Series:
+    """Kommagetrennte Listen (genres, knownForTitles, directors …) explodieren,
+    Index bleibt der Zeilenindex, leere Einträge fallen weg."""
+    parts = as_str(s).str.split(',').explode().str.strip()
+    return parts[parts.notna() & (parts != '')]
+
+
+# ------------------ Emitter pro Tabelle ------------------
+def emit_title_basics(df: pd.DataFrame) -> Iterator[pd.Series]:
+    t = iri('title', as_str(df['tconst']))
+    yield lines(t, RDF_TYPE, imd('Title'))
+
+    tt = str_or_empty(df['titleType'])
+    yield lines(t[tt == 'tvSeries'], RDF_TYPE, imd('TVSeries'))
+    yield lines(t[tt == 'tvEpisode'], RDF_TYPE, imd('Episode'))
+
+    yield lines(t, imd('titleID'), literal(as_str(df['tconst'])))
+
+    for col in ('primaryTitle', 'originalTitle'):
+        m = valid(df[col])
+        yield lines(t[m], imd(col), literal(as_str(df[col][m])))
+
+    m = valid(df['isAdult'])
+    b = as_str(df['isAdult'][m]).str.lower().isin({'1', 'true', 't'})
+    yield lines(t[m], imd('isAdult'), category(b.map({True: 'true', False: 'false'}), XSD_BOOLEAN))
+
+    for col in ('startYear', 'endYear'):
+        m = valid(df[col])
+        yield lines(t[m], imd(col), category(df[col][m]))
+
+    m = valid(df['runtimeMinutes'])
+    lex = int_lex(df['runtimeMinutes'][m]).dropna()
+    yield lines(t.loc[lex.index], imd('runtimeMinutes'), literal(lex, XSD_INTEGER))
+
+    m = valid(df['titleType'])
+    yield lines(t[m], imd('type'), category(df['titleType'][m]))
+
+    m = valid(df['genres'])
+    g = split_list(df['genres'][m])
+    yield lines(t.loc[g.index], imd('genre'), category(g))
+
+
+def emit_title_ratings(df: pd.DataFrame) -> Iterator[pd.Series]:
+    tconst = as_str(df['tconst'])
+    r = iri('rating', tconst)
+    yield lines(r, RDF_TYPE, imd('Rating'))
+
+    m = valid(df['averageRating'])
+    lex = decimal_lex(df['averageRating'][m]).dropna()
+    yield lines(r.loc[lex.index], imd('averageRating'), literal(lex, XSD_DECIMAL))
+
+    m = valid(df['numVotes'])
+    lex = int_lex(df['numVotes'][m]).dropna()
+    yield lines(r.loc[lex.index], imd('numVotes'), literal(lex, XSD_INTEGER))
+
+    yield lines(iri('title', tconst), imd('hasRating'), r)
+
+
+def emit_title_akas(df: pd.DataFrame) -> Iterator[pd.Series]:
+    titleId = as_str(df['titleId'])
+    a = iri('akas', titleId + '/' + as_str(df['ordering']))
+    yield lines(a, RDF_TYPE, imd('AlternateTitle'))
+
+    ordering = df['ordering'][df['ordering'].notna()]
+    lex = int_lex(ordering).dropna()
+    yield lines(a.loc[lex.index], imd('order'), literal(lex, XSD_INTEGER))
+
+    m = valid(df['title'])
+    yield lines(a[m], imd('alternateTitle'), literal(as_str(df['title'][m])))
+    for col in ('region', 'language'):
+        m = valid(df[col])
+        yield lines(a[m], imd(col), category(df[col][m]))
+
+    yield lines(iri('title', titleId), imd('hasAlternateTitle'), a)
+
+
+def emit_title_episode(df: pd.DataFrame) -> Iterator[pd.Series]:
+    t = iri('title', as_str(df['tconst']))
+    yield lines(t, RDF_TYPE, imd('Episode'))
+
+    for col in ('seasonNumber', 'episodeNumber'):
+        m = valid(df[col])
+        lex = int_lex(df[col][m]).dropna()
+        yield lines(t.loc[lex.index], imd(col), literal(lex, XSD_INTEGER))
+
+    m = valid(df['parentTconst'])
+    yield lines(t[m], imd('parentSeries'), iri('title', as_str(df['parentTconst'][m])))
+
+
+def emit_name_basics(df: pd.DataFrame) -> Iterator[pd.Series]:
+    nconst = as_str(df['nconst'])
+    p = iri('person', nconst)
+    yield lines(p, RDF_TYPE, imd('Person'))
+    yield lines(p, imd('personID'), literal(nconst))
+
+    m = valid(df['primaryName'])
+    yield lines(p[m], RDFS_LABEL, literal(as_str(df['primaryName'][m])))
+
+    for col in ('birthYear', 'deathYear'):
+        m = valid(df[col])
+        yield lines(p[m], imd(col), category(df[col][m]))
+
+    prof = str_or_empty(df['primaryProfession'])
+    female = prof.str.contains('actress', regex=False)
+    male = ~female & prof.str.contains('actor', regex=False)
+    yield lines(p[female], imd('gender'), lits.nt('female'))
+    yield lines(p[male], imd('gender'), lits.nt('male'))
+
+    m = valid(df['knownForTitles'])
+    kf = split_list(df['knownForTitles'][m])
+    yield lines(p.loc[kf.index], imd('knownFor'), iri('title', kf))
+
+
+def _roles(tconst: pd.Series, role_name: pd.Series, nconst: pd.Series) -> Iterator[pd.Series]:
+    """Die vier Tripel eines Rollen-Knotens (gemeinsam für crew und principals)."""
+    person = iri('person', nconst)
+    role = iri('role', tconst + '/' + role_name + '/' + nconst)
+    yield lines(role, RDF_TYPE, imd('Role'))
+    yield lines(role, imd('roleName'), category(role_name))
+    yield lines(person, imd('hasRole'), role)
+    yield lines(role, imd('roleIn'), iri('title', tconst))
+
+
+def emit_title_crew(df: pd.DataFrame) -> Iterator[pd.Series]:
+    tconst = as_str(df['tconst'])
+    for role_name, col in [("director", "directors"), ("writer", "writers")]:
+        m = valid(df[col])
+        n = split_list(df[col][m])
+        yield from _roles(tconst.loc[n.index], pd.Series(role_name, index=n.index), n)
+
+
+def emit_title_principals(df: pd.DataFrame) -> Iterator[pd.Series]:
+    df = df[valid(df['tconst']) & valid(df['nconst'])]
+
+    cat = str_or_empty(df['category']).str.strip()
+    cat = cat.mask(cat == 'actress', 'actor')
+    job = str_or_empty(df['job']).str.strip()
+    cat = cat.mask(cat == '', job)
+    cat = cat.mask(cat == '', 'role')
+
+    yield from _roles(as_str(df['tconst']), cat, as_str(df['nconst']))
+
+
+EMITTERS: Dict[str, Callable[[pd.DataFrame], Iterator[pd.Series]]] = {
+    "title.basics": emit_title_basics,
+    "title.ratings": emit_title_ratings,
+    "title.akas": emit_title_akas,
+    "title.episode": emit_title_episode,
+    "name.basics": emit_name_basics,
+    "title.crew": emit_title_crew,
+    "title.principals": emit_title_principals,
+}
+
+
+def emit_lines(table: str, df: pd.DataFrame) -> Iterator[str]:
+    """Alle N-Triples-Zeilen eines Chunks, ohne Duplikate (wie im rdflib-Store)."""
+    seen = dict.fromkeys(line for block in EMITTERS[table](df) for line in block.tolist())
+    return iter(seen)
+
+
+def emit_chunk(table: str, df: pd.DataFrame) -> str:
+    """N-Triples-Text eines Chunks, bereit zum Anhängen an die Ausgabedatei."""
+    return "".join(emit_lines(table, df))
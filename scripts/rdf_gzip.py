@@ -0,0 +1,173 @@
+# ---------------------- GZIP MIT MEHREREN THREADS -------------------------------
+"""
+gzip-Ein-/Ausgabe, die nicht mehr am einzelnen zlib-Strom hängt.
+
+- ``ThreadedGzipReader``: ein Hintergrund-Thread dekomprimiert die .tsv.gz und
+  legt die Blöcke in eine begrenzte Queue; der Parser-Thread liest nur noch
+  fertige Bytes. zlib gibt die GIL frei, Dekomprimieren und Parsen laufen also
+  wirklich gleichzeitig.
+- ``ParallelGzipWriter``: schneidet die Ausgabe in Blöcke (``BLOCK_SIZE``) und
+  komprimiert sie in einem Thread-Pool, jeder Block wird ein eigenes gzip-Member
+  (wie pigz). Aneinandergehängte Member sind Standard-gzip (RFC 1952) und werden
+  von zcat, Python, TriplyDB usw. ohne Weiteres gelesen.
+"""
+
+import gzip
+import io
+import os
+import queue
+import threading
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+# Lesen: Größe der Lesezugriffe auf die .gz-Datei und Anzahl gepufferter Blöcke
+READ_SIZE = 1 << 20
+QUEUE_BLOCKS = 16
+
+# Schreiben: unkomprimierte Blockgröße pro gzip-Member und Anzahl Threads
+BLOCK_SIZE = 1 << 22
+WRITE_THREADS = os.cpu_count() or 1
+
+
+class ThreadedGzipReader(io.RawIOBase):
+    """Lesbarer Datenstrom über einer .gz-Datei, dekomprimiert in einem Hintergrund-Thread.
+
+    ``raw_offset`` ist die Stelle in der .gz-Datei, bis zu der die zuletzt
+    gelieferten Bytes stammen. Mehrere gzip-Member hintereinander werden unterstützt.
+    """
+
+    def __init__(self, path, read_size=READ_SIZE, queue_blocks=QUEUE_BLOCKS):
+        super().__init__()
+        self._file = open(path, "rb")
+        self._read_size = read_size
+        self._queue = queue.Queue(maxsize=queue_blocks)
+        self._stop = threading.Event()
+        self._buf = memoryview(b"")
+        self._eof = False
+        self._pos = 0
+        self.raw_offset = 0
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    # -------- Hintergrund-Thread --------
+    def _put(self, item):
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _run(self):
+        try:
+            d = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            started = False  # hat das aktuelle Member schon Eingabe bekommen?
+            while True:
+                data = self._file.read(self._read_size)
+                if not data:
+                    break
+                while data:
+                    started = True
+                    out = d.decompress(data)
+                    if out and not self._put((out, self._file.tell())):
+                        return
+                    if d.eof:
+                        # nächstes Member (z. B. von ParallelGzipWriter oder pigz)
+                        data = d.unused_data
+                        d = zlib.decompressobj(16 + zlib.MAX_WBITS)
+                        started = False
+                    else:
+                        data = b""
+            if started:
+                # wie gzip.open: abgeschnittene Datei nicht als vollständig ausgeben
+                raise EOFError("Compressed file ended before the end-of-stream marker was reached")
+            self._put((None, self._file.tell()))
+        except BaseException as e:  # im Leser-Thread erneut auslösen
+            self._put((e, None))
+
+    # -------- RawIOBase --------
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        while not self._buf:
+            if self._eof:
+                return 0
+            item, offset = self._queue.get()
+            if item is None:
+                self._eof = True
+                return 0
+            if isinstance(item, BaseException):
+                raise item
+            self._buf = memoryview(item)
+            self.raw_offset = offset
+        n = min(len(b), len(self._buf))
+        b[:n] = self._buf[:n]
+        self._buf = self._buf[n:]
+        self._pos += n
+        return n
+
+    def tell(self):
+        return self._pos
+
+    def close(self):
+        if not self.closed:
+            self._stop.set()
+            self._thread.join()
+            self._file.close()
+        super().close()
+
+
+def open_gzip_reader(path, threaded=True):
+    """Gepufferter Leser über einer .gz-Datei; liefert (Datenstrom, Offset-Funktion)."""
+    if threaded:
+        raw = ThreadedGzipReader(path)
+        return io.BufferedReader(raw, buffer_size=READ_SIZE), lambda: raw.raw_offset
+    gz = gzip.open(path, "rb")
+    return gz, gz.fileobj.tell
+
+
+class ParallelGzipWriter:
+    """Block-parallele gzip-Kompression in eine offene Binärdatei (pigz-artig).
+
+    ``flush()`` schreibt alle bisherigen Daten als vollständige Member; danach
+    endet die Datei an einer Member-Grenze und kann dort abgeschnitten werden.
+    """
+
+    def __init__(self, fileobj, threads=WRITE_THREADS, compresslevel=6, block_size=BLOCK_SIZE):
+        self._file = fileobj
+        self._level = compresslevel
+        self._block_size = block_size
+        self._pool = ThreadPoolExecutor(max_workers=max(1, threads))
+        self._pending = deque()
+        self._max_pending = 2 * max(1, threads)
+        self._buf = bytearray()
+
+    def _submit(self, data):
+        # mtime=0: zlib-Schnellpfad von gzip.compress, gibt die GIL frei
+        self._pending.append(self._pool.submit(gzip.compress, data, self._level, mtime=0))
+        # Reihenfolge bleibt erhalten, höchstens 2 Blöcke pro Thread im Speicher
+        while len(self._pending) > self._max_pending:
+            self._file.write(self._pending.popleft().result())
+
+    def write(self, data):
+        self._buf += data
+        while len(self._buf) >= self._block_size:
+            self._submit(bytes(self._buf[:self._block_size]))
+            del self._buf[:self._block_size]
+        return len(data)
+
+    def flush(self):
+        if self._buf:
+            self._submit(bytes(self._buf))
+            self._buf = bytearray()
+        while self._pending:
+            self._file.write(self._pending.popleft().result())
+        self._file.flush()
+
+    def close(self):
+        """Restdaten schreiben; die darunterliegende Datei bleibt offen."""
+        self.flush()
+        self._pool.shutdown()
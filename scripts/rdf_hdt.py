@@ -0,0 +1,743 @@
+# ---------------------- HDT-EXPORT (KOMPRIMIERT, ABFRAGBAR) -------------------------------
+"""
+Schreibt die Ausgabe der Transformation als eine binäre Datei nach dem Aufbau
+von HDT (Header, Dictionary, Triples) und beantwortet Tripelmuster direkt aus
+der per mmap geöffneten Datei, ohne Triple Store.
+
+Dictionary: vier Abschnitte wie in HDT, jeweils bytewise sortiert und in
+Blöcken zu ``DICT_BLOCK`` Termen front-codiert (erster Term vollständig, danach
+Länge des gemeinsamen Präfixes + Rest):
+
+- ``shared``      Terme, die Subjekt und Objekt sind (IDs 0 .. |shared|-1 in beiden Rollen)
+- ``subjects``    nur Subjekt (Subjekt-IDs ab |shared|)
+- ``objects``     nur Objekt, also auch alle Literale (Objekt-IDs ab |shared|)
+- ``predicates``  eigener ID-Raum
+
+Triples (Bitmap Triples, Reihenfolge SPO, ohne Duplikate):
+
+- ``Y``/``Bp``  Prädikat je (Subjekt, Prädikat)-Paar; eine 1 in Bp beendet ein Subjekt
+- ``Z``/``Bo``  Objekt je Tripel; eine 1 in Bo beendet ein Paar
+- zu jedem Bitfeld ein Rang-Verzeichnis (Einsen vor jedem 64-Bit-Wort) für rank/select
+- ``P.idx``/``P.off`` Paare nach Prädikat und ``O.idx``/``O.off`` Tripel nach Objekt,
+  damit auch ``? p ?``, ``? ? o`` und ``? p o`` ohne Scan gehen (wie HDT-FoQ)
+
+Gebaut wird im externen Speicher aus einem ``rdf_terms``-Ordner (oder über einen
+temporären aus N-Triples, Shard-Manifest, Ordner; dessen Wörterbuch ist die
+Hash-Tabelle auf der Platte aus ``rdf_terms``): Terme in sortierten Läufen
+plus k-Wege-Merge, Tripel nach Subjekt-Bereichen in Buckets wie in ``rdf_dedup``.
+Das Format ist an HDT angelehnt, aber nicht binärkompatibel zu hdt-cpp/hdt-java.
+
+Aufruf:  python rdf_hdt.py build imdb_terms imdb.hdt
+         python rdf_hdt.py build imdb_shard_manifest.json imdb.hdt --mem 2000000000
+         python rdf_hdt.py query imdb.hdt --p rdf:type --o imd:Title --limit 10
+         python rdf_hdt.py info imdb.hdt
+"""
+
+import argparse
+import heapq
+import json
+import mmap
+import os
+import shutil
+import struct
+import tempfile
+import time
+
+import numpy as np
+
+from rdf_terms import TermStore, TermTable
+from rdf_writer import TURTLE_PREFIXES
+
+MAGIC = b"IMDBHDT1"
+
+# Terme pro front-codiertem Block (größer = kleiner, Zugriff langsamer)
+DICT_BLOCK = 16
+
+# Speicher pro Bucket beim Sortieren der Tripel (Bytes)
+MEM_BYTES = 1 << 30
+
+# Terme pro sortiertem Lauf beim Aufbau des Dictionary
+RUN_TERMS = 2_000_000
+
+# Tripel pro Lese-/Schreibblock
+BLOCK = 4_000_000
+
+# Positionen pro Durchgang bei select (64 Byte Zwischenspeicher je Position)
+SELECT_CHUNK = 1 << 16
+
+SECTIONS = ("shared", "subjects", "predicates", "objects")
+
+_ROLE_S, _ROLE_P, _ROLE_O = 1, 2, 4
+_POP8 = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+# ------------------ Hilfsfunktionen ------------------
+def _varint(n: int) -> bytes:
+    out = bytearray()
+    while n >= 0x80:
+        out.append(n & 0x7F | 0x80)
+        n >>= 7
+    out.append(n)
+    return bytes(out)
+
+
+def _read_varint(buf, i):
+    n = shift = 0
+    while True:
+        b = buf[i]
+        i += 1
+        n |= (b & 0x7F) << shift
+        if b < 0x80:
+            return n, i
+        shift += 7
+
+
+def _common_prefix(a: bytes, b: bytes) -> int:
+    # binäre Suche über Slice-Vergleiche (in C) statt Zeichen für Zeichen
+    lo, hi = 0, min(len(a), len(b))
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[:mid] == b[:mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def _popcount(words):
+    return _POP8[np.ascontiguousarray(words).view(np.uint8)].reshape(-1, 8).sum(axis=1, dtype=np.uint64)
+
+
+def _id_dtype(n):
+    return np.dtype(np.uint32 if n < 1 << 32 else np.uint64)
+
+
+def rank1(words, cum, i):
+    """Einsen vor Position ``i`` (Array) in einem Bitfeld aus 64-Bit-Wörtern."""
+    i = np.asarray(i, dtype=np.int64)
+    w = i >> 6
+    mask = (np.uint64(1) << (i & 63).astype(np.uint64)) - np.uint64(1)
+    return (cum[w] + _popcount(words[w] & mask)).astype(np.int64)
+
+
+def select1(words, cum, k):
+    """Position der ``k``-ten Eins (0-basiert, Array)."""
+    k = np.asarray(k, dtype=np.uint64)
+    w = np.searchsorted(cum, k, side="right") - 1
+    r = (k - cum[w]).astype(np.int64)
+    out = np.empty(len(k), dtype=np.int64)
+    for a in range(0, len(k), SELECT_CHUNK):
+        bits = np.unpackbits(words[w[a:a + SELECT_CHUNK]].view(np.uint8).reshape(-1, 8),
+                             axis=1, bitorder="little")
+        out[a:a + SELECT_CHUNK] = np.argmax(np.cumsum(bits, axis=1) > r[a:a + SELECT_CHUNK, None], axis=1)
+    return (w.astype(np.int64) << 6) + out
+
+
+# ------------------ Schreiben: Bausteine ------------------
+class _DictWriter:
+    """Ein front-codierter Dictionary-Abschnitt (Daten + Block-Offsets)."""
+
+    def __init__(self, path):
+        self.path = path
+        self._data = open(path, "wb", buffering=1 << 20)
+        self._blocks = open(path + ".blocks", "wb")
+        self._offsets = []
+        self._prev = b""
+        self.count = 0
+        self.size = 0
+
+    def add(self, term: bytes):
+        if self.count % DICT_BLOCK == 0:
+            self._offsets.append(self.size)
+            rec = _varint(len(term)) + term
+        else:
+            n = _common_prefix(self._prev, term)
+            rec = _varint(n) + _varint(len(term) - n) + term[n:]
+        self._data.write(rec)
+        self.size += len(rec)
+        self._prev = term
+        self.count += 1
+        if len(self._offsets) >= 1 << 16:
+            np.array(self._offsets, dtype=np.uint64).tofile(self._blocks)
+            self._offsets = []
+
+    def close(self):
+        np.array(self._offsets + [self.size], dtype=np.uint64).tofile(self._blocks)
+        self._data.close()
+        self._blocks.close()
+        return -(-self.count // DICT_BLOCK) + 1
+
+
+class _BitWriter:
+    """Bitfeld stückweise schreiben (Bit i = Bit i % 64 im Wort i // 64, little-endian)."""
+
+    def __init__(self, path):
+        self.path = path
+        self._f = open(path, "wb")
+        self._carry = np.zeros(0, dtype=bool)
+
+    def add(self, bits):
+        bits = np.concatenate([self._carry, bits])
+        n = len(bits) // 8 * 8
+        np.packbits(bits[:n], bitorder="little").tofile(self._f)
+        self._carry = bits[n:]
+
+    def close(self):
+        total = self._f.tell() * 8 + len(self._carry)
+        if len(self._carry):
+            np.packbits(self._carry, bitorder="little").tofile(self._f)
+        # auf ganze Wörter auffüllen, plus ein leeres Wort für rank1 am Ende
+        self._f.write(b"\0" * (-self._f.tell() % 8 + 8))
+        self._f.close()
+        return total, os.path.getsize(self.path) // 8
+
+
+def _rank_directory(bitmap, nwords, out):
+    words = np.memmap(bitmap, dtype="<u8", mode="r", shape=(nwords,))
+    total = np.uint64(0)
+    with open(out, "wb") as f:
+        np.zeros(1, dtype=np.uint64).tofile(f)
+        for a in range(0, nwords, BLOCK):
+            cum = np.cumsum(_popcount(words[a:a + BLOCK]), dtype=np.uint64) + total
+            cum.tofile(f)
+            total = cum[-1]
+    return nwords + 1
+
+
+# ------------------ Schreiben: Dictionary ------------------
+def _roles(table, work):
+    """Rolle je Term (Bit 1 Subjekt, 2 Prädikat, 4 Objekt)."""
+    role = np.lib.format.open_memmap(os.path.join(work, "role.npy"), mode="w+",
+                                     dtype=np.uint8, shape=(table.meta["terms"],))
+    for col, bit in zip(table.triples(), (_ROLE_S, _ROLE_P, _ROLE_O)):
+        for a in range(0, len(table), BLOCK):
+            idx = col[a:a + BLOCK]
+            role[idx] |= bit
+    return role
+
+
+def _runs(table, role, work):
+    """Benutzte Terme in sortierten Läufen (ID + Länge + Bytes je Eintrag)."""
+    paths = []
+    for a in range(0, len(role), RUN_TERMS):
+        b = min(a + RUN_TERMS, len(role))
+        used = np.flatnonzero(role[a:b]).tolist()
+        terms = table.term_bytes(a, b)
+        path = os.path.join(work, f"run{len(paths):04d}.bin")
+        with open(path, "wb", buffering=1 << 20) as f:
+            for term, i in sorted((terms[i], a + i) for i in used):
+                f.write(struct.pack("<QI", i, len(term)) + term)
+        paths.append(path)
+    return paths
+
+
+def _read_run(path):
+    with open(path, "rb", buffering=1 << 20) as f:
+        while True:
+            head = f.read(12)
+            if not head:
+                return
+            i, n = struct.unpack("<QI", head)
+            yield f.read(n), i
+
+
+def _dictionary(table, work, parts):
+    """Dictionary-Abschnitte schreiben; liefert Abbildungen alte Term-ID -> Subjekt/Prädikat/Objekt-ID."""
+    role = _roles(table, work)
+    n = len(role)
+    dt = _id_dtype(n)
+    maps = {r: np.lib.format.open_memmap(os.path.join(work, f"map_{r}.npy"), mode="w+", dtype=dt, shape=(n,))
+            for r in "spo"}
+    writers = {name: _DictWriter(os.path.join(work, f"dict_{name}.bin")) for name in SECTIONS}
+    # Zuordnungen gesammelt setzen statt Element für Element in die memmaps
+    pending = {r: ([], []) for r in "spo"}
+
+    def put(r, i, v):
+        ids, vals = pending[r]
+        ids.append(i)
+        vals.append(v)
+        if len(ids) >= 1 << 20:
+            flush(r)
+
+    def flush(r):
+        ids, vals = pending[r]
+        if ids:
+            maps[r][np.array(ids)] = vals
+        pending[r] = ([], [])
+
+    for term, i in heapq.merge(*(_read_run(p) for p in _runs(table, role, work))):
+        r = int(role[i])
+        if r & _ROLE_P:
+            put("p", i, writers["predicates"].count)
+            writers["predicates"].add(term)
+        so = r & (_ROLE_S | _ROLE_O)
+        if so == _ROLE_S | _ROLE_O:
+            put("s", i, writers["shared"].count)
+            put("o", i, writers["shared"].count)
+            writers["shared"].add(term)
+        elif so == _ROLE_S:
+            put("s", i, writers["subjects"].count)
+            writers["subjects"].add(term)
+        elif so == _ROLE_O:
+            put("o", i, writers["objects"].count)
+            writers["objects"].add(term)
+    for r in "spo":
+        flush(r)
+
+    counts = {}
+    for name, w in writers.items():
+        blocks = w.close()
+        counts[name] = w.count
+        parts.append((f"dict.{name}", w.path, "u1", w.size))
+        parts.append((f"dict.{name}.blocks", w.path + ".blocks", "<u8", blocks))
+    # reine Subjekte/Objekte hinter die gemeinsamen Terme schieben
+    shared = counts["shared"]
+    for a in range(0, n, BLOCK):
+        so = role[a:a + BLOCK] & (_ROLE_S | _ROLE_O)
+        for r, only in (("s", _ROLE_S), ("o", _ROLE_O)):
+            m = np.flatnonzero(so == only) + a
+            maps[r][m] += shared
+    return maps, counts
+
+
+# ------------------ Schreiben: Tripel ------------------
+def _bucket_files(work, prefix, k):
+    return [os.path.join(work, f"{prefix}{b:04d}.bin") for b in range(k)]
+
+
+def _partition(paths, keys, rec, k, n_keys):
+    """Datensätze nach Schlüsselbereich (gleich breite Bereiche) auf ``k`` Dateien verteilen."""
+    bucket = (keys.astype(np.uint64) * np.uint64(k)) // np.uint64(max(n_keys, 1))
+    order = np.argsort(bucket, kind="stable")
+    bounds = np.searchsorted(bucket[order], np.arange(k + 1, dtype=np.uint64))
+    for b in range(k):
+        if bounds[b] < bounds[b + 1]:
+            with open(paths[b], "ab") as f:
+                rec[order[bounds[b]:bounds[b + 1]]].tofile(f)
+
+
+def _triples(table, maps, counts, work, parts, mem_bytes):
+    n = len(table)
+    n_s = counts["shared"] + counts["subjects"]
+    n_o = counts["shared"] + counts["objects"]
+    id_dt = _id_dtype(max(n_s, n_o, counts["predicates"]))
+    pos_dt = _id_dtype(n)
+    spo = np.dtype([("s", id_dt), ("p", id_dt), ("o", id_dt)])
+    opos = np.dtype([("o", id_dt), ("pos", pos_dt)])
+
+    # 1. nach Subjekt-Bereichen partitionieren (neue IDs)
+    k = max(1, -(-n * spo.itemsize // mem_bytes))
+    s_files = _bucket_files(work, "spo", k)
+    s, p, o = table.triples()
+    for a in range(0, n, BLOCK):
+        rec = np.empty(min(BLOCK, n - a), dtype=spo)
+        rec["s"] = maps["s"][s[a:a + BLOCK]]
+        rec["p"] = maps["p"][p[a:a + BLOCK]]
+        rec["o"] = maps["o"][o[a:a + BLOCK]]
+        _partition(s_files, rec["s"], rec, k, n_s)
+
+    # 2. je Bucket sortieren, Duplikate entfernen, Y/Z und Bitfelder anhängen
+    k_o = max(1, -(-n * opos.itemsize // mem_bytes))
+    o_files = _bucket_files(work, "ops", k_o)
+    y_path, z_path = os.path.join(work, "Y.bin"), os.path.join(work, "Z.bin")
+    bp, bo = _BitWriter(os.path.join(work, "Bp.bin")), _BitWriter(os.path.join(work, "Bo.bin"))
+    triples = pairs = 0
+    with open(y_path, "wb") as fy, open(z_path, "wb") as fz:
+        for path in s_files:
+            if not os.path.exists(path):
+                continue
+            rec = np.fromfile(path, dtype=spo)
+            os.remove(path)
+            rec = rec[np.lexsort((rec["o"], rec["p"], rec["s"]))]
+            keep = np.ones(len(rec), dtype=bool)
+            keep[1:] = ((rec["s"][1:] != rec["s"][:-1]) | (rec["p"][1:] != rec["p"][:-1])
+                        | (rec["o"][1:] != rec["o"][:-1]))
+            rec = rec[keep]
+            # Paar-Anfänge; Bo = letztes Tripel eines Paares, Bp = letztes Paar eines Subjekts
+            start = np.ones(len(rec), dtype=bool)
+            start[1:] = (rec["s"][1:] != rec["s"][:-1]) | (rec["p"][1:] != rec["p"][:-1])
+            bo.add(np.append(start[1:], True))
+            ps = rec["s"][start]
+            bp.add(np.append(ps[1:] != ps[:-1], True))
+            rec["p"][start].tofile(fy)
+            rec["o"].tofile(fz)
+            ops = np.empty(len(rec), dtype=opos)
+            ops["o"], ops["pos"] = rec["o"], np.arange(triples, triples + len(rec))
+            _partition(o_files, ops["o"], ops, k_o, n_o)
+            triples += len(rec)
+            pairs += int(start.sum())
+    nbits_p, words_p = bp.close()
+    nbits_o, words_o = bo.close()
+    parts += [("Y", y_path, id_dt.str, pairs), ("Z", z_path, id_dt.str, triples),
+              ("Bp", bp.path, "<u8", words_p),
+              ("Bp.rank", bp.path + ".rank", "<u8", _rank_directory(bp.path, words_p, bp.path + ".rank")),
+              ("Bo", bo.path, "<u8", words_o),
+              ("Bo.rank", bo.path + ".rank", "<u8", _rank_directory(bo.path, words_o, bo.path + ".rank"))]
+
+    # 3. Objekt-Index: Tripel-Positionen je Objekt, Reihenfolge innerhalb wie SPO
+    idx_path, off_path = os.path.join(work, "O.idx"), os.path.join(work, "O.off")
+    total = 0
+    with open(idx_path, "wb") as fi, open(off_path, "wb") as fo:
+        np.zeros(1, dtype=np.uint64).tofile(fo)
+        for b, path in enumerate(o_files):
+            lo, hi = -(-b * n_o // k_o), -(-(b + 1) * n_o // k_o)
+            rec = np.fromfile(path, dtype=opos) if os.path.exists(path) else np.empty(0, dtype=opos)
+            if os.path.exists(path):
+                os.remove(path)
+            rec = rec[np.argsort(rec["o"], kind="stable")]
+            rec["pos"].tofile(fi)
+            cnt = np.bincount(rec["o"] - lo, minlength=hi - lo) if len(rec) else np.zeros(hi - lo, np.int64)
+            (np.cumsum(cnt, dtype=np.uint64) + np.uint64(total)).tofile(fo)
+            total += len(rec)
+    parts += [("O.idx", idx_path, pos_dt.str, triples), ("O.off", off_path, "<u8", n_o + 1)]
+
+    # 4. Prädikat-Index: Paar-Positionen je Prädikat (stabiles Counting Sort)
+    n_p = counts["predicates"]
+    pidx_path = os.path.join(work, "P.idx")
+    open(pidx_path, "wb").close()
+    cnt = np.zeros(n_p, dtype=np.int64)
+    if pairs:
+        y = np.memmap(y_path, dtype=id_dt, mode="r", shape=(pairs,))
+        for a in range(0, pairs, BLOCK):
+            cnt += np.bincount(y[a:a + BLOCK], minlength=n_p)
+        pidx = np.memmap(pidx_path, dtype=pos_dt, mode="w+", shape=(pairs,))
+        cursor = np.concatenate([[0], np.cumsum(cnt)[:-1]])
+        for a in range(0, pairs, BLOCK):
+            blk = np.asarray(y[a:a + BLOCK])
+            order = np.argsort(blk, kind="stable")
+            ys = blk[order]
+            first = np.searchsorted(ys, ys, side="left")
+            pidx[cursor[ys] + np.arange(len(ys)) - first] = order + a
+            cursor += np.bincount(ys, minlength=n_p)
+        pidx.flush()
+        del pidx, y
+    with open(pidx_path + ".off", "wb") as f:
+        np.concatenate([[0], np.cumsum(cnt)]).astype(np.uint64).tofile(f)
+    parts += [("P.idx", pidx_path, pos_dt.str, pairs), ("P.off", pidx_path + ".off", "<u8", n_p + 1)]
+    return {"triples": triples, "pairs": pairs}
+
+
+def _assemble(out_file, parts, counts):
+    sections, offset = {}, 0
+    for name, _, dtype, count in parts:
+        sections[name] = {"offset": offset, "dtype": dtype, "count": int(count)}
+        offset += -(-np.dtype(dtype).itemsize * int(count) // 8) * 8
+    header = json.dumps({"format": "imdb-hdt", "version": 1, "dict_block": DICT_BLOCK,
+                         "counts": counts, "sections": sections}).encode("utf-8")
+    tmp = out_file + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(MAGIC + struct.pack("<Q", len(header)) + header)
+        f.write(b"\0" * (-f.tell() % 8))
+        for name, path, dtype, count in parts:
+            size = np.dtype(dtype).itemsize * int(count)
+            with open(path, "rb") as src:
+                shutil.copyfileobj(src, f, 1 << 20)
+            f.write(b"\0" * (-size % 8))
+    os.replace(tmp, out_file)
+
+
+def _load_text(src, terms_dir):
+    """N-Triples (Datei, Manifest, Ordner) in einen temporären Term-Ordner (Wörterbuch auf der Platte).
+
+    Echtes Turtle lehnt ``read_blocks`` mit ValueError ab.
+    """
+    from rdf_stats import read_blocks
+    from rdf_store import sources
+
+    with TermStore(terms_dir) as store:
+        for path in sources(src):
+            for data in read_blocks(path):
+                store.write("".join(l for l in data.splitlines(keepends=True)
+                                    if l.strip() and not l.startswith("@prefix")))
+    return terms_dir
+
+
+def build(src, out_file, mem_bytes=MEM_BYTES, tmp_dir=None):
+    """HDT-Datei aus einem Term-Ordner bzw. N-Triples-Ausgabe bauen; liefert die Zähler."""
+    work = tempfile.mkdtemp(prefix="hdt_", dir=tmp_dir or os.path.dirname(os.path.abspath(out_file)))
+    try:
+        terms_dir = src
+        if not os.path.exists(os.path.join(src, "meta.json")):
+            terms_dir = _load_text(src, os.path.join(work, "terms"))
+        table = TermTable(terms_dir)
+        parts = []
+        maps, counts = _dictionary(table, work, parts)
+        counts.update(_triples(table, maps, counts, work, parts, mem_bytes))
+        del maps
+        _assemble(out_file, parts, counts)
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+    return counts
+
+
+# ------------------ Lesen ------------------
+class _Dictionary:
+    """Ein front-codierter Abschnitt direkt aus der mmap."""
+
+    def __init__(self, data, blocks, count):
+        self._data = data        # np.uint8-Sicht
+        self._blocks = blocks    # Block-Anfänge + Ende
+        self.count = count
+
+    def _block(self, b):
+        return self._data[int(self._blocks[b]):int(self._blocks[b + 1])].tobytes()
+
+    def _first(self, b):
+        buf = self._block(b)
+        n, i = _read_varint(buf, 0)
+        return buf[i:i + n]
+
+    def _iter_block(self, b):
+        buf = self._block(b)
+        n, i = _read_varint(buf, 0)
+        term = buf[i:i + n]
+        i += n
+        yield term
+        while i < len(buf):
+            shared, i = _read_varint(buf, i)
+            n, i = _read_varint(buf, i)
+            term = term[:shared] + buf[i:i + n]
+            i += n
+            yield term
+
+    def term(self, i) -> bytes:
+        for k, t in enumerate(self._iter_block(i // DICT_BLOCK)):
+            if k == i % DICT_BLOCK:
+                return t
+        raise IndexError(i)
+
+    def locate(self, term: bytes) -> int:
+        """Index des Terms oder -1 (binäre Suche über die ersten Terme der Blöcke)."""
+        lo, hi = 0, len(self._blocks) - 2
+        if hi < 0:
+            return -1
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if self._first(mid) <= term:
+                lo = mid
+            else:
+                hi = mid - 1
+        for k, t in enumerate(self._iter_block(lo)):
+            if t == term:
+                return lo * DICT_BLOCK + k
+            if t > term:
+                break
+        return -1
+
+
+class HDT:
+    """Tripelmuster auf einer mit ``build`` erzeugten Datei; Terme in N-Triples-Schreibweise."""
+
+    def __init__(self, path):
+        self._file = open(path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mm[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path}: keine HDT-Datei dieses Formats")
+        (size,) = struct.unpack("<Q", self._mm[8:16])
+        self.header = json.loads(self._mm[16:16 + size])
+        base = 16 + size + (-(16 + size) % 8)
+        self.counts = self.header["counts"]
+        self._a = {name: np.frombuffer(self._mm, dtype=np.dtype(s["dtype"]), count=s["count"],
+                                       offset=base + s["offset"])
+                   for name, s in self.header["sections"].items()}
+        self.dict = {name: _Dictionary(self._a[f"dict.{name}"], self._a[f"dict.{name}.blocks"],
+                                       self.counts[name]) for name in SECTIONS}
+        self._shared = self.counts["shared"]
+
+    def __len__(self):
+        return self.counts["triples"]
+
+    def close(self):
+        self._a = self.dict = None
+        self._mm.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    # -------- Terme <-> IDs --------
+    def _id(self, term, role):
+        t = term.encode("utf-8")
+        if role == "p":
+            return self.dict["predicates"].locate(t)
+        i = self.dict["shared"].locate(t)
+        if i >= 0:
+            return i
+        i = self.dict["subjects" if role == "s" else "objects"].locate(t)
+        return i + self._shared if i >= 0 else -1
+
+    def _term(self, i, role):
+        if role == "p":
+            return self.dict["predicates"].term(i).decode("utf-8")
+        if i < self._shared:
+            return self.dict["shared"].term(i).decode("utf-8")
+        return self.dict["subjects" if role == "s" else "objects"].term(i - self._shared).decode("utf-8")
+
+    def terms(self, ids, role):
+        """IDs einer Rolle -> Terme (jeder nur einmal dekodiert)."""
+        u, inv = np.unique(ids, return_inverse=True)
+        return np.array([self._term(int(i), role) for i in u], dtype=object)[inv]
+
+    # -------- Muster über IDs --------
+    def _objects(self, j):
+        """Tripel-Positionen aller Paare ``j``: (Paar je Tripel, Position)."""
+        j = np.asarray(j, dtype=np.int64)
+        words, cum = self._a["Bo"], self._a["Bo.rank"]
+        ends = select1(words, cum, j) + 1
+        starts = np.zeros(len(j), dtype=np.int64)
+        m = j > 0
+        starts[m] = select1(words, cum, j[m] - 1) + 1
+        counts = ends - starts
+        pos = np.arange(counts.sum()) + np.repeat(starts - (np.cumsum(counts) - counts), counts)
+        return np.repeat(j, counts), pos
+
+    def _subjects(self, j):
+        return rank1(self._a["Bp"], self._a["Bp.rank"], j)
+
+    def search_ids(self, s=None, p=None, o=None, limit=None):
+        """(S, P, O) als ID-Arrays; ``None`` = Variable, höchstens ``limit`` Tripel.
+
+        Jedes Paar hat mindestens ein Objekt, also reichen ``limit`` Paare bzw.
+        Positionen; gefiltert wird stückweise, bis genug Treffer da sind.
+        """
+        y, z = self._a["Y"], self._a["Z"]
+        if s is not None:
+            words, cum = self._a["Bp"], self._a["Bp.rank"]
+            a = 0 if s == 0 else int(select1(words, cum, [s - 1])[0]) + 1
+            b = int(select1(words, cum, [s])[0]) + 1
+            j = np.arange(a, b)
+            if p is not None:
+                j = j[y[a:b] == p]
+            if o is None:
+                j = j[:limit]
+            jj, pos = self._objects(j)
+            S, P, O = np.full(len(jj), s), y[jj], z[pos]
+            if o is not None:
+                m = O == o
+                S, P, O = S[m], P[m], O[m]
+        elif o is not None:
+            off = self._a["O.off"]
+            pos = self._a["O.idx"][int(off[o]):int(off[o + 1])]
+            if p is None:
+                pos = pos[:limit]
+            found, hits = 0, []
+            for a in range(0, len(pos), SELECT_CHUNK):
+                jj = rank1(self._a["Bo"], self._a["Bo.rank"], pos[a:a + SELECT_CHUNK].astype(np.int64))
+                if p is not None:
+                    jj = jj[y[jj] == p]
+                hits.append(jj)
+                found += len(jj)
+                if limit is not None and found >= limit:
+                    break
+            jj = np.concatenate(hits) if hits else np.empty(0, dtype=np.int64)
+            S, P, O = self._subjects(jj), y[jj], np.full(len(jj), o)
+        else:
+            if p is not None:
+                off = self._a["P.off"]
+                j = self._a["P.idx"][int(off[p]):int(off[p + 1])]
+            else:
+                j = np.arange(self.counts["pairs"] if limit is None else min(limit, self.counts["pairs"]))
+            jj, pos = self._objects(j[:limit])
+            S, P, O = self._subjects(jj), y[jj], z[pos]
+        return np.asarray(S[:limit]), np.asarray(P[:limit]), np.asarray(O[:limit])
+
+    # -------- Muster über Terme --------
+    def _ids(self, s, p, o):
+        ids = []
+        for term, role in ((s, "s"), (p, "p"), (o, "o")):
+            if term is None:
+                ids.append(None)
+                continue
+            i = self._id(expand(term), role)
+            if i < 0:
+                return None
+            ids.append(i)
+        return ids
+
+    def search(self, s=None, p=None, o=None, limit=None):
+        """Passende Tripel als (s, p, o)-Strings in N-Triples-Schreibweise."""
+        ids = self._ids(s, p, o)
+        if ids is None:
+            return []
+        S, P, O = self.search_ids(*ids, limit=limit)
+        return list(zip(self.terms(S, "s"), self.terms(P, "p"), self.terms(O, "o")))
+
+    def count(self, s=None, p=None, o=None) -> int:
+        ids = self._ids(s, p, o)
+        if ids is None:
+            return 0
+        if ids[0] is None and ids[2] is None:
+            if ids[1] is None:
+                return len(self)
+            # Paare des Prädikats -> Objekte je Paar über Bo
+            off = self._a["P.off"]
+            j = self._a["P.idx"][int(off[ids[1]]):int(off[ids[1] + 1])]
+            return len(self._objects(j)[1])
+        return len(self.search_ids(*ids)[0])
+
+
+def expand(term: str) -> str:
+    """``imd:Title`` -> ``<http://example.org/imdb#Title>``; N-Triples-Terme bleiben."""
+    if term == "a":
+        return f"<{TURTLE_PREFIXES['rdf']}type>"
+    if term[:1] not in '<"_':
+        name, sep, local = term.partition(":")
+        if sep and name in TURTLE_PREFIXES:
+            return f"<{TURTLE_PREFIXES[name]}{local}>"
+    return term
+
+
+# ------------------ CLI ----------------------
+def main():
+    ap = argparse.ArgumentParser(description="HDT-Export (Dictionary + Bitmap Triples) und Musterabfragen")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    b = sub.add_parser("build", help="aus Term-Ordner, N-Triples oder Shard-Manifest bauen")
+    b.add_argument("src")
+    b.add_argument("out")
+    b.add_argument("--mem", type=int, default=MEM_BYTES, help="Bytes pro Bucket")
+    b.add_argument("--tmp", default=None, help="Ordner für Zwischendateien")
+    q = sub.add_parser("query", help="Tripelmuster; fehlende Positionen sind Variablen")
+    q.add_argument("file")
+    for pos in ("s", "p", "o"):
+        q.add_argument(f"--{pos}", default=None, help="N-Triples-Term oder prefix:name (imd:Title, a)")
+    q.add_argument("--limit", type=int, default=20)
+    q.add_argument("--count", action="store_true", help="nur zählen")
+    i = sub.add_parser("info", help="Zähler und Größe der Abschnitte")
+    i.add_argument("file")
+    args = ap.parse_args()
+
+    if args.cmd == "build":
+        t = time.perf_counter()
+        c = build(args.src, args.out, args.mem, args.tmp)
+        size = os.path.getsize(args.out)
+        print(f"[✓] {c['triples']} Tripel, {c['pairs']} Paare, "
+              f"{sum(c[s] for s in SECTIONS)} Terme -> '{args.out}' "
+              f"({size / 1e6:.1f} MB, {time.perf_counter() - t:.1f}s)")
+    elif args.cmd == "query":
+        with HDT(args.file) as hdt:
+            t = time.perf_counter()
+            if args.count:
+                n = hdt.count(args.s, args.p, args.o)
+                print(f"{n} Tripel ({(time.perf_counter() - t) * 1000:.1f} ms)")
+                return
+            rows = hdt.search(args.s, args.p, args.o, args.limit)
+            ms = (time.perf_counter() - t) * 1000
+            for row in rows:
+                print(" ".join(row), ".")
+            print(f"[Info] {len(rows)} Tripel in {ms:.1f} ms")
+    else:
+        with HDT(args.file) as hdt:
+            print(f"[Info] {len(hdt)} Tripel, {hdt.counts['pairs']} Paare")
+            for name in SECTIONS:
+                print(f"    {name:10s} {hdt.counts[name]:>12} Terme")
+            for name, s in hdt.header["sections"].items():
+                size = np.dtype(s["dtype"]).itemsize * s["count"]
+                print(f"    {name:24s} {size / 1e6:10.2f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+# ---------------------- OFFSET-INDEX FÜR DIE IMDb-TABELLEN -------------------------------
+"""
+Sidecar-Index, um gezielt die Zeilen zu bestimmten Schlüsseln (tconst, nconst)
+zu lesen, statt eine ganze .tsv.gz zu dekomprimieren.
+
+Eine einzelne gzip-Datei lässt sich nicht mitten im Strom öffnen. Deshalb wird
+die Quelle einmal in Blöcke zu ``BLOCK_LINES`` Zeilen umkodiert, jeder Block
+ein eigenes gzip-Member (wie BGZF); die Blockdatei ``<quelle>.blocks.gz`` ist
+weiter normales gzip. Dazu kommt ``<quelle>.idx.npz``:
+
+- ``keys``/``blocks``: sortierte Schlüssel (Zahl ohne "tt"/"nm") mit dem Block,
+  in dem sie vorkommen (ein Eintrag je Schlüssel und Block)
+- ``offsets``: Byte-Position jedes Blocks in der Blockdatei
+- Kopfzeile, Schlüsselspalte, Größe/mtime der Quelle (veralteter Index wird neu gebaut)
+
+``OffsetIndex.iter_chunks(keys)`` liest nur die betroffenen Blöcke, in
+Dateireihenfolge, und liefert wie ``rdf_reader.iter_chunks`` typisierte DataFrames.
+
+Aufruf:  python rdf_index.py --path "../uncutted files"   (alle Tabellen indexieren)
+"""
+
+import argparse
+import gzip
+import os
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from rdf_gzip import WRITE_THREADS
+from rdf_reader import CHUNKSIZE, iter_blocks, read_block
+
+# Zeilen pro gzip-Member; kleiner = weniger unnötig gelesene Zeilen, größerer Index
+BLOCK_LINES = 10_000
+
+# Spalte, nach der gesucht wird (Standard: erste Spalte)
+KEY_COLUMNS = {"title.episode": "parentTconst"}
+
+
+def key_number(keys):
+    """Schlüssel wie "tt0000001" -> 1; nicht passende Schlüssel -> -1."""
+    s = pd.Series(keys, dtype=object).str.slice(2)
+    return pd.to_numeric(s.where(s.str.fullmatch(r"\d+", na=False)), errors="coerce").fillna(-1).to_numpy(np.int64)
+
+
+def _key_strings(lines, col):
+    return pd.Series(lines, dtype=object).str.split("\t", n=col + 1).str[col]
+
+
+def _paths(src):
+    return src + ".blocks.gz", src + ".idx.npz"
+
+
+def build_index(src, table, block_lines=BLOCK_LINES, threads=WRITE_THREADS):
+    """Blockdatei und Index für eine Quelle schreiben."""
+    blocks_path, index_path = _paths(src)
+    with gzip.open(src, "rb") as f:
+        header = f.readline()
+    key_name = KEY_COLUMNS.get(table)
+    col = header.decode("utf-8").rstrip("\r\n").split("\t").index(key_name) if key_name else 0
+
+    def _compress(block):
+        lines = block.decode("utf-8").rstrip("\n").split("\n")
+        k = np.unique(key_number(_key_strings(lines, col)))
+        return zlib.compress(block, wbits=31), k[k >= 0]
+
+    keys, block_ids, offsets = [], [], [0]
+
+    def _write(result):
+        data, k = result
+        out.write(data)
+        offsets.append(out.tell())
+        keys.append(k)
+        block_ids.append(np.full(len(k), len(offsets) - 2, dtype=np.uint32))
+
+    # Reihenfolge bleibt erhalten, höchstens 2 Blöcke pro Thread im Speicher
+    pending = deque()
+    with open(blocks_path + ".tmp", "wb") as out, ThreadPoolExecutor(max(1, threads)) as pool:
+        for _, block, _, _ in iter_blocks(src, block_lines):
+            pending.append(pool.submit(_compress, block))
+            if len(pending) > 2 * max(1, threads):
+                _write(pending.popleft().result())
+        while pending:
+            _write(pending.popleft().result())
+
+    keys = np.concatenate(keys) if keys else np.empty(0, dtype=np.int64)
+    block_ids = np.concatenate(block_ids) if block_ids else np.empty(0, dtype=np.uint32)
+    order = np.lexsort((block_ids, keys))
+    st = os.stat(src)
+    os.replace(blocks_path + ".tmp", blocks_path)
+    with open(index_path + ".tmp", "wb") as f:
+        np.savez(f, keys=keys[order].astype(np.uint32), blocks=block_ids[order],
+                 offsets=np.array(offsets, dtype=np.uint64), header=np.frombuffer(header, dtype=np.uint8),
+                 column=np.array(col), src_size=np.array(st.st_size), src_mtime=np.array(st.st_mtime))
+    os.replace(index_path + ".tmp", index_path)
+    print(f"[✓] Index {table}: {len(offsets) - 1} Blöcke, {len(keys)} Schlüssel-Einträge")
+    return OffsetIndex(src, table)
+
+
+class OffsetIndex:
+    def __init__(self, src, table):
+        self.src = src
+        self.table = table
+        self.blocks_path, index_path = _paths(src)
+        with np.load(index_path) as z:
+            self.keys = z["keys"]
+            self.blocks = z["blocks"]
+            self.offsets = z["offsets"]
+            self.header = z["header"].tobytes()
+            self.column = int(z["column"])
+            self.src_size = int(z["src_size"])
+            self.src_mtime = float(z["src_mtime"])
+
+    def is_current(self):
+        st = os.stat(self.src)
+        return st.st_size == self.src_size and st.st_mtime == self.src_mtime
+
+    def blocks_for(self, keys):
+        """Sortierte Block-Nummern, in denen einer der Schlüssel vorkommt."""
+        wanted = np.unique(key_number(list(keys)))
+        lo = np.searchsorted(self.keys, wanted, side="left")
+        hi = np.searchsorted(self.keys, wanted, side="right")
+        hits = [self.blocks[a:b] for a, b in zip(lo, hi) if a < b]
+        return np.unique(np.concatenate(hits)) if hits else np.empty(0, dtype=np.uint32)
+
+    def iter_lines(self, keys):
+        """(Block, passende Zeilen als Bytes) in Dateireihenfolge."""
+        keys = set(keys)
+        with open(self.blocks_path, "rb") as f:
+            for b in self.blocks_for(keys):
+                a, e = int(self.offsets[b]), int(self.offsets[b + 1])
+                f.seek(a)
+                lines = zlib.decompress(f.read(e - a), wbits=31).decode("utf-8").rstrip("\n").split("\n")
+                hit = _key_strings(lines, self.column).isin(keys).to_numpy()
+                yield b, "".join(l + "\n" for l, h in zip(lines, hit) if h).encode("utf-8")
+
+    def iter_chunks(self, keys, chunksize=CHUNKSIZE, engine=None):
+        """Typisierte DataFrames nur mit den Zeilen zu ``keys`` (Reihenfolge wie in der Quelle)."""
+        buf, n = [], 0
+        for _, data in self.iter_lines(keys):
+            if not data:
+                continue
+            buf.append(data)
+            n += data.count(b"\n")
+            if n >= chunksize:
+                yield read_block(self.header, b"".join(buf), self.table, engine)
+                buf, n = [], 0
+        if buf:
+            yield read_block(self.header, b"".join(buf), self.table, engine)
+
+
+def open_index(src, table):
+    """Index laden; fehlt er oder hat sich die Quelle geändert, wird er (neu) gebaut."""
+    _, index_path = _paths(src)
+    if os.path.exists(index_path):
+        index = OffsetIndex(src, table)
+        if index.is_current():
+            return index
+        print(f"[Info] {table}: Quelle geändert, Index wird neu gebaut")
+    return build_index(src, table)
+
+
+def main():
+    from rdf_emit import EMITTERS
+
+    ap = argparse.ArgumentParser(description="Offset-Index für die IMDb-.tsv.gz bauen")
+    ap.add_argument("--path", default="../uncutted files", help="Ordner mit den .tsv.gz")
+    ap.add_argument("--table", action="append", help="nur diese Tabelle(n)")
+    ap.add_argument("--block-lines", type=int, default=BLOCK_LINES)
+    args = ap.parse_args()
+    for table in args.table or EMITTERS:
+        src = os.path.join(args.path, f"{table}.tsv.gz")
+        if os.path.isfile(src):
+            build_index(src, table, args.block_lines)
+        else:
+            print(f"[!] {table}: nicht gefunden, übersprungen")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+# ---------------------- IRI-FABRIK MIT CACHE -------------------------------
+"""
+Erzeugt die Ressourcen-IRIs (title/person/role/rating/akas) einmal und merkt
+sie sich in je einem begrenzten LRU-Cache pro Entitätstyp.
+
+``iribaker.to_iri`` parst jede IRI mit einer großen RFC-3987-Regex. IMDb-IDs
+(``tt\\d+``, ``nm\\d+``) und die daraus gebauten Rollen-/AKA-Pfade sind aber
+schon IRI-sicher; sie werden direkt zusammengesetzt, nur alles andere läuft
+über ``to_iri``. Das Ergebnis ist in beiden Fällen identisch.
+
+Über ``stats()``/``report()`` lassen sich Trefferquoten ablesen, um die
+Cache-Größen (``CACHE_SIZES``) passend zu wählen.
+"""
+
+import re
+from collections import Counter
+from functools import lru_cache
+
+import pandas as pd
+from iribaker import to_iri
+from rdflib import URIRef
+
+RES = 'http://example.org/imdb/resource/'
+
+# Pfad-Präfix und Muster für bereits IRI-sichere Schlüssel je Entitätstyp
+KINDS = {
+    "title":  ("title/",  r"tt\d+"),
+    "person": ("person/", r"nm\d+"),
+    "rating": ("rating/", r"tt\d+"),
+    "akas":   ("akas/",   r"tt\d+/\d+"),
+    "role":   ("role/",   r"tt\d+/[A-Za-z_]+/nm\d+"),
+}
+
+# Einträge pro Cache; Titel/Personen werden am häufigsten wiederverwendet
+CACHE_SIZES = {
+    "title": 1 << 20,
+    "person": 1 << 19,
+    "rating": 1 << 12,
+    "akas": 1 << 12,
+    "role": 1 << 16,
+}
+
+
+class IriFactory:
+    """Ein LRU-Cache pro Entitätstyp; sichere IDs werden ohne Escaping gebaut."""
+
+    def __init__(self, base=RES, cache_sizes=None):
+        self.base = base
+        sizes = dict(CACHE_SIZES, **(cache_sizes or {}))
+        self._safe = {k: re.compile(pat) for k, (_, pat) in KINDS.items()}
+        # fast = ohne to_iri gebaut, escaped = über to_iri, vectorized = Spalten-Schnellpfad
+        self.counts = {k: Counter() for k in KINDS}
+        self._mint = {k: lru_cache(maxsize=sizes[k])(self._minter(k)) for k in KINDS}
+
+    def _minter(self, kind):
+        prefix = self.base + KINDS[kind][0]
+        safe = self._safe[kind].fullmatch
+        counts = self.counts[kind]
+
+        def mint(key):
+            if safe(key):
+                counts["fast"] += 1
+                return URIRef(prefix + key)
+            counts["escaped"] += 1
+            return URIRef(to_iri(prefix + key))
+        return mint
+
+    # -------- einzelne IRIs (zeilenweiser Pfad) --------
+    def iri(self, kind, key) -> URIRef:
+        return self._mint[kind](str(key))
+
+    def title(self, tconst) -> URIRef:
+        return self._mint["title"](str(tconst))
+
+    def person(self, nconst) -> URIRef:
+        return self._mint["person"](str(nconst))
+
+    def rating(self, tconst) -> URIRef:
+        return self._mint["rating"](str(tconst))
+
+    def akas(self, titleId, ordering) -> URIRef:
+        return self._mint["akas"](f"{titleId}/{ordering}")
+
+    def role(self, tconst, role_name, nconst) -> URIRef:
+        return self._mint["role"](f"{tconst}/{role_name}/{nconst}")
+
+    # -------- ganze Spalten (vektorisierter Pfad) --------
+    def series(self, kind, keys: pd.Series) -> pd.Series:
+        """IRIs (als str) für eine Spalte von Schlüsseln; sichere IDs ohne Cache und ohne Escaping."""
+        prefix = self.base + KINDS[kind][0]
+        safe = keys.str.fullmatch(KINDS[kind][1]).fillna(False).astype(bool)
+        out = prefix + keys
+        rest = ~safe
+        if rest.any():
+            mint = self._mint[kind]
+            out[rest] = keys[rest].map(lambda k: str(mint(k)))
+        self.counts[kind]["vectorized"] += int(safe.sum())
+        return out
+
+    # -------- Statistik --------
+    def stats(self):
+        """Treffer/Fehlschläge pro Cache plus Anzahl schnell bzw. escaped gebauter IRIs."""
+        out = {}
+        for kind, mint in self._mint.items():
+            info = mint.cache_info()
+            lookups = info.hits + info.misses
+            out[kind] = {
+                "hits": info.hits,
+                "misses": info.misses,
+                "hit_rate": round(info.hits / lookups, 4) if lookups else 0.0,
+                "size": info.currsize,
+                "maxsize": info.maxsize,
+                **self.counts[kind],
+            }
+        return out
+
+    def report(self):
+        for kind, s in self.stats().items():
+            print(f"    IRI-Cache {kind:6s}: Trefferquote {s['hit_rate']:.1%} "
+                  f"({s['hits']}/{s['hits'] + s['misses']}), Größe {s['size']}/{s['maxsize']}, "
+                  f"schnell {s.get('fast', 0)}, escaped {s.get('escaped', 0)}, "
+                  f"vektorisiert {s.get('vectorized', 0)}")
+
+
+# Gemeinsame Instanz für Skripte und rdf_emit
+iris = IriFactory()
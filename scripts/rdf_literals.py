@@ -0,0 +1,101 @@
+# ---------------------- LITERAL-CACHE FÜR SPALTEN MIT WENIGEN WERTEN -------------------------------
+"""
+Fertige Literale für kategoriale Spalten (titleType, genres, isAdult, region,
+language, category/roleName, gender, Jahreszahlen).
+
+Diese Spalten haben nur einige hundert verschiedene Werte, bisher wurde aber
+für jedes Vorkommen ein neues ``Literal(str(v), datatype=XSD.string)`` gebaut
+(rdflib normalisiert und parst dabei jedes Mal) und beim Schreiben erneut
+escaped und formatiert. Hier entsteht jedes Literal einmal pro Wert:
+
+- ``string(v)``/``literal(v, datatype)``: dasselbe Literal-Objekt für denselben
+  Wert (zeilenweiser Pfad). Es trägt seine N-Triples-Form schon mit,
+  ``rdf_writer.term_nt`` gibt sie ohne Formatierung zurück.
+- ``nt(v, datatype)``: nur die N-Triples-Form, z. B. ``"actor"^^<…#string>``.
+- ``series(s, datatype)``: N-Triples-Formen für eine ganze Spalte
+  (vektorisierter Pfad); escaped wird nur je distinktem Wert.
+
+Es werden höchstens ``MAX_VALUES`` Literale (bzw. N-Triples-Formen) gehalten;
+darüber hinaus wird ungecacht gebaut (``stats()`` zählt beides), damit eine versehentlich
+hochkardinale Spalte den Speicher nicht füllt.
+"""
+
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+from rdflib import XSD, Literal
+
+from rdf_writer import _quote
+
+# Einträge pro Cache (alle kategorialen Spalten zusammen liegen weit darunter)
+MAX_VALUES = 1 << 16
+
+
+class CachedLiteral(Literal):
+    """Literal mit vorberechneter N-Triples-Form (``nt``); verhält sich sonst wie Literal."""
+
+
+class LiteralFactory:
+    def __init__(self, max_values=MAX_VALUES):
+        self.max_values = max_values
+        self._lits = {}   # (Wert, Datentyp) -> CachedLiteral
+        self._nts = {}    # (Lexikalform, Datentyp) -> N-Triples-Form
+        self.counts = Counter()
+
+    # -------- einzelne Werte (zeilenweiser Pfad) --------
+    def literal(self, value, datatype=XSD.string) -> Literal:
+        key = (value, datatype)
+        lit = self._lits.get(key)
+        if lit is not None:
+            self.counts["hits"] += 1
+            return lit
+        if len(self._lits) >= self.max_values:
+            self.counts["uncached"] += 1
+            return Literal(value, datatype=datatype)
+        self.counts["misses"] += 1
+        lit = CachedLiteral(value, datatype=datatype)
+        lit.nt = "%s^^<%s>" % (_quote(lit), datatype)
+        self._lits[key] = lit
+        return lit
+
+    def string(self, value) -> Literal:
+        """``Literal(str(value), datatype=XSD.string)``, einmal pro Wert gebaut."""
+        return self.literal(str(value), XSD.string)
+
+    def boolean(self, value: bool) -> Literal:
+        return self.literal(bool(value), XSD.boolean)
+
+    # -------- N-Triples-Form (vektorisierter Pfad) --------
+    def nt(self, lex: str, datatype=XSD.string) -> str:
+        key = (lex, str(datatype))
+        s = self._nts.get(key)
+        if s is None:
+            s = "%s^^<%s>" % (_quote(lex), datatype)
+            if len(self._nts) < self.max_values:
+                self._nts[key] = s
+        return s
+
+    def series(self, values: pd.Series, datatype=XSD.string) -> pd.Series:
+        """Wie ``literal(as_str(values), datatype)`` in rdf_emit, aber ``str()`` und
+        Escaping nur je distinktem Wert (``values`` ohne fehlende Werte)."""
+        if values.empty:
+            return values.astype(object)
+        codes, uniques = pd.factorize(values)
+        forms = np.array([self.nt(str(v), datatype) for v in uniques] + [None], dtype=object)
+        self.counts["vectorized"] += len(values)
+        return pd.Series(forms[codes], index=values.index)
+
+    # -------- Statistik --------
+    def stats(self):
+        return {"literals": len(self._lits), "nt_forms": len(self._nts), **self.counts}
+
+    def report(self):
+        s = self.stats()
+        print(f"    Literal-Cache: {s['literals']} Literale, {s['nt_forms']} N-Triples-Formen, "
+              f"Treffer {s.get('hits', 0)}, neu {s.get('misses', 0)}, ungecacht {s.get('uncached', 0)}, "
+              f"vektorisiert {s.get('vectorized', 0)}")
+
+
+# Gemeinsame Instanz für Skripte und rdf_emit
+lits = LiteralFactory()
@@ -0,0 +1,215 @@
+# ---------------------- MERGE-JOIN DER title.*-TABELLEN -------------------------------
+"""
+Liest alle nach Titel-ID sortierten title.*-Tabellen in einem gemeinsamen Durchlauf.
+
+title.basics, .ratings, .akas (``titleId``), .episode, .crew und .principals
+sind aufsteigend nach der Titel-ID sortiert. Statt jede Tabelle in einem
+eigenen Durchlauf zu lesen, läuft pro Datei ein Cursor über die Blöcke aus
+rdf_reader, und ``merge_blocks`` schneidet daraus Stapel, die für alle
+Tabellen denselben Schlüsselbereich abdecken. Ein Titel liegt so immer
+vollständig in genau einem Stapel; im Speicher hält jeder Cursor nur seinen
+aktuellen Block bis zur nächsten Stapelgrenze.
+
+Verglichen wird die Zahl hinter "tt" (IMDb sortiert numerisch, tt9999999 vor
+tt10000000). ``emit_titles`` schreibt die Tripel eines Stapels titelweise
+zusammenhängend (basics, Bewertung, AKAs, Episode, Rollen) und entfernt
+Duplikate auch über Tabellengrenzen hinweg (z. B. ``rdf:type imd:Episode`` aus
+basics und episode). ``iter_titles`` liefert dieselben Stapel als ein Bündel
+je Titel.
+
+Zum Fortsetzen reicht der Zustand nach einem Stapel (``state``): die
+Stapelgrenze und je Tabelle die Position des ältesten noch gepufferten
+Blocks (in der .tsv.gz oder, mit Parquet-Kopie, die Zeile). Beim Wiederaufsetzen werden die Blöcke ab dort gelesen und Zeilen
+unterhalb der Grenze verworfen.
+
+    python rdf_merge.py "../uncutted files" --out imdb_titles.nt
+"""
+
+import argparse
+import os
+import time
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from rdf_emit import EMITTERS
+from rdf_reader import CHUNKSIZE, iter_frames
+
+# Tabelle -> Spalte mit der Titel-ID; die Reihenfolge ist auch die Ausgabereihenfolge je Titel
+TITLE_TABLES = {
+    "title.basics": "tconst",
+    "title.ratings": "tconst",
+    "title.akas": "titleId",
+    "title.episode": "tconst",
+    "title.crew": "tconst",
+    "title.principals": "tconst",
+}
+
+# Zusatzspalte mit dem numerischen Schlüssel in jedem Stapel
+KEY = "_title_key"
+
+# Felder eines Titel-Bündels; akas und principals sind Listen, der Rest eine Zeile oder None
+TitleBundle = namedtuple("TitleBundle", "tconst basics rating akas episode crew principals")
+_FIELDS = {"title.basics": "basics", "title.ratings": "rating", "title.akas": "akas",
+           "title.episode": "episode", "title.crew": "crew", "title.principals": "principals"}
+_LISTS = {"title.akas", "title.principals"}
+
+
+def title_key(ids: pd.Series) -> np.ndarray:
+    """Sortierschlüssel zu tt-IDs. Nicht lesbare IDs übernehmen den Schlüssel der
+    Vorgängerzeile, damit sie an ihrer Stelle bleiben (der Emitter verwirft sie)."""
+    keys = pd.to_numeric(ids.astype(str).str[2:], errors="coerce")
+    return keys.ffill().fillna(-1).to_numpy(dtype=np.int64)
+
+
+class _Cursor:
+    """Blöcke einer Tabelle und der noch nicht ausgegebene Rest."""
+
+    def __init__(self, table, file_path, chunksize, start=0, engine=None):
+        self.table = table
+        self.column = TITLE_TABLES[table]
+        self._frames = iter_frames(file_path, table, chunksize, start, engine)
+        self._pos = start
+        self.start = start      # Position des ältesten Blocks im Puffer
+        self.src_offset = 0
+        self.buf = None
+        self.keys = np.empty(0, dtype=np.int64)
+        self.done = False
+
+    def read(self):
+        """Nächsten Block anhängen; am Dateiende ``done`` setzen."""
+        try:
+            df, pos, self.src_offset = next(self._frames)
+        except StopIteration:
+            self.done = True
+            return
+        keys = title_key(df[self.column])
+        if (keys[1:] < keys[:-1]).any() or (len(self.keys) and len(keys) and keys[0] < self.keys[-1]):
+            raise ValueError(f"{self.table}: nicht nach {self.column} sortiert")
+        if not len(self.keys):
+            self.start, self.buf = self._pos, df
+        else:
+            # spaltenweise: DataFrame-concat warnt bei Resten mit reinen NA-Spalten
+            self.buf = pd.DataFrame({c: pd.concat([self.buf[c], df[c]], ignore_index=True)
+                                     for c in df.columns})
+        self.keys = np.concatenate([self.keys, keys])
+        self._pos = pos
+
+    def fill(self):
+        """Lesen, bis der Puffer mehr als einen Schlüssel enthält (oder die Datei zu Ende ist)."""
+        while not self.done and (not len(self.keys) or self.keys[0] == self.keys[-1]):
+            self.read()
+
+    def take(self, bound=None):
+        """Alle Zeilen mit Schlüssel < ``bound`` (None = alle) abtrennen."""
+        n = len(self.keys) if bound is None else int(np.searchsorted(self.keys, bound))
+        if self.buf is None:
+            return None
+        part = self.buf.iloc[:n].reset_index(drop=True)
+        part[KEY] = self.keys[:n]
+        self.buf = self.buf.iloc[n:].reset_index(drop=True)
+        self.keys = self.keys[n:]
+        if not len(self.keys):
+            self.start = self._pos
+        return part
+
+
+def merge_blocks(files, chunksize=CHUNKSIZE, resume=None, engine=None):
+    """Liefert (Stapel, Zustand) mit Stapel = {Tabelle: DataFrame} über denselben
+    Schlüsselbereich. ``files`` bildet Tabellen aus ``TITLE_TABLES`` auf Pfade ab,
+    ``resume`` ist ein zuvor gelieferter Zustand."""
+    starts = (resume or {}).get("starts", {})
+    cursors = [_Cursor(t, files[t], chunksize, starts.get(t, 0), engine)
+               for t in TITLE_TABLES if t in files]
+    if resume:
+        for c in cursors:
+            while not c.done and (not len(c.keys) or c.keys[-1] < resume["key"]):
+                c.read()
+            c.take(resume["key"])
+    while True:
+        for c in cursors:
+            c.fill()
+        open_ = [c for c in cursors if not c.done]
+        # Zeilen unter dem kleinsten gepufferten Endschlüssel sind in allen Tabellen vollständig
+        bound = min(int(c.keys[-1]) for c in open_) if open_ else None
+        batch = {}
+        for c in cursors:
+            part = c.take(bound)
+            if part is not None and len(part):
+                batch[c.table] = part
+        if batch:
+            state = {"key": bound,
+                     "starts": {c.table: c.start for c in cursors},
+                     "src_offsets": {c.table: c.src_offset for c in cursors}}
+            yield batch, state
+        if not open_:
+            return
+
+
+def emit_titles(batch) -> str:
+    """N-Triples-Text eines Stapels, nach Titel zusammenhängend und ohne Duplikate."""
+    parts, keys = [], []
+    for table, df in batch.items():
+        key = df[KEY].to_numpy()
+        for block in EMITTERS[table](df):
+            parts.append(block.to_numpy(dtype=object))
+            keys.append(key[block.index.to_numpy()])
+    if not parts:
+        return ""
+    lines = np.concatenate(parts)
+    order = np.argsort(np.concatenate(keys), kind="stable")
+    return "".join(dict.fromkeys(lines[order].tolist()))
+
+
+def iter_titles(batches):
+    """Ein ``TitleBundle`` je Titel aus den Stapeln von ``merge_blocks``."""
+    for batch, _ in batches:
+        recs = {t: df.drop(columns=KEY).to_dict("records") for t, df in batch.items()}
+        keys = {t: df[KEY].to_numpy() for t, df in batch.items()}
+        for k in np.unique(np.concatenate(list(keys.values()))):
+            fields = {f: [] if t in _LISTS else None for t, f in _FIELDS.items()}
+            tconst = None
+            for t, rows in recs.items():
+                lo, hi = np.searchsorted(keys[t], [k, k + 1])
+                if lo == hi:
+                    continue
+                rows = rows[lo:hi]
+                tconst = tconst or rows[0][TITLE_TABLES[t]]
+                fields[_FIELDS[t]] = rows if t in _LISTS else rows[0]
+            yield TitleBundle(tconst=tconst, **fields)
+
+
+def title_files(directory):
+    """Vorhandene title.*.tsv.gz eines Ordners für ``merge_blocks``."""
+    files = {t: os.path.join(directory, f"{t}.tsv.gz") for t in TITLE_TABLES}
+    return {t: p for t, p in files.items() if os.path.exists(p)}
+
+
+# ---------------------- CLI ----------------------
+def main():
+    parser = argparse.ArgumentParser(description="title.*-Tabellen in einem Durchlauf nach N-Triples/Turtle")
+    parser.add_argument("directory", help="Ordner mit den title.*.tsv.gz")
+    parser.add_argument("--out", default="imdb_titles.nt")
+    parser.add_argument("--chunksize", type=int, default=CHUNKSIZE)
+    parser.add_argument("--turtle", action="store_true", help="nach Subjekt gruppiertes Turtle")
+    args = parser.parse_args()
+
+    from rdf_writer import NTriplesWriter, TurtleWriter
+
+    files = title_files(args.directory)
+    print(f"[Info] Tabellen: {', '.join(files)}")
+    writer = TurtleWriter if args.turtle else NTriplesWriter
+    t0 = time.perf_counter()
+    batches = 0
+    with writer(args.out) as sink:
+        for batch, _ in merge_blocks(files, args.chunksize):
+            sink.write(emit_titles(batch))
+            batches += 1
+    dt = time.perf_counter() - t0
+    print(f"[✓] {sink.triples} Tripel in {batches} Stapeln nach '{args.out}' "
+          f"({dt:.1f}s, {sink.triples / dt:,.0f} Tripel/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+# ---------------------- LAUFZEIT-MESSUNG PRO STUFE -------------------------------
+"""
+Timer und Zähler für die Transformation, damit sichtbar wird, wohin die Zeit
+geht (Dekompression, Parsen, Tripel erzeugen, Serialisieren, Schreiben,
+Checkpoint) statt nur einer tqdm-Leiste pro Chunk.
+
+- ``stage(name, table)``: Kontextmanager, summiert Sekunden und Aufrufe
+- ``timed(iterable, name, table)``: misst die Zeit in ``next()`` (z. B. gzip)
+- ``add(name, n, table)``: Zähler (Zeilen, Tripel, Bytes)
+- ``predicates(table, data)``: Tripel pro Prädikat aus N-Triples-Text
+- ``PredicateSink(sink, metrics)``: zählt Prädikate beim Schreiben, auch für
+  einzelne Tripel (``add``) im zeilenweisen Pfad und die Ontologie (``write_graph``)
+- ``flushed(table, seconds)``: Flush-Latenz und RSS nach jedem Flush
+- ``begin_table``/``end_table``: Wandzeit pro Tabelle; mit ``profile=True``
+  zusätzlich cProfile und tracemalloc getrennt pro Tabelle
+
+Ausgabe als JSON-Bericht (``write_json``) und im Textformat des Prometheus
+node_exporter (``write_prometheus``, für den textfile-Collector).
+
+Die Sekunden einer Stufe sind exklusiv: läuft eine Stufe innerhalb einer anderen
+(z. B. "emit" und "write" in "process"), zählt ihre Zeit nur bei der inneren.
+Die Stufen einer Tabelle summieren sich so höchstens zu ihrer Wandzeit.
+"""
+
+import cProfile
+import io
+import json
+import os
+import platform
+import pstats
+import re
+import resource
+import sys
+import time
+import tracemalloc
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+# Präfix der Prometheus-Metriken
+PROM_PREFIX = "imdb_rdf"
+
+# Einträge pro Tabelle im Profil-Auszug (Funktionen bzw. Allokationsstellen)
+PROFILE_TOP = 15
+
+_PREDICATE = re.compile(r"^\S+ (<[^>]*>) ", re.M)
+
+
+def rss_bytes() -> int:
+    """Aktueller RSS (Linux: /proc/self/statm, sonst Spitzenwert aus getrusage)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return peak_rss_bytes()
+
+
+def peak_rss_bytes() -> int:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class Metrics:
+    def __init__(self, profile=False, profile_dir=None):
+        self.started = time.time()
+        self._t0 = time.perf_counter()
+        self.seconds = defaultdict(float)   # (Tabelle, Stufe) -> Sekunden
+        self.calls = Counter()              # (Tabelle, Stufe) -> Aufrufe
+        self.counters = Counter()           # (Tabelle, Name) -> Wert
+        self.by_predicate = defaultdict(Counter)
+        self.flushes = []                   # (Tabelle, Sekunden, RSS)
+        self.tables = {}                    # Tabelle -> Wandzeit
+        self._table_t0 = {}
+        self._nested = []                   # offene Stufen: Sekunden darin gemessener Stufen
+        self.table = None                   # zuletzt begonnene Tabelle (für PredicateSink)
+        self.profile = profile
+        self.profile_dir = profile_dir
+        self.profiles = {}
+        self._prof = None
+        if profile:
+            tracemalloc.start()
+
+    # -------- Messen --------
+    @contextmanager
+    def stage(self, name, table=None):
+        t = time.perf_counter()
+        self._nested.append(0.0)
+        try:
+            yield
+        finally:
+            self._stop(name, table, time.perf_counter() - t)
+            self.calls[table, name] += 1
+
+    def timed(self, iterable, name, table=None):
+        it = iter(iterable)
+        while True:
+            t = time.perf_counter()
+            self._nested.append(0.0)
+            try:
+                item = next(it)
+            except StopIteration:
+                return
+            finally:
+                self._stop(name, table, time.perf_counter() - t)
+            self.calls[table, name] += 1
+            yield item
+
+    def _stop(self, name, table, sec):
+        # ohne die Zeit verschachtelter Stufen buchen, die ganze Dauer an die äußere melden
+        self.seconds[table, name] += sec - self._nested.pop()
+        if self._nested:
+            self._nested[-1] += sec
+
+    def add(self, name, n, table=None):
+        self.counters[table, name] += n
+
+    def predicates(self, table, data: str):
+        self.by_predicate[table].update(_PREDICATE.findall(data))
+
+    def flushed(self, table, seconds):
+        self.flushes.append((table, seconds, rss_bytes()))
+
+    # -------- Tabellen + Profil --------
+    def begin_table(self, table):
+        self.table = table
+        self._table_t0[table] = time.perf_counter()
+        if self.profile:
+            tracemalloc.reset_peak()
+            self._prof = cProfile.Profile()
+            self._prof.enable()
+
+    def end_table(self, table):
+        self.tables[table] = self.tables.get(table, 0.0) + time.perf_counter() - self._table_t0.pop(table)
+        if self.profile and self._prof is not None:
+            self._prof.disable()
+            self.profiles[table] = self._profile_summary(table, self._prof)
+            self._prof = None
+
+    def _profile_summary(self, table, prof):
+        if self.profile_dir:
+            os.makedirs(self.profile_dir, exist_ok=True)
+            prof.dump_stats(os.path.join(self.profile_dir, f"{table}.prof"))
+        st = pstats.Stats(prof, stream=io.StringIO())
+        top = sorted(st.stats.items(), key=lambda kv: kv[1][3], reverse=True)[:PROFILE_TOP]
+        snapshot = tracemalloc.take_snapshot().statistics("lineno")[:PROFILE_TOP]
+        return {
+            "functions": [{"function": f"{os.path.basename(f)}:{line}({name})", "calls": nc,
+                           "tottime": round(tt, 4), "cumtime": round(ct, 4)}
+                          for (f, line, name), (_, nc, tt, ct, _) in top],
+            "memory_peak": tracemalloc.get_traced_memory()[1],
+            "allocations": [{"where": str(s.traceback), "bytes": s.size, "count": s.count}
+                            for s in snapshot],
+        }
+
+    # -------- Bericht --------
+    def report(self, **extra):
+        stages = defaultdict(dict)
+        for (table, name), sec in sorted(self.seconds.items(), key=lambda kv: (str(kv[0][0]), kv[0][1])):
+            stages[table or "-"][name] = {"seconds": round(sec, 4), "calls": self.calls[table, name]}
+        counters = defaultdict(dict)
+        for (table, name), n in sorted(self.counters.items(), key=lambda kv: (str(kv[0][0]), kv[0][1])):
+            counters[table or "-"][name] = n
+        flush_s = [s for _, s, _ in self.flushes]
+        out = {
+            "started": self.started,
+            "seconds": round(time.perf_counter() - self._t0, 4),
+            "python": platform.python_version(),
+            "tables": {t: {"seconds": round(s, 4), **counters.get(t, {})} for t, s in self.tables.items()},
+            "stages": dict(stages),
+            "counters": dict(counters),
+            "predicates": {t: dict(c.most_common()) for t, c in self.by_predicate.items()},
+            "flush": {
+                "count": len(flush_s),
+                "seconds": round(sum(flush_s), 4),
+                "max_seconds": round(max(flush_s), 4) if flush_s else 0.0,
+                "rss_after": [{"table": t, "seconds": round(s, 4), "rss": r} for t, s, r in self.flushes],
+            },
+            "rss": rss_bytes(),
+            "peak_rss": peak_rss_bytes(),
+        }
+        if self.profiles:
+            out["profile"] = self.profiles
+        out.update(extra)
+        return out
+
+    def write_json(self, path, **extra):
+        _write_atomic(path, json.dumps(self.report(**extra), indent=1))
+
+    def write_prometheus(self, path):
+        p = PROM_PREFIX
+        out = []
+
+        def metric(name, kind, help_, samples):
+            out.append(f"# HELP {p}_{name} {help_}")
+            out.append(f"# TYPE {p}_{name} {kind}")
+            for labels, value in samples:
+                lab = ",".join(f'{k}="{_label(v)}"' for k, v in labels.items())
+                out.append(f"{p}_{name}{{{lab}}} {value}" if lab else f"{p}_{name} {value}")
+
+        metric("stage_seconds_total", "counter", "Sekunden pro Tabelle und Stufe",
+               [({"table": t or "-", "stage": s}, round(v, 6)) for (t, s), v in self.seconds.items()])
+        metric("stage_calls_total", "counter", "Aufrufe pro Tabelle und Stufe",
+               [({"table": t or "-", "stage": s}, n) for (t, s), n in self.calls.items()])
+        for name in sorted({n for _, n in self.counters}):
+            metric(f"{name}_total", "counter", f"Zähler {name} pro Tabelle",
+                   [({"table": t or "-"}, v) for (t, n), v in self.counters.items() if n == name])
+        metric("predicate_triples_total", "counter", "Tripel pro Tabelle und Prädikat",
+               [({"table": t, "predicate": pr}, n) for t, c in self.by_predicate.items() for pr, n in c.items()])
+        flush_s = [s for _, s, _ in self.flushes]
+        metric("flushes_total", "counter", "Anzahl Flushes", [({}, len(flush_s))])
+        metric("flush_seconds_total", "counter", "Dauer aller Flushes", [({}, round(sum(flush_s), 6))])
+        metric("flush_seconds_max", "gauge", "längster Flush", [({}, round(max(flush_s), 6) if flush_s else 0)])
+        metric("rss_bytes", "gauge", "RSS nach dem letzten Flush",
+               [({}, self.flushes[-1][2] if self.flushes else rss_bytes())])
+        metric("peak_rss_bytes", "gauge", "Spitzen-RSS des Prozesses", [({}, peak_rss_bytes())])
+        metric("run_seconds", "gauge", "Laufzeit bisher", [({}, round(time.perf_counter() - self._t0, 3))])
+        _write_atomic(path, "\n".join(out) + "\n")
+
+    def summary(self):
+        """Kurze Übersicht pro Tabelle auf der Konsole (Stufen exklusiv, s. oben)."""
+        for table, sec in self.tables.items():
+            parts = [f"{name} {self.seconds[table, name]:.1f}s"
+                     for t, name in self.seconds if t == table]
+            rows = self.counters[table, "rows"]
+            triples = self.counters[table, "triples"]
+            print(f"    {table}: {sec:.1f}s, {rows} Zeilen, {triples} Tripel"
+                  + (f", {triples / sec:,.0f} Tripel/s" if sec else "")
+                  + (" | " + ", ".join(parts) if parts else ""))
+
+
+class PredicateSink:
+    """Hülle um einen Writer (NTriplesWriter, ShardedWriter, TermStore, ...), die
+    Tripel pro Prädikat für ``metrics.table`` zählt: Text-Chunks in ``write``,
+    einzelne Tripel in ``add`` (zeilenweiser Pfad ohne Graph), rdflib-Graphen in
+    ``write_graph`` (Ontologie). Alles andere
+    (``triples``, ``path``, ``sync``, ``close``, ...) geht an den Writer."""
+
+    def __init__(self, sink, metrics):
+        self.sink = sink
+        self.metrics = metrics
+
+    def write(self, data: str):
+        self.metrics.predicates(self.metrics.table, data)
+        self.sink.write(data)
+
+    def add(self, triple):
+        self.metrics.by_predicate[self.metrics.table]["<%s>" % triple[1]] += 1
+        self.sink.add(triple)
+
+    def write_graph(self, graph):
+        # zählen und dem Writer überlassen (TurtleWriter schreibt den Graphen als Block)
+        self.metrics.by_predicate[self.metrics.table].update("<%s>" % p for _, p, _ in graph)
+        self.sink.write_graph(graph)
+
+    def __getattr__(self, name):
+        return getattr(self.sink, name)
+
+
+def _label(v):
+    return str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _write_atomic(path, text):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
@@ -0,0 +1,248 @@
+# ---------------------- PARQUET-KOPIE DER IMDb-TABELLEN -------------------------------
+"""
+Einmalige Umwandlung der .tsv.gz in typisiertes Parquet: weitere Läufe (neue
+Ontologie-Version, geändertes Mapping) müssen weder gzip dekomprimieren noch
+CSV parsen.
+
+``stage`` liest jede Tabelle genau einmal über rdf_reader (gleiches Schema,
+gleiche NA-Regeln wie die Transformation) und schreibt sie nach
+``<Ordner>/parquet/<Tabelle>/part-NNNN.parquet``:
+
+- Typen aus ``SCHEMAS``: ``Int64`` als int64 mit Nullen, Bewertungen als double,
+  ``category``-Spalten als Arrow-dictionary (kommen als category zurück), Text
+  als string mit Dictionary-Encoding in Parquet
+- eine Row Group je ``CHUNKSIZE`` Zeilen, ein Chunk der Transformation ist also
+  genau eine Row Group
+- höchstens ``PART_ROWS`` Zeilen je Datei; große Tabellen (akas, principals)
+  verteilen sich auf mehrere Dateien, die der Prozess-Pool einzeln liest
+- ``_meta.json`` wird zuletzt geschrieben: Größe und mtime der Quelle, Zeilen und
+  Row Groups je Datei. Fehlt sie oder passt die .tsv.gz nicht mehr dazu, gilt
+  die Kopie als veraltet und es wird wieder die .tsv.gz gelesen.
+
+``StagedTable`` öffnet die Dateien als memory map und liest nur die angefragten
+Spalten. rdf_reader (``iter_frames``, ``iter_chunks``) und damit alle
+Transformationsskripte, der Merge-Join, der Prozess-Pool, die
+Integritätsprüfung (nur die ID-Spalte) und der Benchmark (Modus "parquet")
+nehmen die Kopie, sobald sie aktuell ist.
+
+Checkpoint-Positionen aus der Kopie sind ``{"row": n}`` statt der
+unkomprimierten Position in der .tsv.gz (siehe ``rdf_reader.staged_source``).
+
+Aufruf:  python rdf_parquet.py "../uncutted files"
+         python rdf_parquet.py "../uncutted files" --table title.akas --force
+"""
+
+import argparse
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+
+from rdf_reader import CHUNKSIZE, SCHEMAS, iter_blocks, read_block
+
+# Unterordner der Kopie im Ordner der .tsv.gz
+STAGE_SUBDIR = "parquet"
+
+# Zeilen je Parquet-Datei (ein Vielfaches der Row-Group-Größe)
+PART_ROWS = 10_000_000
+
+# "zstd" = kleiner, "snappy"/"lz4" = etwas schneller zu lesen, None = unkomprimiert
+COMPRESSION = "zstd"
+
+META = "_meta.json"
+
+
+def stage_dir(src_dir):
+    return os.path.join(src_dir, STAGE_SUBDIR)
+
+
+def _table_name(file_path):
+    name = os.path.basename(file_path)
+    return name[:-len(".tsv.gz")] if name.endswith(".tsv.gz") else name
+
+
+def _source_info(file_path):
+    st = os.stat(file_path)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def _arrow_schema(schema):
+    import pyarrow as pa
+
+    types = {"str": pa.string(), "Int64": pa.int64(), "float": pa.float64(),
+             "category": pa.dictionary(pa.int32(), pa.string())}
+    return pa.schema([(col, types[kind]) for col, kind in schema.items()])
+
+
+# ------------------ Schreiben ------------------
+def stage_table(file_path, out_dir, chunksize=CHUNKSIZE, engine=None):
+    """Eine .tsv.gz nach ``out_dir/<Tabelle>`` umwandeln; liefert die Metadaten."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    table = _table_name(file_path)
+    schema = _arrow_schema(SCHEMAS[table])
+    source = _source_info(file_path)
+    target = os.path.join(out_dir, table)
+    tmp = target + ".tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+
+    parts, writer = [], None
+    try:
+        for header, block, _, _ in iter_blocks(file_path, chunksize):
+            df = read_block(header, block, table, engine)
+            if not len(df):
+                continue
+            if writer is None or parts[-1]["rows"] + len(df) > PART_ROWS:
+                if writer is not None:
+                    writer.close()
+                name = f"part-{len(parts):04d}.parquet"
+                writer = pq.ParquetWriter(os.path.join(tmp, name), schema,
+                                          compression=COMPRESSION, use_dictionary=True)
+                parts.append({"file": name, "rows": 0, "row_groups": 0})
+            writer.write_table(pa.Table.from_pandas(df, schema=schema, preserve_index=False),
+                               row_group_size=chunksize)
+            parts[-1]["rows"] += len(df)
+            parts[-1]["row_groups"] += 1
+    finally:
+        if writer is not None:
+            writer.close()
+
+    meta = {"table": table, "source": source, "rows": sum(p["rows"] for p in parts),
+            "chunksize": chunksize, "columns": list(SCHEMAS[table]),
+            "compression": COMPRESSION, "parts": parts}
+    with open(os.path.join(tmp, META), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=1)
+    # erst die fertige Kopie an ihren Platz, eine halbe bleibt als .tmp liegen
+    shutil.rmtree(target, ignore_errors=True)
+    os.rename(tmp, target)
+    return meta
+
+
+def stage(src_dir, out_dir=None, tables=None, chunksize=CHUNKSIZE, engine=None, force=False):
+    """Alle (bzw. ``tables``) .tsv.gz aus ``src_dir`` umwandeln; aktuelle Kopien bleiben."""
+    out_dir = out_dir or stage_dir(src_dir)
+    os.makedirs(out_dir, exist_ok=True)
+    staged = {}
+    for table in SCHEMAS:
+        src = os.path.join(src_dir, f"{table}.tsv.gz")
+        if (tables and table not in tables) or not os.path.isfile(src):
+            continue
+        if not force and open_staged(src, out_dir) is not None:
+            print(f"[Info] {table}: Parquet-Kopie ist aktuell, übersprungen")
+            continue
+        t = time.perf_counter()
+        meta = stage_table(src, out_dir, chunksize, engine)
+        size = sum(os.path.getsize(os.path.join(out_dir, table, p["file"])) for p in meta["parts"])
+        print(f"[✓] {table}: {meta['rows']:,} Zeilen in {len(meta['parts'])} Dateien, "
+              f"{size / 1e6:.1f} MB (gz {os.path.getsize(src) / 1e6:.1f} MB, "
+              f"{time.perf_counter() - t:.1f}s)")
+        staged[table] = meta
+    return staged
+
+
+# ------------------ Lesen ------------------
+class StagedTable:
+    """Lesezugriff auf die Parquet-Kopie einer Tabelle (memory map, Spaltenauswahl)."""
+
+    def __init__(self, directory, meta):
+        self.directory = directory
+        self.meta = meta
+        self.table = meta["table"]
+        self.columns = meta["columns"]
+        self.parts = [os.path.join(directory, p["file"]) for p in meta["parts"]]
+
+    def __len__(self):
+        return self.meta["rows"]
+
+    def groups(self):
+        """(Datei, Row Group) in Dateireihenfolge, z. B. als Arbeitspakete für Worker."""
+        return [(path, g) for path, p in zip(self.parts, self.meta["parts"])
+                for g in range(p["row_groups"])]
+
+    def iter_frames(self, chunksize=CHUNKSIZE, start=None, columns=None):
+        """(DataFrame, Position, None) je ``chunksize`` Zeilen, ab ``start`` = {"row": n}."""
+        import pyarrow.parquet as pq
+
+        row = start["row"] if start else 0
+        done = 0
+        for path, part in zip(self.parts, self.meta["parts"]):
+            if done + part["rows"] <= row:
+                done += part["rows"]
+                continue
+            pf = pq.ParquetFile(path, memory_map=True)
+            ends = np.cumsum([pf.metadata.row_group(g).num_rows for g in range(pf.num_row_groups)])
+            # ganze Row Groups vor ``start`` gar nicht erst lesen
+            first = int(np.searchsorted(ends, row - done, side="right"))
+            if first:
+                done += int(ends[first - 1])
+            batches = pf.iter_batches(batch_size=chunksize, columns=columns,
+                                      row_groups=range(first, pf.num_row_groups))
+            for batch in batches:
+                if row > done:
+                    cut = min(row - done, batch.num_rows)
+                    batch = batch.slice(cut)
+                    done += cut
+                    if not batch.num_rows:
+                        continue
+                done += batch.num_rows
+                yield _frame(batch, self.table), {"row": done}, None
+
+
+def _frame(data, table) -> pd.DataFrame:
+    """Arrow-Tabelle/Batch -> DataFrame mit denselben Typen wie ``read_block``."""
+    import pyarrow as pa
+
+    df = data.to_pandas(types_mapper={pa.int64(): pd.Int64Dtype()}.get)
+    # fehlender Text ist dort NaN, nicht None (Maske aus Arrow, isna auf Objekten ist langsam)
+    for col in df.columns:
+        values = data.column(col)
+        if SCHEMAS[table][col] == "str" and values.null_count:
+            df.loc[values.is_null().to_numpy(zero_copy_only=False), col] = np.nan
+    return df
+
+
+def read_group(path, group, table, columns=None) -> pd.DataFrame:
+    """Eine Row Group lesen (z. B. im Worker, statt den Block zu übergeben)."""
+    import pyarrow.parquet as pq
+
+    pf = pq.ParquetFile(path, memory_map=True)
+    return _frame(pf.read_row_group(group, columns=columns), table)
+
+
+def open_staged(file_path, out_dir=None):
+    """``StagedTable`` zu einer .tsv.gz, falls eine aktuelle Kopie existiert, sonst None."""
+    out_dir = out_dir or stage_dir(os.path.dirname(file_path))
+    directory = os.path.join(out_dir, _table_name(file_path))
+    try:
+        with open(os.path.join(directory, META), encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta["source"] != _source_info(file_path):
+            return None
+    except (OSError, ValueError, KeyError):
+        return None
+    return StagedTable(directory, meta)
+
+
+# ---------------------- CLI ----------------------
+def main():
+    ap = argparse.ArgumentParser(description="IMDb-.tsv.gz einmalig nach Parquet umwandeln")
+    ap.add_argument("directory", help="Ordner mit den .tsv.gz")
+    ap.add_argument("--out", default=None, help=f"Zielordner (Standard: <directory>/{STAGE_SUBDIR})")
+    ap.add_argument("--table", action="append", help="Standard: alle")
+    ap.add_argument("--chunksize", type=int, default=CHUNKSIZE, help="Zeilen je Row Group")
+    ap.add_argument("--engine", default=None, choices=["c", "pyarrow"], help="CSV-Parser für die Umwandlung")
+    ap.add_argument("--force", action="store_true", help="auch aktuelle Kopien neu schreiben")
+    args = ap.parse_args()
+
+    t = time.perf_counter()
+    staged = stage(args.directory, args.out, args.table, args.chunksize, args.engine, args.force)
+    print(f"[OK] {len(staged)} Tabellen umgewandelt in {time.perf_counter() - t:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
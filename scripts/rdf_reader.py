@@ -0,0 +1,173 @@
+# ---------------------- LESEN DER IMDb-TABELLEN -------------------------------
+"""
+Liest die IMDb-.tsv.gz blockweise: je ``CHUNKSIZE`` Datenzeilen werden als
+Bytes aus dem gzip-Strom geschnitten und erst dann mit pandas geparst.
+
+Weil die Blöcke selbst geschnitten werden, ist nach jedem Block bekannt, wie
+weit die Quelle gelesen ist (unkomprimierte Position und Byte-Offset in der
+.gz-Datei). Darauf bauen der Prozess-Pool (Blöcke als Bytes an die Worker)
+und die Checkpoints (Fortsetzen ab einer Position) auf.
+
+Geparst wird nach einem festen Schema pro Tabelle (``SCHEMAS``): nur die
+benötigten Spalten, ``\\N`` als fehlender Wert, Jahre/Laufzeit/Stimmen/Nummern
+als nullable ``Int64``, Bewertungen als float, Spalten mit wenigen Werten als
+``category``. pandas muss so keine Typen mehr pro Chunk raten (``seasonNumber``
+wird nicht mehr zu float, sobald ``\\N`` vorkommt).
+
+Liegt eine aktuelle Parquet-Kopie vor (``rdf_parquet``), liefern
+``iter_frames``/``iter_chunks`` die DataFrames direkt daraus, ohne gzip und CSV.
+"""
+
+import io
+from itertools import islice
+
+import pandas as pd
+from pandas._libs.parsers import STR_NA_VALUES
+
+from rdf_gzip import READ_SIZE, open_gzip_reader
+
+CHUNKSIZE = 100_000
+
+# gzip im Hintergrund-Thread dekomprimieren (siehe rdf_gzip.ThreadedGzipReader)
+THREADED_READ = True
+
+# "c" = pandas-Parser, "pyarrow" = pyarrow.csv (optional, schneller bei breiten Tabellen)
+ENGINE = "c"
+
+# Parquet-Kopie aus rdf_parquet lesen, wenn sie zur .tsv.gz passt
+USE_STAGED = True
+
+# Spalte -> Typ; die Reihenfolge der Einträge ist auch die Spaltenauswahl (usecols)
+SCHEMAS = {
+    "title.basics": {
+        "tconst": "str", "titleType": "category", "primaryTitle": "str",
+        "originalTitle": "str", "isAdult": "category", "startYear": "Int64",
+        "endYear": "Int64", "runtimeMinutes": "Int64", "genres": "str",
+    },
+    "title.ratings": {"tconst": "str", "averageRating": "float", "numVotes": "Int64"},
+    "title.akas": {
+        "titleId": "str", "ordering": "Int64", "title": "str",
+        "region": "category", "language": "category",
+    },
+    "title.episode": {
+        "tconst": "str", "parentTconst": "str",
+        "seasonNumber": "Int64", "episodeNumber": "Int64",
+    },
+    "name.basics": {
+        "nconst": "str", "primaryName": "str", "birthYear": "Int64", "deathYear": "Int64",
+        "primaryProfession": "str", "knownForTitles": "str",
+    },
+    "title.crew": {"tconst": "str", "directors": "str", "writers": "str"},
+    "title.principals": {"tconst": "str", "nconst": "str", "category": "category", "job": "str"},
+}
+
+# pandas-Standardliste fehlender Werte plus IMDb-Null, für beide Engines gleich
+NA_VALUES = sorted(STR_NA_VALUES | {r"\N"})
+
+
+def iter_blocks(file_path, lines_per_block=CHUNKSIZE, start=0):
+    """Liefert (Kopfzeile, Block, Position, gz-Offset) für je ``lines_per_block`` Zeilen.
+
+    ``Position`` ist die unkomprimierte Position nach dem Block (für ``start``
+    beim Fortsetzen), ``gz-Offset`` die bis dahin gelesene Stelle in der .gz-Datei.
+    """
+    f, gz_offset = open_gzip_reader(file_path, THREADED_READ)
+    with f:
+        header = f.readline()
+        # vorwärts bis ``start``: dekomprimieren und verwerfen, ohne zu parsen
+        skip = start - f.tell() if start else 0
+        while skip > 0:
+            n = len(f.read(min(skip, READ_SIZE)))
+            if not n:
+                break
+            skip -= n
+        while True:
+            block = b"".join(islice(f, lines_per_block))
+            if not block:
+                break
+            yield header, block, f.tell(), gz_offset()
+
+
+def _apply_schema(df, schema):
+    for col, kind in schema.items():
+        if kind == "Int64":
+            # nur ganze Zahlen übernehmen (wie int(v) im zeilenweisen Pfad), Rest wird <NA>
+            s = df[col].where(df[col].str.fullmatch(r"-?\d+", na=False))
+            df[col] = pd.to_numeric(s).astype("Int64")
+        elif kind == "float":
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+        elif kind == "category":
+            df[col] = df[col].astype("category")
+    return df
+
+
+def _read_pyarrow(data, schema):
+    from pyarrow import csv, string
+
+    table = csv.read_csv(
+        io.BytesIO(data),
+        parse_options=csv.ParseOptions(delimiter="\t", invalid_row_handler=lambda row: "skip"),
+        convert_options=csv.ConvertOptions(
+            include_columns=list(schema),
+            column_types={c: string() for c in schema},
+            null_values=NA_VALUES,
+            strings_can_be_null=True,
+        ),
+    )
+    return table.to_pandas()
+
+
+def read_block(header, block, table=None, engine=None):
+    """Einen Block in einen DataFrame parsen, typisiert nach ``SCHEMAS[table]``.
+
+    Ohne bekanntes Schema wird wie früher ungetypt gelesen.
+    """
+    engine = engine or ENGINE
+    schema = SCHEMAS.get(table)
+    if schema is None:
+        return pd.read_csv(io.BytesIO(header + block), sep="\t", on_bad_lines="skip")
+    if engine == "pyarrow":
+        df = _read_pyarrow(header + block, schema)
+    else:
+        df = pd.read_csv(io.BytesIO(header + block), sep="\t", on_bad_lines="skip",
+                         usecols=list(schema), dtype=str,
+                         keep_default_na=False, na_values=NA_VALUES)
+    return _apply_schema(df, schema)
+
+
+def staged_source(file_path, start=0):
+    """Aktuelle Parquet-Kopie der .tsv.gz (``rdf_parquet.StagedTable``) oder None.
+
+    ``start`` ist eine Checkpoint-Position: ``{"row": n}`` stammt aus der Kopie,
+    eine Zahl > 0 aus der .tsv.gz, die dann auch weiter gelesen wird.
+    """
+    from rdf_parquet import open_staged
+
+    if isinstance(start, dict):
+        staged = open_staged(file_path)
+        if staged is None:
+            raise ValueError(f"{file_path}: Checkpoint aus der Parquet-Kopie, die fehlt oder veraltet ist")
+        return staged
+    return open_staged(file_path) if USE_STAGED and not start else None
+
+
+def iter_frames(file_path, table, chunksize=CHUNKSIZE, start=0, engine=None, columns=None):
+    """Liefert (DataFrame, Position, gz-Offset) je ``chunksize`` Zeilen.
+
+    Aus der Parquet-Kopie, falls vorhanden (Position ``{"row": n}``, kein
+    gz-Offset), sonst aus der .tsv.gz wie ``iter_blocks`` + ``read_block``.
+    ``columns`` wählt Spalten aus (in der Kopie werden nur diese gelesen).
+    """
+    staged = staged_source(file_path, start)
+    if staged is not None:
+        yield from staged.iter_frames(chunksize, start, columns)
+        return
+    for header, block, pos, gz_offset in iter_blocks(file_path, chunksize, start):
+        df = read_block(header, block, table, engine)
+        yield (df if columns is None else df[columns]), pos, gz_offset
+
+
+def iter_chunks(file_path, table, chunksize=CHUNKSIZE, engine=None):
+    """Typisierte DataFrames zu je ``chunksize`` Zeilen (Ersatz für read_csv(chunksize=...))."""
+    for df, _, _ in iter_frames(file_path, table, chunksize, engine=engine):
+        yield df
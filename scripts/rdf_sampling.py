@@ -0,0 +1,134 @@
+# ---------------------- GESCHICHTETES, REPRODUZIERBARES SAMPLING -------------------------------
+"""
+Bausteine für Stichproben mit festem Tripel-Budget und Quoten pro Klasse.
+
+- ``Reservoir``: Bottom-k-Reservoir (jede Zeile bekommt einen Zufallsschlüssel,
+  behalten werden die ``k`` kleinsten). Das ist gleichwertig zum klassischen
+  Reservoir-Sampling, läuft aber spaltenweise pro Chunk und braucht unabhängig
+  von der Eingabegröße nur ``k`` Zeilen Speicher.
+- Der Schlüssel ist ein mit dem Seed parametrisierter Hash der Zeile. Er hängt
+  also weder von der Chunkgröße noch davon ab, ob die Zeilen über den
+  Offset-Index oder per kompletten Durchlauf gelesen werden.
+- ``Budget``: reservierte Tripel pro Klasse; was eine Klasse nicht braucht,
+  geht an die nächste Klasse weiter, insgesamt wird das Budget nie überschritten.
+  ``max_available`` begrenzt die Reservoirgröße einer Klasse schon vorab.
+- ``fit``: nimmt aus den (zufällig geordneten) Zeilen einer Klasse den längsten
+  Anfang, dessen neue Tripel noch in die Quote passen (Binärsuche).
+"""
+
+import zlib
+from typing import Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+
+
+def class_seed(seed: int, name: str) -> int:
+    """Eigener, stabiler Seed je Klasse/Tabelle (unabhängig von PYTHONHASHSEED)."""
+    return (seed * 1_000_003 + zlib.crc32(name.encode("utf-8"))) & 0xFFFFFFFF
+
+
+def row_keys(df: pd.DataFrame, hash_key: str) -> np.ndarray:
+    """Zufallsschlüssel in [0, 1) je Zeile, bestimmt durch Zeileninhalt und ``hash_key``."""
+    h = pd.util.hash_pandas_object(df, index=False, hash_key=hash_key).to_numpy()
+    return (h >> np.uint64(11)).astype(np.float64) / float(1 << 53)
+
+
+class Reservoir:
+    """Die ``k`` Zeilen mit den kleinsten Zufallsschlüsseln (Bottom-k)."""
+
+    def __init__(self, k: int):
+        self.k = k
+        self._df = None
+        self._keys = np.empty(0)
+        self.seen = 0
+
+    def add(self, df: pd.DataFrame, keys: np.ndarray):
+        self.seen += len(df)
+        if not len(df) or not self.k:
+            return
+        if self._df is not None:
+            df = pd.concat([self._df, df], ignore_index=True)
+            keys = np.concatenate([self._keys, keys])
+        if len(keys) > self.k:
+            keep = np.argpartition(keys, self.k - 1)[:self.k]
+            df, keys = df.iloc[keep], keys[keep]
+        self._df, self._keys = df.reset_index(drop=True), keys
+
+    def rows(self) -> pd.DataFrame:
+        """Gezogene Zeilen in zufälliger (aber reproduzierbarer) Reihenfolge."""
+        if self._df is None:
+            return pd.DataFrame()
+        return self._df.iloc[np.argsort(self._keys, kind="stable")].reset_index(drop=True)
+
+
+class StratifiedReservoir:
+    """Ein Reservoir je Klasse über derselben Tabelle."""
+
+    def __init__(self, sizes: Dict[str, int], seed: int):
+        self.reservoirs = {c: Reservoir(k) for c, k in sizes.items()}
+        self._hash_key = f"{seed:016x}"[-16:]
+
+    def offer(self, df: pd.DataFrame, classes=None, mask=None):
+        """Chunk anbieten; ``classes`` ordnet jede Zeile einer Klasse zu (None = einzige Klasse),
+        ``mask`` schließt Zeilen vorher aus (z. B. Titel, die nicht in der Stichprobe sind)."""
+        keys = row_keys(df, self._hash_key)
+        keep = np.ones(len(df), dtype=bool) if mask is None else np.asarray(mask, dtype=bool)
+        for c, res in self.reservoirs.items():
+            m = keep if classes is None else keep & (np.asarray(classes) == c)
+            res.add(df[m], keys[m])
+
+    def __getitem__(self, name) -> Reservoir:
+        return self.reservoirs[name]
+
+
+class Budget:
+    """Reservierte Tripel pro Klasse, nicht genutzte Reste wandern zur nächsten Klasse."""
+
+    def __init__(self, total: int, quotas: Dict[str, float]):
+        self.total = total
+        weight = sum(quotas.values())
+        self.reserved = {c: int(total * q / weight) for c, q in quotas.items()}
+        self.used: Dict[str, int] = {}
+        self._carry = 0
+
+    def available(self, name: str) -> int:
+        return self.reserved[name] + self._carry
+
+    def max_available(self, name: str) -> int:
+        """Obergrenze für ``available(name)``, bevor die früheren Klassen eingepasst sind:
+        die eigene Reservierung plus alles, was die Klassen davor weitergeben können."""
+        order = list(self.reserved)
+        return sum(self.reserved[c] for c in order[:order.index(name) + 1])
+
+    def spend(self, name: str, n: int):
+        avail = self.available(name)
+        if n > avail:
+            raise ValueError(f"{name}: {n} Tripel > verfügbar {avail}")
+        self.used[name] = n
+        self._carry = avail - n
+
+    @property
+    def left(self) -> int:
+        return self.total - sum(self.used.values())
+
+
+def fit(emit: Callable[[int], List[str]], n_max: int, quota: int, seen: set):
+    """Größtes ``n``, für das ``emit(n)`` höchstens ``quota`` neue Zeilen liefert.
+
+    ``emit(n)`` erzeugt die Tripel der ersten ``n`` Einheiten; mehr Einheiten
+    ergeben nie weniger Zeilen, deshalb genügt eine Binärsuche.
+    Liefert (n, neue Zeilen).
+    """
+    def new_lines(n):
+        return [l for l in emit(n) if l not in seen] if n else []
+
+    lo, hi, best = 0, n_max, []
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        cand = new_lines(mid)
+        if len(cand) <= quota:
+            lo, best = mid, cand
+        else:
+            hi = mid - 1
+    return lo, best
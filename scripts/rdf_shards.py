@@ -0,0 +1,166 @@
+# ---------------------- ROLLIERENDE .nt.gz-SHARDS MIT MANIFEST -------------------------------
+"""
+Schreibt die Tripel direkt in ``<prefix>0001.nt.gz``, ``<prefix>0002.nt.gz``, …
+statt in eine große .ttl-Datei, die danach von ``rdf_zip_and_split.py``
+noch einmal gelesen und aufgeteilt werden muss.
+
+Ein neuer Shard beginnt, sobald ``max_triples`` Tripel oder ``max_bytes``
+komprimierte Bytes erreicht sind. Die Tripelgrenze ist exakt (ein Block wird
+notfalls an einer Zeilengrenze geteilt), die Bytegrenze wird nach jedem
+Schreiben geprüft und kann um die noch laufenden Kompressionsblöcke überschritten werden.
+
+Das Manifest (JSON) führt jeden abgeschlossenen Shard mit Tripelzahl,
+Dateigröße und SHA-256 und wird nach jedem Shard atomar ersetzt; der Uploader
+liest nur noch das Manifest (``"complete": true`` nach ``close()``).
+
+Hat die Schnittstelle von ``NTriplesWriter`` (add, write, sync, close,
+``triples``, ``path`` = aktueller Shard), damit Checkpoints unverändert funktionieren.
+"""
+
+import hashlib
+import json
+import os
+
+from rdf_gzip import WRITE_THREADS
+from rdf_writer import BUFFER_SIZE, NTriplesWriter
+
+# Standardgrenzen wie bisher in rdf_zip_and_split.py
+MAX_TRIPLES = 5_000_000
+MAX_BYTES = None
+
+
+def sha256_file(path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(BUFFER_SIZE), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def load_manifest(path) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+class ShardedWriter:
+    """Rollierende gzip-Shards; ``resume=(shard, triples)`` setzt nach einem Abbruch fort.
+
+    Beim Fortsetzen muss der Shard ``shard`` bereits auf den gesicherten Stand
+    gekürzt sein (``Checkpoint.truncate_output``); spätere Shards werden gelöscht.
+    """
+
+    def __init__(self, prefix, max_triples=MAX_TRIPLES, max_bytes=MAX_BYTES, manifest=None,
+                 compresslevel=6, threads=WRITE_THREADS, resume=None):
+        self.prefix = prefix
+        self.max_triples = max_triples
+        self.max_bytes = max_bytes
+        self.manifest_path = manifest or f"{prefix}manifest.json"
+        self._compresslevel = compresslevel
+        self._threads = threads
+        self.shards = []
+        self.triples = 0
+        if resume is None:
+            self._index = 1
+            self._open('wb', 0)
+        else:
+            self._resume(*resume)
+
+    # -------- Shard-Verwaltung --------
+    def shard_path(self, index):
+        return f"{self.prefix}{index:04d}.nt.gz"
+
+    def _open(self, mode, shard_triples):
+        self._out = NTriplesWriter(self.shard_path(self._index), compress=True, mode=mode,
+                                   compresslevel=self._compresslevel, threads=self._threads)
+        self._out.triples = shard_triples
+        self.path = self._out.path
+
+    def _close_shard(self):
+        self._out.close()
+        self.shards.append({
+            "file": os.path.basename(self.path),
+            "triples": self._out.triples,
+            "bytes": os.path.getsize(self.path),
+            "sha256": sha256_file(self.path),
+        })
+        print(f"[✓] Shard {os.path.basename(self.path)} fertig ({self._out.triples} Tripel)")
+
+    def _roll(self):
+        self._close_shard()
+        self._write_manifest(complete=False)
+        self._index += 1
+        self._open('wb', 0)
+
+    def _resume(self, shard, triples):
+        self._index = int(shard[len(self.prefix):].split(".", 1)[0])
+        if os.path.exists(self.manifest_path):
+            self.shards = load_manifest(self.manifest_path)["shards"][:self._index - 1]
+        # nach dem letzten Checkpoint begonnene Shards verwerfen
+        later = self._index + 1
+        while os.path.exists(self.shard_path(later)):
+            os.remove(self.shard_path(later))
+            later += 1
+        self.triples = triples
+        self._open('ab', triples - sum(s["triples"] for s in self.shards))
+
+    def _write_manifest(self, complete):
+        tmp = self.manifest_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"complete": complete,
+                       "triples": sum(s["triples"] for s in self.shards),
+                       "shards": self.shards}, f, indent=1)
+        os.replace(tmp, self.manifest_path)
+
+    # -------- Schreiben --------
+    def _full(self):
+        if self.max_triples and self._out.triples >= self.max_triples:
+            return True
+        return bool(self.max_bytes) and self._out.tell() >= self.max_bytes
+
+    def write(self, data: str):
+        while data:
+            if self._full():
+                self._roll()
+            take = data
+            if self.max_triples:
+                room = self.max_triples - self._out.triples
+                if data.count("\n") > room:
+                    cut = -1
+                    for _ in range(room):
+                        cut = data.index("\n", cut + 1)
+                    take = data[:cut + 1]
+            self._out.write(take)
+            self.triples += take.count("\n")
+            data = data[len(take):]
+
+    def write_raw(self, data: str):
+        self._out.write_raw(data)
+
+    def add(self, triple):
+        if self._full():
+            self._roll()
+        self._out.add(triple)
+        self.triples += 1
+
+    def write_graph(self, graph):
+        for triple in graph:
+            self.add(triple)
+
+    # -------- Verwaltung --------
+    def flush(self):
+        self._out.flush()
+
+    def sync(self) -> int:
+        return self._out.sync()
+
+    def close(self):
+        self._close_shard()
+        self._write_manifest(complete=True)
+        print(f"[✓] Manifest '{self.manifest_path}': {len(self.shards)} Shards, {self.triples} Tripel")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
@@ -0,0 +1,381 @@
+# ---------------------- STATISTIK-GRAPH (VoID) -------------------------------
+"""
+Aggregate für die fünf Abfragen aus ``imdb_exploration.ipynb``, schon beim
+Schreiben gezählt statt im Store über den ganzen Datensatz:
+
+1. Instanzen pro Klasse (verschiedene Subjekte je Klasse, dazu alle ``owl:Class``)
+2. Tripel pro Prädikat
+3. die ``TOP_K`` bestbewerteten Titel mit mehr als ``MIN_VOTES`` Stimmen
+4. die ``TOP_K`` Titel mit der längsten Laufzeit
+5. Rollen pro ``imd:roleName``
+
+``DatasetStats.observe(text)`` liest N-Triples-Text (ein Chunk der
+Transformation oder ein beliebiger Block einer fertigen Ausgabe) mit ein paar
+Regex-Durchläufen; Ranglisten sind Heaps der Größe ``TOP_K``. Ein Rating, dessen
+Zeilen auf zwei Blöcke verteilt sind, wartet in ``_pending``, bis alles da ist.
+
+``write(path)`` schreibt das Ergebnis als N-Quads in den benannten Graphen
+``STATS_GRAPH`` (VoID-Vokabular für 1./2., eigenes ``stat:``-Vokabular für
+3.-5.); ``QUERIES`` sind die fünf Abfragen gegen diesen Graphen.
+
+Manche Tripel entstehen in zwei Tabellen (``imd:Episode`` aus basics und
+episode, ``imd:Role``-Knoten aus crew und principals), der Store speichert sie
+nur einmal. Instanzen werden deshalb als verschiedene Subjekte gezählt, je
+Klasse und IRI-Art in einem ``rdf_integrity.IdSet`` (IMDb-ID als Bit);
+zusammengesetzte Schlüssel (Rollen, AKAs) gehen als 128-Bit-Hash in
+``SPILL_BUCKETS`` Dateien auf der Platte statt in den Speicher. Ebenso gezählt
+werden ``roleName``, ``roleIn`` und ``hasRole``: die Rollen-IRI legt Titel,
+Rolle und Person fest, jeder Knoten hat also genau ein solches Tripel. Daraus
+ergeben sich auch ``rdf:type``, die Rollen pro Name und die Tripelsumme ohne
+die doppelten Tripel; alle anderen Prädikate entstehen nur in einer Tabelle.
+
+Ein neuer Stand ersetzt den alten im Store nicht von selbst, vorher
+``DROP GRAPH <http://example.org/imdb/graph/statistics>`` ausführen.
+
+Aufruf:  python rdf_stats.py imdb_dedup.nt
+         python rdf_stats.py imdb_shard_manifest.json --out imdb.stats.nq
+         python rdf_store.py load imdb_store imdb.stats.nq
+"""
+
+import argparse
+import heapq
+import os
+import re
+import shutil
+import tempfile
+import time
+import weakref
+from collections import Counter
+from itertools import chain
+from urllib.parse import quote
+
+import numpy as np
+
+from rdf_dedup import hash128
+from rdf_emit import IMD, RDF_NS, RDF_TYPE, RDFS_NS, RES, XSD_DECIMAL, XSD_INTEGER, _u, imd
+from rdf_gzip import open_gzip_reader
+from rdf_store import sources
+from rdf_terms import TermTable
+from rdf_writer import check_ntriples
+
+# ------------------ Parameter ------------------
+TOP_K = 20
+MIN_VOTES = 2000          # Bestenliste: nur Titel mit mehr Stimmen
+
+# Bytes pro Block beim Lesen einer fertigen Ausgabe
+READ_BLOCK = 1 << 24
+
+# Subjekte ohne einfache IMDb-ID: Hashes im Speicher, bevor sie in die Buckets gehen
+SPILL_KEYS = 1 << 20
+SPILL_BUCKETS = 64
+
+# Vokabular und Graph
+VOID = 'http://rdfs.org/ns/void#'
+STAT = 'http://example.org/imdb/stats#'
+OWL_CLASS = _u('http://www.w3.org/2002/07/owl#Class')
+STATS_GRAPH = 'http://example.org/imdb/graph/statistics'
+DATASET = RES + 'dataset'
+
+_TRIPLE = re.compile(r'^(<[^>]*>) (<[^>]*>) ', re.M)
+_TYPE = re.compile(r'^(<[^>]*>) ' + re.escape(RDF_TYPE) + r' (<[^>]*>) \.$', re.M)
+_AVG = re.compile(r'^(<[^>]*>) ' + re.escape(imd('averageRating')) + r' "([^"]*)"', re.M)
+_VOTES = re.compile(r'^(<[^>]*>) ' + re.escape(imd('numVotes')) + r' "(-?\d+)"', re.M)
+_HAS_RATING = re.compile(r'^(<[^>]*>) ' + re.escape(imd('hasRating')) + r' (<[^>]*>) \.$', re.M)
+_RUNTIME = re.compile(r'^(<[^>]*>) ' + re.escape(imd('runtimeMinutes')) + r' "(-?\d+)"', re.M)
+_ROLE_NAME = re.compile(r'^(<[^>]*>) ' + re.escape(imd('roleName')) + r' ("(?:[^"\\]|\\.)*"\S*) \.$', re.M)
+
+# Rollen-Prädikate mit genau einem Tripel je Knoten -> Regex, die den Knoten liefert
+_ROLE_NODE = {
+    imd('roleIn'): re.compile(r'^(<[^>]*>) ' + re.escape(imd('roleIn')) + r' <[^>]*> \.$', re.M),
+    imd('hasRole'): re.compile(r'^<[^>]*> ' + re.escape(imd('hasRole')) + r' (<[^>]*>) \.$', re.M),
+}
+
+
+def _int(n) -> str:
+    return f'"{n}"^^<{XSD_INTEGER}>'
+
+
+def void(name) -> str:
+    return _u(VOID + name)
+
+
+def stat(name) -> str:
+    return _u(STAT + name)
+
+
+def _node(kind, key) -> str:
+    """Stabile IRI für einen Eintrag (gleiche Statistik -> gleiche Quads)."""
+    return _u(f"{DATASET}/{kind}/{quote(str(key), safe='')}")
+
+
+def _subject_key(s):
+    """``<…/resource/title/tt1>`` -> ("title", "tt1"); andere Subjekte -> ("", Term)."""
+    if s.startswith("<" + RES):
+        kind, _, key = s[len(RES) + 1:-1].partition("/")
+        return kind, key
+    return "", s
+
+
+_HASH_RECORD = np.dtype([("h1", "<u8"), ("h2", "<u8")])
+
+
+class _HashSpill:
+    """Verschiedene Schlüssel als 128-Bit-Hashes, nach Hash auf ``SPILL_BUCKETS`` Dateien verteilt."""
+
+    def __init__(self, tmp_dir=None):
+        self._tmp_dir = tmp_dir
+        self._dir = None
+        self._buf = []
+
+    def update(self, keys):
+        self._buf.extend(keys)
+        if len(self._buf) >= SPILL_KEYS:
+            self._spill()
+
+    def _spill(self):
+        if not self._buf:
+            return
+        if self._dir is None:
+            self._dir = tempfile.mkdtemp(prefix="stats_", dir=self._tmp_dir)
+            weakref.finalize(self, shutil.rmtree, self._dir, True)
+        rec = np.empty(len(self._buf), dtype=_HASH_RECORD)
+        rec["h1"], rec["h2"] = hash128(self._buf)
+        rec = np.unique(rec)
+        bucket = rec["h1"] % np.uint64(SPILL_BUCKETS)
+        for b in np.unique(bucket):
+            with open(os.path.join(self._dir, f"{b:03d}.bin"), "ab") as f:
+                rec[bucket == b].tofile(f)
+        self._buf = []
+
+    def __len__(self):
+        self._spill()
+        if self._dir is None:
+            return 0
+        return sum(len(np.unique(np.fromfile(os.path.join(self._dir, name), dtype=_HASH_RECORD)))
+                   for name in os.listdir(self._dir))
+
+
+class DatasetStats:
+    def __init__(self, top_k=TOP_K, min_votes=MIN_VOTES, tmp_dir=None):
+        self.top_k = top_k
+        self.min_votes = min_votes
+        self.tmp_dir = tmp_dir
+        self.triples = 0
+        self.predicates = Counter()      # Prädikat -> Tripel (wie geschrieben)
+        self.classes = Counter()         # Klasse -> rdf:type-Tripel (wie geschrieben)
+        self.declared = set()            # alle owl:Class (auch ohne Instanzen)
+        # ("class", Klasse | "predicate", Prädikat | "roleName", Literal, IRI-Art) -> IdSet
+        self.distinct = {}
+        self.top_rated = []              # (Bewertung, Stimmen, Titel, Lexikalform)
+        self.longest = []                # (Minuten, Titel)
+        self._pending = {}               # Rating -> [Bewertung, Stimmen, Titel]
+
+    # -------- Zählen --------
+    def observe(self, data: str):
+        preds = [p for _, p in _TRIPLE.findall(data)]
+        self.triples += len(preds)
+        self.predicates.update(preds)
+        types = {}
+        for s, o in _TYPE.findall(data):
+            self.classes[o] += 1
+            if o == OWL_CLASS:
+                self.declared.add(s)
+            types.setdefault(o, []).append(s)
+        for c, subjects in types.items():
+            self._distinct(("class", c), subjects)
+        if '#averageRating>' in data or '#numVotes>' in data or '#hasRating>' in data:
+            self._ratings(data)
+        if '#runtimeMinutes>' in data:
+            found = ((int(n), t) for t, n in _RUNTIME.findall(data))
+            self.longest = heapq.nlargest(self.top_k, chain(self.longest, found))
+        if '#roleName>' in data:
+            names = {}
+            for node, lit in _ROLE_NAME.findall(data):
+                names.setdefault(lit, []).append(node)
+            for lit, nodes in names.items():
+                self._distinct(("roleName", lit), nodes)
+        for pred, pattern in _ROLE_NODE.items():
+            if pred in data:
+                self._distinct(("predicate", pred), pattern.findall(data))
+
+    def _distinct(self, group, nodes):
+        """IRIs ``nodes`` in die Menge(n) ``group`` aufnehmen, eine je IRI-Art."""
+        by_kind = {}
+        for node in nodes:
+            kind, key = _subject_key(node)
+            by_kind.setdefault(kind, []).append(key)
+        for kind, keys in by_kind.items():
+            ids = self.distinct.get((*group, kind))
+            if ids is None:
+                # erst hier: rdf_integrity importiert selbst rdf_stats (read_blocks)
+                from rdf_integrity import IdSet
+                ids = self.distinct[(*group, kind)] = IdSet(other=_HashSpill(self.tmp_dir))
+            ids.add(keys)
+
+    def _ratings(self, data):
+        p = self._pending
+        for r, v in _AVG.findall(data):
+            p.setdefault(r, [None, None, None])[0] = v
+        for r, n in _VOTES.findall(data):
+            p.setdefault(r, [None, None, None])[1] = int(n)
+        for t, r in _HAS_RATING.findall(data):
+            p.setdefault(r, [None, None, None])[2] = t
+        found = []
+        for r in [r for r, e in p.items() if None not in e]:
+            avg, votes, title = p.pop(r)
+            if votes > self.min_votes:
+                found.append((float(avg), votes, title, avg))
+        self.top_rated = heapq.nlargest(self.top_k, chain(self.top_rated, found))
+
+    # -------- Ausgabe --------
+    def counts(self, what) -> Counter:
+        """Verschiedene Knoten je Klasse, Rollen-Prädikat oder Rollenname (``what``)."""
+        out = Counter()
+        for (w, name, _), ids in self.distinct.items():
+            if w == what:
+                out[name] += len(ids)
+        return out
+
+    def predicate_counts(self) -> Counter:
+        """Tripel je Prädikat, doppelt geschriebene Typ- und Rollen-Tripel nur einmal."""
+        out = self.predicates.copy()
+        exact = self.counts("predicate")
+        exact[RDF_TYPE] = sum(self.counts("class").values())
+        exact[imd('roleName')] = sum(self.counts("roleName").values())
+        for pred, n in exact.items():
+            if pred in out:
+                out[pred] = n
+        return out
+
+    def triples_out(self):
+        """Statistik als (s, p, o)-Tupel in N-Triples-Schreibweise (ohne Graph)."""
+        instances = self.counts("class")
+        predicates = self.predicate_counts()
+        d = _u(DATASET)
+        out = [
+            (d, RDF_TYPE, void('Dataset')),
+            (d, void('triples'), _int(sum(predicates.values()))),
+            (d, void('classes'), _int(len(set(self.classes) | self.declared))),
+            (d, void('properties'), _int(len(self.predicates))),
+        ]
+        for c in sorted(set(self.classes) | self.declared):
+            n = _node("class", c[1:-1])
+            out += [(d, void('classPartition'), n), (n, void('class'), c),
+                    (n, void('entities'), _int(instances[c]))]
+        for pr, cnt in predicates.most_common():
+            n = _node("property", pr[1:-1])
+            out += [(d, void('propertyPartition'), n), (n, void('property'), pr),
+                    (n, void('triples'), _int(cnt))]
+        for rank, (_, votes, title, avg) in enumerate(sorted(self.top_rated, reverse=True), 1):
+            n = _node("topRated", rank)
+            out += [(n, RDF_TYPE, stat('TopRated')), (n, stat('rank'), _int(rank)),
+                    (n, stat('title'), title), (n, stat('value'), f'"{avg}"^^<{XSD_DECIMAL}>'),
+                    (n, stat('numVotes'), _int(votes))]
+        for rank, (minutes, title) in enumerate(sorted(self.longest, reverse=True), 1):
+            n = _node("longestRuntime", rank)
+            out += [(n, RDF_TYPE, stat('LongestRuntime')), (n, stat('rank'), _int(rank)),
+                    (n, stat('title'), title), (n, stat('value'), _int(minutes))]
+        for lit, cnt in self.counts("roleName").most_common():
+            n = _node("roleName", lit)
+            out += [(n, RDF_TYPE, stat('RoleName')), (n, stat('roleName'), lit),
+                    (n, stat('count'), _int(cnt))]
+        return out
+
+    def write(self, path, graph=STATS_GRAPH):
+        g = _u(graph)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.writelines(f"{s} {p} {o} {g} .\n" for s, p, o in self.triples_out())
+        os.replace(tmp, path)
+
+    def summary(self):
+        triples = sum(self.predicate_counts().values())
+        return {"triples": triples, "duplicates": self.triples - triples,
+                "classes": len(set(self.classes) | self.declared),
+                "properties": len(self.predicates),
+                "role_names": len({name for w, name, _ in self.distinct if w == "roleName"}),
+                "top_rated": len(self.top_rated), "longest_runtime": len(self.longest),
+                "pending_ratings": len(self._pending)}
+
+
+# ------------------ fertige Ausgabe lesen ------------------
+def read_blocks(src):
+    """N-Triples-Text einer Quelle blockweise (Datei, .gz oder Term-Ordner).
+
+    .ttl nur, wenn zeilenweise wie die Ausgabe der Skripte (N-Triples mit
+    @prefix-Kopf); echtes Turtle bricht mit ValueError ab (``check_ntriples``).
+    """
+    if os.path.isdir(src):
+        yield from TermTable(src).iter_nt()
+        return
+    f = open_gzip_reader(src, threaded=True)[0] if src.endswith(".gz") else open(src, "rb")
+    with f:
+        for lines in iter(lambda: f.readlines(READ_BLOCK), []):
+            data = b"".join(lines).decode("utf-8")
+            check_ntriples(data, src)
+            yield data
+
+
+def scan(path, stats=None):
+    """Statistik aus einer fertigen Ausgabe (Datei, Manifest, Ordner oder Term-Ordner)."""
+    stats = stats or DatasetStats()
+    for src in sources(path):
+        for data in read_blocks(src):
+            stats.observe(data)
+    return stats
+
+
+# ------------------ Abfragen gegen den Statistik-Graphen ------------------
+_PREFIXES = f"""PREFIX void: <{VOID}>
+PREFIX stat: <{STAT}>
+PREFIX imd: <{IMD}>
+PREFIX rdfs: <{RDFS_NS}>
+PREFIX rdf: <{RDF_NS}>
+"""
+
+QUERIES = {
+    "classes": _PREFIXES + f"""SELECT ?class ?label ?instances WHERE {{
+  GRAPH <{STATS_GRAPH}> {{ ?part void:class ?class ; void:entities ?instances }}
+  FILTER(STRSTARTS(STR(?class), "{IMD}"))
+  OPTIONAL {{ ?class rdfs:label ?label }}
+}} ORDER BY ?class""",
+    "properties": _PREFIXES + f"""SELECT ?property ?triples WHERE {{
+  GRAPH <{STATS_GRAPH}> {{ ?part void:property ?property ; void:triples ?triples }}
+}} ORDER BY DESC(?triples)""",
+    "top_titles": _PREFIXES + f"""SELECT ?t ?primaryTitle ?averageRating ?numVotes WHERE {{
+  GRAPH <{STATS_GRAPH}> {{ ?e a stat:TopRated ; stat:rank ?rank ; stat:title ?t ;
+                           stat:value ?averageRating ; stat:numVotes ?numVotes }}
+  OPTIONAL {{ ?t imd:primaryTitle ?primaryTitle }}
+}} ORDER BY ?rank""",
+    "runtime": _PREFIXES + f"""SELECT ?t ?primaryTitle ?runtime WHERE {{
+  GRAPH <{STATS_GRAPH}> {{ ?e a stat:LongestRuntime ; stat:rank ?rank ; stat:title ?t ; stat:value ?runtime }}
+  OPTIONAL {{ ?t imd:primaryTitle ?primaryTitle }}
+}} ORDER BY ?rank""",
+    "roles": _PREFIXES + f"""SELECT ?roleName ?n WHERE {{
+  GRAPH <{STATS_GRAPH}> {{ ?e a stat:RoleName ; stat:roleName ?roleName ; stat:count ?n }}
+}} ORDER BY DESC(?n)""",
+}
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Statistik-Graph (VoID) aus einer fertigen Ausgabe")
+    ap.add_argument("input", help="N-Triples (.nt/.nt.gz, .ttl nur mit N-Triples-Zeilen), Shard-Manifest, Ordner oder Term-Ordner")
+    ap.add_argument("--out", default=None, help="N-Quads-Datei (Standard: <input>.stats.nq)")
+    ap.add_argument("--top", type=int, default=TOP_K)
+    ap.add_argument("--min-votes", type=int, default=MIN_VOTES)
+    args = ap.parse_args()
+
+    out = args.out or args.input.rstrip("/") + ".stats.nq"
+    t = time.perf_counter()
+    stats = scan(args.input, DatasetStats(args.top, args.min_votes))
+    stats.write(out)
+    s = stats.summary()
+    print(f"[✓] {s['triples']} Tripel, {s['classes']} Klassen, {s['properties']} Prädikate, "
+          f"{s['role_names']} Rollennamen in {time.perf_counter() - t:.1f}s")
+    if s["pending_ratings"]:
+        print(f"[!] {s['pending_ratings']} Ratings ohne Bewertung, Stimmen oder Titel")
+    print(f"[OK] Statistik-Graph in '{out}'")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,371 @@
+# ---------------------- LOKALER TRIPLE-STORE + SPARQL-ENDPOINT -------------------------------
+"""
+Lädt die erzeugten Shards in einen eingebetteten, persistenten Store
+(pyoxigraph, RocksDB auf der Platte) und stellt ihn als SPARQL-Endpoint bereit.
+So ist der ganze Datensatz auf einer Maschine abfragbar, ohne Upload zu TriplyDB.
+
+- ``load``: Quellen per ``Store.bulk_load`` einlesen. Der Bulk-Loader von
+  Oxigraph parst mit mehreren Threads und schreibt vorsortierte SST-Dateien
+  direkt in RocksDB (keine Transaktion pro Tripel). gzip wird in einem eigenen
+  Thread entpackt (``rdf_gzip``). Quellen: Shard-Manifest (``rdf_shards``),
+  .nt/.nt.gz/.ttl-Dateien, ein Term-Ordner (``rdf_terms``) oder N-Quads
+  (.nq, z. B. der Statistik-Graph aus ``rdf_stats``).
+  Geladene Quellen stehen in ``<store>/loaded.json`` und werden beim nächsten
+  Aufruf übersprungen; eine abgebrochene Quelle wird einfach neu geladen
+  (doppelte Tripel gibt es in einem RDF-Store nicht).
+- ``serve``: SPARQL-Protokoll über HTTP (GET/POST ``/sparql``), SELECT/ASK als
+  ``application/sparql-results+json``, CONSTRUCT/DESCRIBE als N-Triples;
+  ``/stats`` liefert Anzahl und Latenzen der bisherigen Anfragen.
+- ``query``/``bench``: einzelne Anfrage bzw. ``BENCH_QUERIES`` mehrfach
+  ausführen und Latenzen (Median, p95, Maximum) als JSON ausgeben;
+  ``bench --stats`` misst die Abfragen gegen den Statistik-Graphen (rdf_stats).
+
+pyoxigraph ist optional (``pip install pyoxigraph``) und wird erst beim
+Öffnen eines Stores importiert.
+
+Aufruf:  python rdf_store.py load imdb_store imdb_shard_manifest.json
+         python rdf_store.py serve imdb_store --port 7878
+         python rdf_store.py bench imdb_store --repeat 5
+"""
+
+import argparse
+import io
+import json
+import os
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from rdf_gzip import open_gzip_reader
+from rdf_shards import load_manifest
+from rdf_terms import TermTable
+
+HOST = "127.0.0.1"
+PORT = 7878
+
+# Zustandsdatei im Store-Ordner (bereits geladene Quellen)
+LOADED_FILE = "loaded.json"
+
+PREFIXES = """PREFIX res: <http://example.org/imdb/resource/>
+PREFIX imd: <http://example.org/imdb#>
+PREFIX title: <http://example.org/imdb/resource/title/>
+PREFIX person: <http://example.org/imdb/resource/person/>
+PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
+PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
+"""
+
+# typische Anfragen: Punktzugriffe, kurze Pfade, ein Aggregat über ein Prädikat
+BENCH_QUERIES = {
+    "title_by_id": "SELECT ?p ?o WHERE { title:tt0111161 ?p ?o }",
+    "roles_of_person": "SELECT ?role ?t WHERE { person:nm0000151 imd:hasRole ?role . ?role imd:roleIn ?t }",
+    "episodes_of_series": "SELECT ?e ?s ?n WHERE { ?e imd:parentSeries title:tt0903747 ; "
+                          "imd:seasonNumber ?s ; imd:episodeNumber ?n }",
+    "cast_of_title": "SELECT ?name ?role WHERE { ?r imd:roleIn title:tt0111161 ; imd:roleName ?role . "
+                     "?p imd:hasRole ?r ; rdfs:label ?name }",
+    "top_rated": "SELECT ?t ?avg WHERE { ?t imd:hasRating ?r . ?r imd:numVotes ?n ; imd:averageRating ?avg "
+                 "FILTER(?n > 1000000) } ORDER BY DESC(?avg) LIMIT 10",
+    "titles_per_genre": "SELECT ?g (COUNT(?t) AS ?n) WHERE { ?t imd:genre ?g } GROUP BY ?g ORDER BY DESC(?n)",
+}
+
+
+# ------------------ pyoxigraph (optional) ------------------
+def _oxigraph():
+    try:
+        import pyoxigraph
+    except ImportError as e:
+        raise ImportError("rdf_store braucht pyoxigraph: pip install pyoxigraph") from e
+    return pyoxigraph
+
+
+def _formats(ox):
+    """N-Triples/Turtle/N-Quads für bulk_load (pyoxigraph >= 0.4: RdfFormat, davor MIME-Typen)."""
+    if hasattr(ox, "RdfFormat"):
+        return ox.RdfFormat.N_TRIPLES, ox.RdfFormat.TURTLE, ox.RdfFormat.N_QUADS
+    return "application/n-triples", "text/turtle", "application/n-quads"
+
+
+def open_store(path):
+    return _oxigraph().Store(path)
+
+
+# ------------------ Quellen ------------------
+class _TextStream(io.RawIOBase):
+    """Generator von Text-Blöcken als lesbarer Binärstrom (Term-Ordner -> bulk_load)."""
+
+    def __init__(self, blocks):
+        self._blocks = blocks
+        self._buf = memoryview(b"")
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        while not self._buf:
+            data = next(self._blocks, None)
+            if data is None:
+                return 0
+            self._buf = memoryview(data.encode("utf-8"))
+        n = min(len(b), len(self._buf))
+        b[:n] = self._buf[:n]
+        self._buf = self._buf[n:]
+        return n
+
+
+def sources(path):
+    """Zu ladende Quellen; Manifest -> alle Shards in Reihenfolge, Ordner -> alle RDF-Dateien.
+
+    Echtes Turtle (.ttl) parst nur ``load`` (Oxigraph); die zeilenweisen Leser
+    (``rdf_stats.read_blocks`` usw.) lehnen es nach dem Inhalt ab.
+    """
+    if os.path.isdir(path):
+        if os.path.exists(os.path.join(path, "meta.json")):
+            return [path]
+        return sorted(os.path.join(path, f) for f in os.listdir(path)
+                      if f.endswith((".nt", ".nt.gz", ".ttl", ".ttl.gz", ".nq")))
+    if path.endswith(".json"):
+        manifest = load_manifest(path)
+        if not manifest.get("complete"):
+            print(f"[!] {path}: Transformation noch nicht abgeschlossen, lade die fertigen Shards")
+        base = os.path.dirname(os.path.abspath(path))
+        return [os.path.join(base, s["file"]) for s in manifest["shards"]]
+    return [path]
+
+
+def _open_source(src, ox):
+    nt, ttl, nq = _formats(ox)
+    if os.path.isdir(src):
+        return io.BufferedReader(_TextStream(TermTable(src).iter_nt()), 1 << 20), nt
+    name = os.path.basename(src)
+    fmt = nq if name.endswith(".nq") else ttl if ".ttl" in name else nt
+    if src.endswith(".gz"):
+        return open_gzip_reader(src, threaded=True)[0], fmt
+    return open(src, "rb"), fmt
+
+
+def _fingerprint(src):
+    st = os.stat(os.path.join(src, "s.bin") if os.path.isdir(src) else src)
+    return {"size": st.st_size, "mtime": st.st_mtime}
+
+
+# ------------------ Laden ------------------
+def _load_state(store_dir):
+    path = os.path.join(store_dir, LOADED_FILE)
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    return {}
+
+
+def _save_state(store_dir, state):
+    path = os.path.join(store_dir, LOADED_FILE)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=1)
+    os.replace(path + ".tmp", path)
+
+
+def load(store_dir, inputs, graph=None, count=False):
+    """Quellen in den Store laden; liefert einen Bericht (Sekunden, Bytes/s je Quelle)."""
+    ox = _oxigraph()
+    os.makedirs(store_dir, exist_ok=True)
+    store = ox.Store(store_dir)
+    to_graph = ox.NamedNode(graph) if graph else None
+    state = _load_state(store_dir)
+    report = {"store": store_dir, "sources": []}
+    start = time.perf_counter()
+    for src in [s for p in inputs for s in sources(p)]:
+        key = os.path.abspath(src)
+        fp = _fingerprint(src)
+        if state.get(key, {}).get("fingerprint") == fp:
+            print(f"[Info] {os.path.basename(src)}: bereits geladen, übersprungen")
+            continue
+        t = time.perf_counter()
+        stream, fmt = _open_source(src, ox)
+        with stream:
+            # N-Quads (z. B. rdf_stats) bringen ihren Graphen selbst mit
+            if to_graph is not None and not src.endswith(".nq"):
+                store.bulk_load(stream, fmt, to_graph=to_graph)
+            else:
+                store.bulk_load(stream, fmt)
+        sec = time.perf_counter() - t
+        state[key] = {"fingerprint": fp, "seconds": round(sec, 3), "loaded": time.time()}
+        _save_state(store_dir, state)
+        report["sources"].append({"file": src, "bytes": fp["size"], "seconds": round(sec, 3),
+                                  "mb_per_s": round(fp["size"] / 1e6 / sec, 2) if sec else None})
+        print(f"[✓] {os.path.basename(src)} geladen ({fp['size'] / 1e6:.1f} MB in {sec:.1f}s)")
+    t = time.perf_counter()
+    store.optimize()
+    report["optimize_seconds"] = round(time.perf_counter() - t, 3)
+    report["seconds"] = round(time.perf_counter() - start, 3)
+    if count:
+        t = time.perf_counter()
+        report["quads"] = len(store)
+        report["count_seconds"] = round(time.perf_counter() - t, 3)
+    report["store_bytes"] = sum(os.path.getsize(os.path.join(d, f))
+                                for d, _, files in os.walk(store_dir) for f in files)
+    print(f"[OK] Laden fertig in {report['seconds']:.1f}s, Store {report['store_bytes'] / 1e9:.2f} GB"
+          + (f", {report['quads']} Quads" if count else ""))
+    return report
+
+
+# ------------------ Anfragen ------------------
+def _term_json(t, ox):
+    if isinstance(t, ox.NamedNode):
+        return {"type": "uri", "value": t.value}
+    if isinstance(t, ox.BlankNode):
+        return {"type": "bnode", "value": t.value}
+    out = {"type": "literal", "value": t.value}
+    if t.language:
+        out["xml:lang"] = t.language
+    elif t.datatype is not None and t.datatype.value != "http://www.w3.org/2001/XMLSchema#string":
+        out["datatype"] = t.datatype.value
+    return out
+
+
+def run_query(store, sparql, ox=None):
+    """Anfrage ausführen; liefert (Content-Type, Body als Bytes, Anzahl Ergebnisse)."""
+    ox = ox or _oxigraph()
+    # eigene PREFIX-Deklarationen der Anfrage überschreiben die Standard-Präfixe
+    result = store.query(PREFIXES + sparql)
+    if isinstance(result, ox.QuerySolutions):
+        names = [v.value for v in result.variables]
+        rows = [{n: _term_json(s[n], ox) for n in names if s[n] is not None} for s in result]
+        body = {"head": {"vars": names}, "results": {"bindings": rows}}
+        return "application/sparql-results+json", json.dumps(body).encode("utf-8"), len(rows)
+    if isinstance(result, ox.QueryBoolean):
+        return "application/sparql-results+json", json.dumps({"head": {}, "boolean": bool(result)}).encode(), 1
+    lines = [f"{t.subject} {t.predicate} {t.object} .\n" for t in result]
+    return "application/n-triples", "".join(lines).encode("utf-8"), len(lines)
+
+
+def latency_stats(seconds):
+    if not seconds:
+        return {"count": 0}
+    s = sorted(seconds)
+    return {"count": len(s), "median_ms": round(statistics.median(s) * 1000, 2),
+            "p95_ms": round(s[min(len(s) - 1, int(len(s) * 0.95))] * 1000, 2),
+            "max_ms": round(s[-1] * 1000, 2)}
+
+
+def bench(store_dir, repeat=5, queries=None):
+    ox = _oxigraph()
+    store = ox.Store(store_dir)
+    report = {}
+    for name, q in (queries or BENCH_QUERIES).items():
+        times, n = [], 0
+        for _ in range(repeat):
+            t = time.perf_counter()
+            _, _, n = run_query(store, q, ox)
+            times.append(time.perf_counter() - t)
+        report[name] = {"results": n, **latency_stats(times)}
+        print(f"    {name:<20} {n:>8} Ergebnisse  Median {report[name]['median_ms']:>9.2f} ms  "
+              f"p95 {report[name]['p95_ms']:>9.2f} ms")
+    return report
+
+
+# ------------------ HTTP-Endpoint ------------------
+def serve(store_dir, host=HOST, port=PORT):
+    ox = _oxigraph()
+    store = ox.Store(store_dir)
+    latencies = []
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, status, ctype, body):
+            self.send_response(status)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("Access-Control-Allow-Origin", "*")
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _answer(self, sparql):
+            if not sparql:
+                return self._send(400, "text/plain; charset=utf-8", b"Parameter 'query' fehlt\n")
+            t = time.perf_counter()
+            try:
+                ctype, body, _ = run_query(store, sparql, ox)
+            except (SyntaxError, ValueError, OSError) as e:
+                return self._send(400, "text/plain; charset=utf-8", f"{e}\n".encode("utf-8"))
+            sec = time.perf_counter() - t
+            with lock:
+                latencies.append(sec)
+            self._send(200, ctype, body)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path == "/stats":
+                with lock:
+                    stats = latency_stats(latencies)
+                return self._send(200, "application/json", json.dumps(stats).encode())
+            if url.path != "/sparql":
+                return self._send(404, "text/plain; charset=utf-8", b"nur /sparql und /stats\n")
+            self._answer(parse_qs(url.query).get("query", [None])[0])
+
+        def do_POST(self):
+            if urlparse(self.path).path != "/sparql":
+                return self._send(404, "text/plain; charset=utf-8", b"nur /sparql\n")
+            data = self.rfile.read(int(self.headers.get("Content-Length", 0))).decode("utf-8")
+            if self.headers.get("Content-Type", "").startswith("application/sparql-query"):
+                return self._answer(data)
+            self._answer(parse_qs(data).get("query", [None])[0])
+
+    httpd = ThreadingHTTPServer((host, port), Handler)
+    print(f"[Info] SPARQL-Endpoint: http://{host}:{port}/sparql  (Store '{store_dir}')")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+        print(f"[Info] Anfragen: {latency_stats(latencies)}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Lokaler Triple-Store (pyoxigraph) mit SPARQL-Endpoint")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    lo = sub.add_parser("load", help="Shards/Dateien per Bulk-Load einlesen")
+    lo.add_argument("store")
+    lo.add_argument("inputs", nargs="+", help="Manifest, .nt(.gz)/.ttl-Dateien, Ordner oder Term-Ordner")
+    lo.add_argument("--graph", default=None, help="in diesen benannten Graphen laden")
+    lo.add_argument("--count", action="store_true", help="danach Quads zählen (dauert bei vollem Datensatz)")
+    lo.add_argument("--report", default=None, help="Ladebericht als JSON")
+    se = sub.add_parser("serve", help="SPARQL-Endpoint starten")
+    se.add_argument("store")
+    se.add_argument("--host", default=HOST)
+    se.add_argument("--port", type=int, default=PORT)
+    qu = sub.add_parser("query", help="eine Anfrage ausführen")
+    qu.add_argument("store")
+    qu.add_argument("sparql")
+    be = sub.add_parser("bench", help="Latenzen der BENCH_QUERIES messen")
+    be.add_argument("store")
+    be.add_argument("--repeat", type=int, default=5)
+    be.add_argument("--report", default=None, help="Ergebnis als JSON")
+    be.add_argument("--stats", action="store_true",
+                    help="die Abfragen gegen den Statistik-Graphen (rdf_stats.QUERIES) messen")
+    args = ap.parse_args()
+
+    if args.cmd == "load":
+        report = load(args.store, args.inputs, args.graph, args.count)
+    elif args.cmd == "serve":
+        return serve(args.store, args.host, args.port)
+    elif args.cmd == "query":
+        t = time.perf_counter()
+        ctype, body, n = run_query(open_store(args.store), args.sparql)
+        print(body.decode("utf-8"))
+        print(f"[Info] {n} Ergebnisse in {(time.perf_counter() - t) * 1000:.1f} ms")
+        return
+    elif args.stats:
+        from rdf_stats import QUERIES
+        report = bench(args.store, args.repeat, QUERIES)
+    else:
+        report = bench(args.store, args.repeat)
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=1)
+        print(f"[✓] Bericht: '{args.report}'")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+# ---------------------- SYNTHETISCHE IMDb-DATEN -------------------------------
+"""
+Erzeugt IMDb-artige ``title.*.tsv.gz`` und ``name.basics.tsv.gz`` in
+beliebiger Größe, damit sich die Transformation ohne die echten Dumps messen lässt.
+
+Die Verteilungen sind grob an den echten Dumps ausgerichtet (Stand 2024):
+Anteile der titleTypes, ``\\N``-Quoten je Spalte, 1-3 Genres pro Titel,
+0-4 knownForTitles pro Person, ~8 principals und ~4,5 akas pro Titel,
+Ratings für ~13 % der Titel, Episoden verweisen auf Serien. Einige Titel
+enthalten Anführungszeichen, Backslashes und Nicht-ASCII-Zeichen, damit auch
+Escaping und IRI-Bildung etwas zu tun haben.
+
+Geschrieben wird blockweise (``BLOCK_TITLES``), der Speicher bleibt auch bei
+1e8 Zeilen konstant. Gleicher ``--seed`` = gleiche Dateien.
+
+Aufruf:  python rdf_synth.py --titles 100000 --out "../synthetic files"
+"""
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from rdf_gzip import ParallelGzipWriter
+
+BLOCK_TITLES = 200_000
+
+# Personen pro Titel (echte Dumps: ~14 Mio. Personen auf ~11 Mio. Titel)
+PEOPLE_PER_TITLE = 1.25
+RATED_SHARE = 0.13
+
+TITLE_TYPES = {
+    "tvEpisode": 0.74, "short": 0.09, "movie": 0.065, "video": 0.025, "tvSeries": 0.025,
+    "tvMovie": 0.013, "tvMiniSeries": 0.006, "tvSpecial": 0.005, "videoGame": 0.004,
+    "tvShort": 0.001, "tvPilot": 0.001,
+}
+GENRES = ("Drama", "Comedy", "Documentary", "Talk-Show", "Short", "Romance", "Family",
+          "Reality-TV", "News", "Animation", "Music", "Crime", "Action", "Adventure",
+          "Game-Show", "Thriller", "Horror", "Mystery", "Fantasy", "Sport", "Biography",
+          "History", "Sci-Fi", "Adult", "Musical", "Western", "War", "Film-Noir")
+PROFESSIONS = ("actor", "actress", "miscellaneous", "producer", "writer", "director",
+               "camera_department", "cinematographer", "editor", "composer", "soundtrack",
+               "art_department", "sound_department", "music_department", "self", "archive_footage")
+CATEGORIES = {"actor": 0.28, "actress": 0.2, "self": 0.17, "director": 0.08, "writer": 0.08,
+              "producer": 0.07, "cinematographer": 0.04, "composer": 0.03, "editor": 0.03,
+              "production_designer": 0.01, "archive_footage": 0.01}
+REGIONS = ("US", "GB", "DE", "FR", "IN", "JP", "ES", "IT", "CA", "BR", "XWW", "RU", "MX", "SE", "\\N")
+LANGUAGES = ("\\N",) * 8 + ("en", "ja", "fr", "es", "de", "hi", "tr", "ru")
+WORDS = ("Night", "Love", "Return", "Dark", "The", "Last", "City", "Man", "Story", "Blue",
+         "Garden", "Secret", "Fire", "House", "River", "Wolf", "Dream", "Star", "King",
+         "Café", "Straße", "Über", "Año", "Noël", "Kōhī", "O'Brien")
+FIRST = ("Anna", "John", "Maria", "David", "Yuki", "Pierre", "Olga", "Ahmed", "Chen", "Lena",
+         "Carlos", "Emma", "Raj", "Sofia", "Jörg", "Zoë")
+LAST = ("Smith", "Müller", "García", "Kim", "Rossi", "Novak", "Tanaka", "Dubois", "Silva",
+        "Kowalski", "Nguyen", "Ivanova", "O'Neil", "Sørensen")
+SPECIAL = ('"Quoted" Title', "Back\\\\slash", "Tab Ähnlich", "100% <Raw> & {Braces}")
+
+NA = "\\N"
+
+
+# ------------------ Hilfen ------------------
+def ids(prefix, nums):
+    return prefix + pd.Series(nums).astype(str).str.zfill(7)
+
+
+def choice(rng, values, n, p=None):
+    values = np.array(values, dtype=object)
+    if isinstance(p, dict):
+        values, p = np.array(list(p), dtype=object), np.array(list(p.values()))
+    if p is not None:
+        p = np.asarray(p, dtype=float) / np.sum(p)
+    return values[rng.choice(len(values), size=n, p=p)]
+
+
+def with_na(rng, s, rate):
+    s = pd.Series(s, dtype=object)
+    return s.where(rng.random(len(s)) >= rate, NA)
+
+
+def join_lists(rng, values, counts):
+    """Pro Zeile ``counts[i]`` Werte aus ``values`` kommagetrennt, 0 -> \\N."""
+    total = int(counts.sum())
+    picked = pd.Series(choice(rng, values, total))
+    owner = np.repeat(np.arange(len(counts)), counts)
+    joined = picked.groupby(owner).agg(",".join)
+    return pd.Series(NA, index=range(len(counts)), dtype=object).where(counts == 0, joined.reindex(range(len(counts))))
+
+
+def words(rng, n, k=2):
+    out = pd.Series(choice(rng, WORDS, n))
+    for _ in range(k - 1):
+        out = out + " " + choice(rng, WORDS, n)
+    special = rng.random(n) < 0.002
+    out[special] = choice(rng, SPECIAL, int(special.sum()))
+    return out
+
+
+def years(rng, n, lo=1890, hi=2025):
+    return pd.Series(rng.integers(lo, hi, size=n)).astype(str)
+
+
+class _Table:
+    def __init__(self, path, header, threads):
+        self._file = open(path, "wb")
+        self._gz = ParallelGzipWriter(self._file, threads)
+        self._gz.write(("\t".join(header) + "\n").encode("utf-8"))
+        self.rows = 0
+
+    def write(self, df):
+        if len(df):
+            self._gz.write(df.to_csv(sep="\t", header=False, index=False,
+                                     quoting=3, escapechar=None, lineterminator="\n").encode("utf-8"))
+            self.rows += len(df)
+
+    def close(self):
+        self._gz.close()
+        self._file.close()
+
+
+# ------------------ Tabellen je Block ------------------
+def block_tables(rng, start, n, n_people):
+    t_num = np.arange(start + 1, start + n + 1)
+    tconst = ids("tt", t_num)
+    ttype = pd.Series(choice(rng, None, n, TITLE_TYPES))
+    is_series = ttype.isin(["tvSeries", "tvMiniSeries"]).to_numpy()
+    is_episode = (ttype == "tvEpisode").to_numpy()
+    primary = words(rng, n, 2)
+    original = primary.where(rng.random(n) < 0.85, words(rng, n, 3))
+    n_genres = rng.choice([0, 1, 2, 3], size=n, p=[0.05, 0.5, 0.25, 0.2])
+    start_year = with_na(rng, years(rng, n), 0.12)
+    end_year = pd.Series(NA, index=range(n), dtype=object)
+    end_year[is_series] = with_na(rng, years(rng, int(is_series.sum()), 1950, 2026), 0.4).to_numpy()
+    runtime = with_na(rng, pd.Series(rng.integers(1, 240, size=n)).astype(str), 0.7)
+    basics = pd.DataFrame({
+        "tconst": tconst, "titleType": ttype, "primaryTitle": primary, "originalTitle": original,
+        "isAdult": choice(rng, ("0", "1"), n, (0.98, 0.02)),
+        "startYear": start_year, "endYear": end_year, "runtimeMinutes": runtime,
+        "genres": join_lists(rng, GENRES, n_genres),
+    })
+
+    rated = rng.random(n) < RATED_SHARE
+    ratings = pd.DataFrame({
+        "tconst": tconst[rated].to_numpy(),
+        "averageRating": np.round(np.clip(rng.normal(6.9, 1.3, int(rated.sum())), 1, 10), 1),
+        "numVotes": np.maximum(5, rng.pareto(1.2, int(rated.sum())) * 20).astype(np.int64),
+    })
+
+    n_akas = rng.poisson(4.5, n) * (rng.random(n) < 0.6)
+    owner = np.repeat(np.arange(n), n_akas)
+    ordering = np.arange(len(owner)) - np.repeat(np.cumsum(n_akas) - n_akas, n_akas) + 1
+    akas = pd.DataFrame({
+        "titleId": tconst.to_numpy()[owner], "ordering": ordering,
+        "title": words(rng, len(owner), 2).to_numpy(),
+        "region": choice(rng, REGIONS, len(owner)), "language": choice(rng, LANGUAGES, len(owner)),
+        "types": with_na(rng, choice(rng, ("imdbDisplay", "original", "working", "alternative"), len(owner)), 0.6),
+        "attributes": with_na(rng, choice(rng, ("literal title", "working title", "short title"), len(owner)), 0.95),
+        "isOriginalTitle": choice(rng, ("0", "1"), len(owner), (0.9, 0.1)),
+    })
+
+    # Episoden verweisen auf Serien desselben Blocks (ohne Serie: beliebiger Titel)
+    n_ep = int(is_episode.sum())
+    series = t_num[is_series] if is_series.any() else t_num
+    parents = ids("tt", series[rng.integers(0, len(series), size=n_ep)])
+    episode = pd.DataFrame({
+        "tconst": tconst[is_episode].to_numpy(), "parentTconst": parents.to_numpy(),
+        "seasonNumber": with_na(rng, pd.Series(rng.geometric(0.35, n_ep)).astype(str), 0.2).to_numpy(),
+        "episodeNumber": with_na(rng, pd.Series(rng.geometric(0.08, n_ep)).astype(str), 0.2).to_numpy(),
+    })
+
+    def people(k):
+        return ids("nm", rng.integers(1, n_people + 1, size=k))
+
+    crew = pd.DataFrame({
+        "tconst": tconst,
+        "directors": join_lists(rng, people(n * 2), rng.choice([0, 1, 2], size=n, p=[0.35, 0.55, 0.1])),
+        "writers": join_lists(rng, people(n * 3), rng.choice([0, 1, 2, 3], size=n, p=[0.45, 0.35, 0.15, 0.05])),
+    })
+
+    n_princ = np.minimum(rng.geometric(0.12, n), 10)
+    owner = np.repeat(np.arange(n), n_princ)
+    ordering = np.arange(len(owner)) - np.repeat(np.cumsum(n_princ) - n_princ, n_princ) + 1
+    category = choice(rng, None, len(owner), CATEGORIES)
+    principals = pd.DataFrame({
+        "tconst": tconst.to_numpy()[owner], "ordering": ordering,
+        "nconst": people(len(owner)).to_numpy(), "category": category,
+        "job": with_na(rng, category, 0.8).to_numpy(),
+        "characters": with_na(rng, '["' + pd.Series(choice(rng, FIRST, len(owner))) + '"]', 0.5).to_numpy(),
+    })
+    return {"title.basics": basics, "title.ratings": ratings, "title.akas": akas,
+            "title.episode": episode, "title.crew": crew, "title.principals": principals}
+
+
+def block_people(rng, start, n, n_titles):
+    nconst = ids("nm", np.arange(start + 1, start + n + 1))
+    name = pd.Series(choice(rng, FIRST, n)) + " " + choice(rng, LAST, n)
+    birth = with_na(rng, years(rng, n, 1850, 2015), 0.95)
+    death = with_na(rng, years(rng, n, 1900, 2025), 0.98)
+    n_prof = rng.choice([0, 1, 2, 3], size=n, p=[0.2, 0.5, 0.2, 0.1])
+    n_known = rng.choice([0, 1, 2, 3, 4], size=n, p=[0.1, 0.45, 0.15, 0.1, 0.2])
+    known = ids("tt", rng.integers(1, n_titles + 1, size=int(n_known.sum())))
+    return pd.DataFrame({
+        "nconst": nconst, "primaryName": name, "birthYear": birth, "deathYear": death,
+        "primaryProfession": join_lists(rng, PROFESSIONS, n_prof),
+        "knownForTitles": join_lists(rng, known.to_numpy(), n_known),
+    })
+
+
+HEADERS = {
+    "title.basics": ("tconst", "titleType", "primaryTitle", "originalTitle", "isAdult",
+                     "startYear", "endYear", "runtimeMinutes", "genres"),
+    "title.ratings": ("tconst", "averageRating", "numVotes"),
+    "title.akas": ("titleId", "ordering", "title", "region", "language", "types",
+                   "attributes", "isOriginalTitle"),
+    "title.episode": ("tconst", "parentTconst", "seasonNumber", "episodeNumber"),
+    "title.crew": ("tconst", "directors", "writers"),
+    "title.principals": ("tconst", "ordering", "nconst", "category", "job", "characters"),
+    "name.basics": ("nconst", "primaryName", "birthYear", "deathYear",
+                    "primaryProfession", "knownForTitles"),
+}
+
+
+def generate(out_dir, n_titles, seed=0, threads=1, block=BLOCK_TITLES):
+    """Alle sieben Tabellen schreiben; liefert {Tabelle: Zeilen}."""
+    os.makedirs(out_dir, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    n_people = max(1, int(n_titles * PEOPLE_PER_TITLE))
+    tables = {t: _Table(os.path.join(out_dir, f"{t}.tsv.gz"), h, threads) for t, h in HEADERS.items()}
+    try:
+        for start in range(0, n_titles, block):
+            for t, df in block_tables(rng, start, min(block, n_titles - start), n_people).items():
+                tables[t].write(df)
+        for start in range(0, n_people, block):
+            tables["name.basics"].write(block_people(rng, start, min(block, n_people - start), n_titles))
+    finally:
+        for t in tables.values():
+            t.close()
+    rows = {t: tables[t].rows for t in HEADERS}
+    print(f"[✓] Synthetische Daten in '{out_dir}': " + ", ".join(f"{t} {n}" for t, n in rows.items()))
+    return rows
+
+
+def main():
+    ap = argparse.ArgumentParser(description="IMDb-artige Testdaten erzeugen")
+    ap.add_argument("--titles", type=int, default=100_000, help="Anzahl Titel (1e4 … 1e8)")
+    ap.add_argument("--out", default="../synthetic files")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--threads", type=int, default=1, help="gzip-Threads")
+    args = ap.parse_args()
+    generate(args.out, args.titles, args.seed, args.threads)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,416 @@
+# ---------------------- TERM-WÖRTERBUCH + INTEGER-TRIPEL -------------------------------
+"""
+Kompaktes Zwischenformat statt 130 GB N-Triples-Text.
+
+Jeder verschiedene Term (IRI oder Literal, in N-Triples-Schreibweise) bekommt
+eine fortlaufende ID; die Tripel werden nur noch als drei Spalten fester Breite
+(``ID_DTYPE``) gespeichert. Ein Ordner enthält:
+
+- ``terms.bin``   alle Terme als UTF-8 hintereinander (jeder Term genau einmal)
+- ``terms.idx``   Endposition jedes Terms in ``terms.bin`` (uint64), Index = ID
+- ``s.bin``, ``p.bin``, ``o.bin``   die Tripel-Spalten, als np.memmap lesbar
+- ``meta.json``   Anzahl Terme/Tripel und Datentyp der Spalten
+- ``hash.keys``, ``hash.ids``   nur während des Schreibens: Term -> ID als
+  Hash-Tabelle mit offener Adressierung (memmaps, siehe ``TermIndex``)
+
+Das Wörterbuch liegt also nicht als dict im Speicher: jeder Term wird über
+einen 64-Bit-Hash in der Tabelle gesucht und ein Treffer gegen die Bytes in
+``terms.bin`` geprüft. Im RAM stehen nur die Terme des aktuellen Chunks.
+
+Sortieren, Duplikate entfernen und Statistiken laufen danach auf Integer-Arrays
+(``TermTable.triples()``); ``export`` schreibt wieder N-Triples bzw. Turtle.
+
+``TermStore`` hat die Schnittstelle von ``NTriplesWriter`` (write, add, sync,
+close, ``triples``, ``path``) und kann direkt als Sink des Transformers dienen.
+
+Aufruf:  python rdf_terms.py export imdb_terms imdb_transformed.nt [--gzip | --turtle]
+         python rdf_terms.py stats imdb_terms
+"""
+
+import argparse
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from rdf_writer import NTriplesWriter, TurtleWriter, term_nt
+
+# 32 Bit reichen für ~4,29 Mrd. verschiedene Terme; sonst np.uint64
+ID_DTYPE = np.uint32
+
+# Tripel pro Block beim Export
+EXPORT_BLOCK = 1_000_000
+
+# Hash-Tabelle Term -> ID: höchster Füllgrad vor dem Verdoppeln, Anfangsgröße (Zweierpotenz)
+# und Einträge je Block beim Umkopieren bzw. Neuaufbau
+HASH_LOAD = 0.5
+HASH_SLOTS = 1 << 20
+HASH_BLOCK = 1 << 22
+
+COLUMNS = ("s", "p", "o")
+
+
+def split_nt(data: str):
+    """N-Triples-Zeilen in drei Spalten (Objekt-Arrays) zerlegen."""
+    lines = pd.Series(data.rstrip("\n").split("\n"), dtype=object)
+    parts = lines.str.split(" ", n=2, expand=True)
+    # Subjekt und Prädikat enthalten keine Leerzeichen, das Objekt endet auf " ."
+    return parts[0].to_numpy(), parts[1].to_numpy(), parts[2].str[:-2].to_numpy()
+
+
+def term_hash(terms) -> np.ndarray:
+    """64-Bit-Hash (SipHash aus pandas) der Terme als UTF-8-Bytes; 0 ist für freie Plätze reserviert."""
+    h = pd.util.hash_array(np.asarray(terms, dtype=object), categorize=False)
+    h[h == 0] = 1
+    return h
+
+
+def _slices(data, ends, start, stop):
+    """Terme ``start`` bis ``stop - 1`` aus ``terms.bin``/``terms.idx`` (memmaps) als Bytes."""
+    if stop <= start:
+        return []
+    a = int(ends[start - 1]) if start else 0
+    offsets = (np.asarray(ends[start:stop]) - a).tolist()
+    buf = data[a:a + offsets[-1]].tobytes()
+    return [buf[i:j] for i, j in zip([0] + offsets[:-1], offsets)]
+
+
+# ------------------ Schreiben ------------------
+class TermIndex:
+    """Term-Hash -> ID mit offener Adressierung (lineares Sondieren) in zwei memmaps.
+
+    ``keys`` hält den Hash (0 = frei), ``ids`` die Term-ID. Gesucht und eingefügt
+    wird für alle Terme eines Chunks zugleich, eine Runde je Sondierschritt.
+    """
+
+    def __init__(self, out_dir, terms=0):
+        self.out_dir = out_dir
+        self.count = 0
+        slots = HASH_SLOTS
+        while terms > HASH_LOAD * slots:
+            slots *= 2
+        self.keys, self.ids = self._map(slots)
+
+    def _paths(self, suffix=""):
+        return [os.path.join(self.out_dir, f"hash.{name}{suffix}") for name in ("keys", "ids")]
+
+    def _map(self, slots, suffix=""):
+        keys, ids = self._paths(suffix)
+        return (np.memmap(keys, dtype=np.uint64, mode="w+", shape=(slots,)),
+                np.memmap(ids, dtype=ID_DTYPE, mode="w+", shape=(slots,)))
+
+    def lookup(self, h, same) -> np.ndarray:
+        """IDs zu den Hashes ``h`` (-1 = unbekannt); ``same(i, ids)`` prüft Treffer gegen die Terme."""
+        mask = len(self.keys) - 1
+        found = np.full(len(h), -1, dtype=np.int64)
+        pos = (h & mask).astype(np.int64)
+        todo = np.arange(len(h))
+        while len(todo):
+            slot = pos[todo]
+            k = self.keys[slot]
+            hit = np.flatnonzero(k == h[todo])
+            if len(hit):
+                ids = self.ids[slot[hit]].astype(np.int64)
+                ok = same(todo[hit], ids)
+                found[todo[hit[ok]]] = ids[ok]
+            # weiter, solange der Platz belegt und der Term nicht gefunden ist (Kollision)
+            todo = todo[(k != 0) & (found[todo] < 0)]
+            pos[todo] = (pos[todo] + 1) & mask
+        return found
+
+    def insert(self, h, ids):
+        if self.count + len(h) > HASH_LOAD * len(self.keys):
+            self._grow(self.count + len(h))
+        self._put(self.keys, self.ids, h, ids)
+        self.count += len(h)
+
+    @staticmethod
+    def _put(keys, table, h, ids):
+        mask = len(keys) - 1
+        pos = (h & mask).astype(np.int64)
+        todo = np.arange(len(h))
+        while len(todo):
+            slot = pos[todo]
+            free = np.flatnonzero(keys[slot] == 0)
+            # je freiem Platz gewinnt der erste Anwärter, alle anderen sondieren weiter
+            _, first = np.unique(slot[free], return_index=True)
+            win = todo[free[first]]
+            keys[pos[win]] = h[win]
+            table[pos[win]] = ids[win]
+            todo = np.setdiff1d(todo, win, assume_unique=True)
+            pos[todo] = (pos[todo] + 1) & mask
+
+    def _grow(self, need):
+        slots = len(self.keys)
+        while need > HASH_LOAD * slots:
+            slots *= 2
+        keys, ids = self._map(slots, ".tmp")
+        for a in range(0, len(self.keys), HASH_BLOCK):
+            k = np.asarray(self.keys[a:a + HASH_BLOCK])
+            used = np.flatnonzero(k)
+            self._put(keys, ids, k[used], np.asarray(self.ids[a:a + HASH_BLOCK])[used])
+        keys.flush()
+        ids.flush()
+        del keys, ids
+        self.keys = self.ids = None
+        for tmp, path in zip(self._paths(".tmp"), self._paths()):
+            os.replace(tmp, path)
+        self.keys = np.memmap(self._paths()[0], dtype=np.uint64, mode="r+")
+        self.ids = np.memmap(self._paths()[1], dtype=ID_DTYPE, mode="r+")
+
+    def remove(self):
+        """Tabelle löschen (wird nur beim Schreiben gebraucht)."""
+        self.keys = self.ids = None
+        for path in self._paths():
+            if os.path.exists(path):
+                os.remove(path)
+
+
+class TermStore:
+    """Schreibt Tripel als Term-IDs in einen Ordner; ``resume=triples`` setzt fort."""
+
+    def __init__(self, out_dir, resume=None):
+        self.out_dir = out_dir
+        os.makedirs(out_dir, exist_ok=True)
+        self.path = self._file("s")
+        self.terms = 0
+        self.triples = 0
+        mode = "wb"
+        if resume is not None:
+            self._truncate_terms()
+            self._truncate_columns(resume)
+            self.triples = resume
+            mode = "ab"
+        else:
+            self._index = TermIndex(out_dir)
+        self._terms = open(self._file("terms.bin"), mode)
+        self._ends = open(self._file("terms.idx"), mode)
+        self._cols = [open(self._file(c), mode) for c in COLUMNS]
+        self._end = self._terms.tell()
+        if resume is not None:
+            self._rebuild_index()
+
+    def _file(self, name):
+        return os.path.join(self.out_dir, name if "." in name else f"{name}.bin")
+
+    def _truncate_terms(self):
+        # ein nach dem letzten sync() halb geschriebener Rest wird abgeschnitten
+        size = os.path.getsize(self._file("terms.bin"))
+        ends = self._map_ends(os.path.getsize(self._file("terms.idx")) // 8)
+        n = int(np.searchsorted(ends, size, side="right"))
+        end = int(ends[n - 1]) if n else 0
+        del ends
+        for name, size in (("terms.bin", end), ("terms.idx", 8 * n)):
+            with open(self._file(name), "r+b") as f:
+                f.truncate(size)
+        self.terms = n
+
+    def _rebuild_index(self):
+        # die Hash-Tabelle ist abgeleitet: blockweise aus terms.bin neu aufbauen
+        self._index = TermIndex(self.out_dir, self.terms)
+        if not self.terms:
+            return
+        ends = self._map_ends(self.terms)
+        data = np.memmap(self._file("terms.bin"), dtype=np.uint8, mode="r")
+        for a in range(0, self.terms, HASH_BLOCK):
+            terms = _slices(data, ends, a, min(a + HASH_BLOCK, self.terms))
+            self._index.insert(term_hash(terms), np.arange(a, a + len(terms)))
+
+    def _map_ends(self, n):
+        if not n:
+            return np.empty(0, dtype=np.uint64)
+        return np.memmap(self._file("terms.idx"), dtype=np.uint64, mode="r", shape=(n,))
+
+    def _truncate_columns(self, triples):
+        for c in COLUMNS:
+            with open(self._file(c), "r+b") as f:
+                f.truncate(triples * np.dtype(ID_DTYPE).itemsize)
+
+    def _add_terms(self, terms, h):
+        start = self.terms
+        if start + len(terms) > np.iinfo(ID_DTYPE).max:
+            raise OverflowError(f"Mehr als {np.iinfo(ID_DTYPE).max} Terme, ID_DTYPE vergrößern")
+        ends = self._end + np.cumsum([len(b) for b in terms], dtype=np.uint64)
+        self._terms.write(b"".join(terms))
+        ends.tofile(self._ends)
+        self._end = int(ends[-1])
+        ids = np.arange(start, start + len(terms))
+        self._index.insert(h, ids)
+        self.terms += len(terms)
+        return ids
+
+    def _same(self, terms, qi, ids):
+        """Stimmen ``terms[qi]`` (Bytes) mit den gespeicherten Termen ``ids`` überein?"""
+        self._terms.flush()
+        self._ends.flush()
+        ends = self._map_ends(self.terms)
+        data = np.memmap(self._file("terms.bin"), dtype=np.uint8, mode="r", shape=(self._end,))
+        stop = ends[ids].astype(np.int64)
+        start = np.where(ids > 0, ends[np.maximum(ids - 1, 0)], 0).astype(np.int64)
+        query = [terms[i] for i in qi]
+        lens = np.fromiter(map(len, query), dtype=np.int64, count=len(query))
+        same = lens == stop - start
+        cmp = np.flatnonzero(same & (lens > 0))
+        if len(cmp):
+            # alle Bytes auf einmal vergleichen, dann je Term zusammenfassen
+            n = lens[cmp]
+            first = np.cumsum(n) - n
+            buf = np.frombuffer(b"".join(query[i] for i in cmp), dtype=np.uint8)
+            within = np.arange(len(buf)) - np.repeat(first, n)
+            stored = data[np.repeat(start[cmp], n) + within]
+            same[cmp] = np.logical_and.reduceat(buf == stored, first)
+        return same
+
+    def encode(self, values):
+        """Term-Strings -> IDs; neue Terme werden ans Wörterbuch angehängt."""
+        codes, uniques = pd.factorize(values)
+        if not len(uniques):
+            return np.empty(len(codes), dtype=ID_DTYPE)
+        terms = [u.encode("utf-8") for u in uniques]
+        h = term_hash(terms)
+        ids = self._index.lookup(h, lambda qi, ids: self._same(terms, qi, ids))
+        new = np.flatnonzero(ids < 0)
+        if len(new):
+            ids[new] = self._add_terms([terms[i] for i in new], h[new])
+        return ids[codes].astype(ID_DTYPE)
+
+    def write(self, data: str):
+        """Bereits formatierte N-Triples-Zeilen (z. B. aus rdf_emit) übernehmen."""
+        if not data:
+            return
+        for f, col in zip(self._cols, split_nt(data)):
+            self.encode(col).tofile(f)
+        self.triples += data.count("\n")
+
+    def add(self, triple):
+        for f, t in zip(self._cols, triple):
+            self.encode([term_nt(t)]).tofile(f)
+        self.triples += 1
+
+    def write_graph(self, graph):
+        for triple in graph:
+            self.add(triple)
+
+    def write_raw(self, data: str):
+        pass  # Präfixe o. Ä. gehören nicht ins Wörterbuch, export() schreibt sie selbst
+
+    # -------- Verwaltung --------
+    def _files(self):
+        return [self._terms, self._ends, *self._cols]
+
+    def flush(self):
+        for f in self._files():
+            f.flush()
+
+    def sync(self) -> int:
+        """Wörterbuch vor den Spalten sichern; liefert die Größe von ``s.bin``."""
+        for f in self._files():
+            f.flush()
+            os.fsync(f.fileno())
+        return self._cols[0].tell()
+
+    def close(self):
+        for f in self._files():
+            f.close()
+        self._index.remove()
+        with open(self._file("meta.json"), "w", encoding="utf-8") as f:
+            json.dump({"terms": self.terms, "triples": self.triples,
+                       "dtype": np.dtype(ID_DTYPE).name}, f)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+# ------------------ Lesen ------------------
+class TermTable:
+    """Lesezugriff auf einen ``TermStore``-Ordner über memmaps."""
+
+    def __init__(self, out_dir):
+        self.out_dir = out_dir
+        with open(os.path.join(out_dir, "meta.json"), encoding="utf-8") as f:
+            self.meta = json.load(f)
+        self.dtype = np.dtype(self.meta["dtype"])
+        self._data = np.memmap(os.path.join(out_dir, "terms.bin"), dtype=np.uint8, mode="r")
+        self._ends = np.memmap(os.path.join(out_dir, "terms.idx"), dtype=np.uint64, mode="r",
+                               shape=(self.meta["terms"],)) if self.meta["terms"] else np.empty(0, np.uint64)
+
+    def __len__(self):
+        return self.meta["triples"]
+
+    def term(self, i) -> str:
+        a = int(self._ends[i - 1]) if i else 0
+        return self._data[a:int(self._ends[i])].tobytes().decode("utf-8")
+
+    def term_bytes(self, start, stop):
+        """Terme ``start`` bis ``stop - 1`` als UTF-8-Bytes (ohne zu dekodieren)."""
+        return _slices(self._data, self._ends, start, stop)
+
+    def lookup(self, ids):
+        """IDs -> Objekt-Array der Terme (jeder Term wird nur einmal dekodiert)."""
+        u, inv = np.unique(ids, return_inverse=True)
+        return np.array([self.term(i) for i in u], dtype=object)[inv]
+
+    def triples(self):
+        """(s, p, o) als memmaps."""
+        return tuple(np.memmap(os.path.join(self.out_dir, f"{c}.bin"), dtype=self.dtype,
+                               mode="r", shape=(len(self),)) for c in COLUMNS)
+
+    def iter_nt(self, block=EXPORT_BLOCK, rows=None):
+        """N-Triples-Text blockweise; ``rows`` wählt/ordnet Tripel (z. B. nach Sortierung)."""
+        s, p, o = self.triples()
+        n = len(self) if rows is None else len(rows)
+        for a in range(0, n, block):
+            idx = slice(a, a + block) if rows is None else rows[a:a + block]
+            k = len(s[idx])
+            terms = self.lookup(np.concatenate((s[idx], p[idx], o[idx])))
+            lines = terms[:k] + " " + terms[k:2 * k] + " " + terms[2 * k:] + " .\n"
+            yield "".join(lines)
+
+
+def export(out_dir, out_file, compress=False, turtle=False):
+    """Ordner zurück nach N-Triples (bzw. nach Subjekt gruppiertem Turtle) schreiben."""
+    table = TermTable(out_dir)
+    writer = TurtleWriter if turtle else NTriplesWriter
+    with writer(out_file, compress=compress) as sink:
+        for data in table.iter_nt():
+            sink.write(data)
+    print(f"[✓] {sink.triples} Tripel nach '{out_file}' exportiert")
+    return sink.triples
+
+
+def stats(out_dir):
+    table = TermTable(out_dir)
+    s, p, o = table.triples()
+    preds, counts = np.unique(p, return_counts=True)
+    size = sum(os.path.getsize(os.path.join(out_dir, f))
+               for f in ("terms.bin", "terms.idx", "s.bin", "p.bin", "o.bin"))
+    print(f"[Info] {len(table)} Tripel, {table.meta['terms']} Terme, {size / 1e6:.1f} MB")
+    print(f"[Info] {len(np.unique(s))} Subjekte, {len(preds)} Prädikate, {len(np.unique(o))} Objekte")
+    for i in np.argsort(-counts):
+        print(f"    {counts[i]:>12}  {table.term(preds[i])}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Term-Wörterbuch exportieren / auswerten")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    ex = sub.add_parser("export", help="nach N-Triples/Turtle schreiben")
+    ex.add_argument("dir")
+    ex.add_argument("out")
+    ex.add_argument("--gzip", action="store_true")
+    ex.add_argument("--turtle", action="store_true", help="kompaktes Turtle mit Präfixen (.ttl)")
+    st = sub.add_parser("stats", help="Tripel, Terme und Prädikat-Häufigkeiten")
+    st.add_argument("dir")
+    args = ap.parse_args()
+    if args.cmd == "export":
+        export(args.dir, args.out, args.gzip, args.turtle)
+    else:
+        stats(args.dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -21,7 +21,11 @@ from rdflib import Graph, URIRef, Namespace, Literal
 from rdflib.namespace import RDF, RDFS, XSD
 import pandas as pd
 import gzip, os, re
-from iribaker import to_iri
+from rdf_iri import iris
+from rdf_literals import lits
+from rdf_index import open_index
+from rdf_reader import iter_chunks
+from rdf_writer import NTriplesWriter, term_nt
 from typing import Set, Dict
 
 # ------------------ Parameter ------------------
@@ -38,14 +42,22 @@ PRINCIPALS_PER_TITLE    = 5
 CREW_ROLES_PER_TITLE    = 4      # Regie+Autor*innen zusammen
 PEOPLE_LIMIT            = 6000   # Obergrenze neu zu materialisierender Personen
 
+# True: Schritte 2-6 lesen über den Offset-Index (rdf_index) nur die Blöcke der
+# ausgewählten Titel/Personen; False: jede Datei komplett durchlaufen
+USE_INDEX = True
+
 # ------------------ Namespaces ------------------
 RES = Namespace('http://example.org/imdb/resource/')
 IMD = Namespace('http://example.org/imdb#')
 
-# ------------------ Graph + Budget-Wrapper ------------------
-g = Graph()
-g.bind('res', RES)
-g.bind('imd', IMD)
+# ------------------ Writer + Budget-Wrapper ------------------
+# Tripel gehen direkt als N-Triples-Zeilen in die Ausgabe (mit @prefix-Kopf,
+# also weiterhin gültiges Turtle). Ob ein Tripel neu ist, entscheidet eine
+# eigene Menge aus 64-Bit-Hashes der Zeilen statt len(g) vor/nach g.add().
+sink = NTriplesWriter(OUT_FILE)
+sink.write_raw('@prefix res: <http://example.org/imdb/resource/> .\n')
+sink.write_raw('@prefix imd: <http://example.org/imdb#> .\n\n')
+seen_hashes: Set[int] = set()
 
 TRIPLE_BUDGET = MAX_TRIPLES
 
@@ -54,11 +66,12 @@ def add_t(s, p, o):
     global TRIPLE_BUDGET
     if TRIPLE_BUDGET <= 0:
         return False
-    before = len(g)
-    g.add((s, p, o))
-    after = len(g)
-    # nur reduzieren, wenn Tripel neu war
-    if after > before:
+    line = f"{term_nt(s)} {term_nt(p)} {term_nt(o)} .\n"
+    h = hash(line)
+    # nur schreiben und Budget reduzieren, wenn Tripel neu war
+    if h not in seen_hashes:
+        seen_hashes.add(h)
+        sink.write(line)
         TRIPLE_BUDGET -= 1
     return TRIPLE_BUDGET > 0
 
@@ -66,32 +79,37 @@ def budget_ok():
     return TRIPLE_BUDGET > 0
 
 # ------------------ Hilfen ------------------
-def gz_read(path: str, usecols=None, chunksize=100_000):
-    return pd.read_csv(path, sep="\t", compression="gzip",
-                       on_bad_lines="skip", dtype=str,
-                       usecols=usecols, chunksize=chunksize)
-
 def norm_str(x):
     return None if x is None or pd.isna(x) or str(x) in {r"\N", "\\N", ""} else str(x)
 
 def iri_title(tconst: str) -> URIRef:
-    return URIRef(to_iri(f"{RES}title/{tconst}"))
+    return iris.title(tconst)
 
 def iri_person(nconst: str) -> URIRef:
-    return URIRef(to_iri(f"{RES}person/{nconst}"))
+    return iris.person(nconst)
 
 def iri_role(tconst: str, role_name: str, nconst: str) -> URIRef:
-    return URIRef(to_iri(f"{RES}role/{tconst}/{role_name}/{nconst}"))
+    return iris.role(tconst, role_name, nconst)
 
 def iri_aka(titleId: str, ordering: str) -> URIRef:
-    return URIRef(to_iri(f"{RES}akas/{titleId}/{ordering}"))
+    return iris.akas(titleId, ordering)
+
+def chunks_for(path, table, keys):
+    """Chunks einer Tabelle; mit Index nur die Zeilen zu ``keys`` (gleiche Reihenfolge)."""
+    if USE_INDEX:
+        return open_index(path, table).iter_chunks(keys, chunksize=200_000)
+    return iter_chunks(path, table, chunksize=200_000)
 
 # ------------------ 0) Ontologie laden ------------------
 if os.path.exists(ONTOLOGY_FILE):
-    g.parse(ONTOLOGY_FILE, format="turtle")
-    TRIPLE_BUDGET = MAX_TRIPLES - len(g)
-    if TRIPLE_BUDGET <= 0:
+    ontology = Graph()
+    ontology.parse(ONTOLOGY_FILE, format="turtle")
+    if len(ontology) >= MAX_TRIPLES:
         raise RuntimeError("Ontologie allein überschreitet das Budget.")
+    # zählt wie jedes andere Tripel gegen MAX_TRIPLES
+    for triple in ontology:
+        add_t(*triple)
+    del ontology
 else:
     # Ohne Ontologie weiterarbeiten ist möglich, aber nicht empfohlen
     pass
@@ -102,9 +120,7 @@ series_titles: Set[str] = set()  # tconst von Serien
 episode_titles: Set[str] = set() # tconst von Episoden
 
 basics_path = os.path.join(IMDB_PATH, "title.basics.tsv.gz")
-usecols = ["tconst","titleType","primaryTitle","originalTitle",
-           "isAdult","startYear","endYear","runtimeMinutes","genres"]
-for chunk in gz_read(basics_path, usecols=usecols, chunksize=200_000):
+for chunk in iter_chunks(basics_path, "title.basics", chunksize=200_000):
     if not budget_ok():
         break
     for _, row in chunk.iterrows():
@@ -139,26 +155,26 @@ for chunk in gz_read(basics_path, usecols=usecols, chunksize=200_000):
         if v:
             s = v.lower()
             b = True if s in {"1","true","t"} else False
-            add_t(t_iri, IMD.isAdult, Literal(b, datatype=XSD.boolean))
+            add_t(t_iri, IMD.isAdult, lits.boolean(b))
 
         v = norm_str(row.get("startYear"))
-        if v: add_t(t_iri, IMD.startYear, Literal(v, datatype=XSD.string))
+        if v: add_t(t_iri, IMD.startYear, lits.string(v))
         v = norm_str(row.get("endYear"))
-        if v: add_t(t_iri, IMD.endYear, Literal(v, datatype=XSD.string))
+        if v: add_t(t_iri, IMD.endYear, lits.string(v))
 
         v = norm_str(row.get("runtimeMinutes"))
         if v and re.fullmatch(r"-?\d+", v):
             add_t(t_iri, IMD.runtimeMinutes, Literal(int(v), datatype=XSD.integer))
 
         v = titleType
-        if v: add_t(t_iri, IMD.type, Literal(v, datatype=XSD.string))
+        if v: add_t(t_iri, IMD.type, lits.string(v))
 
         v = norm_str(row.get("genres"))
         if v:
             for g_ in str(v).split(","):
                 gclean = g_.strip()
                 if gclean:
-                    add_t(t_iri, IMD.genre, Literal(gclean, datatype=XSD.string))
+                    add_t(t_iri, IMD.genre, lits.string(gclean))
 
         seed_titles.add(tconst)
     if len(seed_titles) >= SEED_TITLES_MAX or not budget_ok():
@@ -166,8 +182,7 @@ for chunk in gz_read(basics_path, usecols=usecols, chunksize=200_000):
 
 # ------------------ 2) Ratings zu Seed-Titeln ------------------
 ratings_path = os.path.join(IMDB_PATH, "title.ratings.tsv.gz")
-usecols = ["tconst","averageRating","numVotes"]
-for chunk in gz_read(ratings_path, usecols=usecols, chunksize=200_000):
+for chunk in chunks_for(ratings_path, "title.ratings", seed_titles):
     if not budget_ok():
         break
     for _, row in chunk.iterrows():
@@ -177,7 +192,7 @@ for chunk in gz_read(ratings_path, usecols=usecols, chunksize=200_000):
         if not tconst or tconst not in seed_titles:
             continue
 
-        r_iri = URIRef(to_iri(f"{RES}rating/{tconst}"))
+        r_iri = iris.rating(tconst)
         add_t(r_iri, RDF.type, IMD.Rating)
 
         v = norm_str(row.get("averageRating"))
@@ -194,9 +209,8 @@ for chunk in gz_read(ratings_path, usecols=usecols, chunksize=200_000):
 
 # ------------------ 3) AKAs (max. n pro Titel) ------------------
 akas_path = os.path.join(IMDB_PATH, "title.akas.tsv.gz")
-usecols = ["titleId","ordering","title","region","language"]
 akas_count: Dict[str,int] = {}
-for chunk in gz_read(akas_path, usecols=usecols, chunksize=200_000):
+for chunk in chunks_for(akas_path, "title.akas", seed_titles):
     if not budget_ok():
         break
     for _, row in chunk.iterrows():
@@ -215,18 +229,17 @@ for chunk in gz_read(akas_path, usecols=usecols, chunksize=200_000):
         v = norm_str(row.get("title"))
         if v: add_t(a_iri, IMD.alternateTitle, Literal(v, datatype=XSD.string))
         v = norm_str(row.get("region"))
-        if v: add_t(a_iri, IMD.region, Literal(v, datatype=XSD.string))
+        if v: add_t(a_iri, IMD.region, lits.string(v))
         v = norm_str(row.get("language"))
-        if v: add_t(a_iri, IMD.language, Literal(v, datatype=XSD.string))
+        if v: add_t(a_iri, IMD.language, lits.string(v))
 
         add_t(iri_title(titleId), IMD.hasAlternateTitle, a_iri)
         akas_count[titleId] = akas_count.get(titleId, 0) + 1
 
 # ------------------ 4) Episoden-Infos für einige Serien ------------------
 episode_path = os.path.join(IMDB_PATH, "title.episode.tsv.gz")
-usecols = ["tconst","parentTconst","seasonNumber","episodeNumber"]
 episodes_per_series: Dict[str,int] = {}
-for chunk in gz_read(episode_path, usecols=usecols, chunksize=200_000):
+for chunk in chunks_for(episode_path, "title.episode", seed_titles):
     if not budget_ok():
         break
     for _, row in chunk.iterrows():
@@ -261,9 +274,8 @@ people_seen: Set[str] = set()
 
 # 5a) principals
 principals_path = os.path.join(IMDB_PATH, "title.principals.tsv.gz")
-usecols = ["tconst","nconst","category","job"]
 per_title_count: Dict[str,int] = {}
-for chunk in gz_read(principals_path, usecols=usecols, chunksize=200_000):
+for chunk in chunks_for(principals_path, "title.principals", seed_titles):
     if not budget_ok():
         break
     for _, row in chunk.iterrows():
@@ -288,7 +300,7 @@ for chunk in gz_read(principals_path, usecols=usecols, chunksize=200_000):
         title = iri_title(tconst)
 
         add_t(role, RDF.type, IMD.Role)
-        add_t(role, IMD.roleName, Literal(cat, datatype=XSD.string))
+        add_t(role, IMD.roleName, lits.string(cat))
         add_t(person, IMD.hasRole, role)
         add_t(role, IMD.roleIn, title)
 
@@ -297,9 +309,8 @@ for chunk in gz_read(principals_path, usecols=usecols, chunksize=200_000):
 
 # 5b) crew (directors, writers)
 crew_path = os.path.join(IMDB_PATH, "title.crew.tsv.gz")
-usecols = ["tconst","directors","writers"]
 per_title_crew: Dict[str,int] = {}
-for chunk in gz_read(crew_path, usecols=usecols, chunksize=200_000):
+for chunk in chunks_for(crew_path, "title.crew", seed_titles):
     if not budget_ok():
         break
     for _, row in chunk.iterrows():
@@ -328,7 +339,7 @@ for chunk in gz_read(crew_path, usecols=usecols, chunksize=200_000):
                 title = iri_title(tconst)
 
                 add_t(role, RDF.type, IMD.Role)
-                add_t(role, IMD.roleName, Literal(role_name, datatype=XSD.string))
+                add_t(role, IMD.roleName, lits.string(role_name))
                 add_t(person, IMD.hasRole, role)
                 add_t(role, IMD.roleIn, title)
                 people_seen.add(nconst)
@@ -343,9 +354,7 @@ for chunk in gz_read(crew_path, usecols=usecols, chunksize=200_000):
 people_limit_left = max(0, PEOPLE_LIMIT - len(people_seen))
 if people_limit_left > 0:
     name_path = os.path.join(IMDB_PATH, "name.basics.tsv.gz")
-    usecols = ["nconst","primaryName","birthYear","deathYear",
-               "primaryProfession","knownForTitles"]
-    for chunk in gz_read(name_path, usecols=usecols, chunksize=200_000):
+    for chunk in chunks_for(name_path, "name.basics", people_seen):
         if not budget_ok() or people_limit_left <= 0:
             break
         for _, row in chunk.iterrows():
@@ -362,15 +371,15 @@ if people_limit_left > 0:
             v = norm_str(row.get("primaryName"))
             if v: add_t(p_iri, RDFS.label, Literal(v, datatype=XSD.string))
             v = norm_str(row.get("birthYear"))
-            if v: add_t(p_iri, IMD.birthYear, Literal(v, datatype=XSD.string))
+            if v: add_t(p_iri, IMD.birthYear, lits.string(v))
             v = norm_str(row.get("deathYear"))
-            if v: add_t(p_iri, IMD.deathYear, Literal(v, datatype=XSD.string))
+            if v: add_t(p_iri, IMD.deathYear, lits.string(v))
 
             prof = norm_str(row.get("primaryProfession")) or ""
             if "actress" in prof:
-                add_t(p_iri, IMD.gender, Literal("female", datatype=XSD.string))
+                add_t(p_iri, IMD.gender, lits.string("female"))
             elif "actor" in prof:
-                add_t(p_iri, IMD.gender, Literal("male", datatype=XSD.string))
+                add_t(p_iri, IMD.gender, lits.string("male"))
 
             kf = norm_str(row.get("knownForTitles"))
             if kf:
@@ -382,5 +391,6 @@ if people_limit_left > 0:
             people_limit_left -= 1
 
 # ------------------ 7) Speichern ------------------
-g.serialize(destination=OUT_FILE, format="turtle")
-print(f"[OK] Geschrieben: {OUT_FILE}  | Tripel: {len(g)}  | Restbudget: {TRIPLE_BUDGET}")
+sink.close()
+print(f"[OK] Geschrieben: {OUT_FILE}  | Tripel: {sink.triples}  | Restbudget: {TRIPLE_BUDGET}")
+iris.report()
@@ -0,0 +1,325 @@
+# ---------------------- DELTA-TRANSFORMATION (tägliche IMDb-Dumps) -----------------------
+"""
+Erzeugt nur die Änderungen gegenüber dem letzten Lauf statt des kompletten Graphen.
+
+Pro Tabelle wird ein kompakter Fingerprint-Store geführt (``<store>/<tabelle>.npz``):
+zu jeder Zeile ein 64-Bit-Hash des Schlüssels (tconst, nconst bzw. titleId+ordering)
+und ein 64-Bit-Hash der ganzen Zeile, also 16 Byte pro Zeile.
+
+Ablauf:
+1. Jeder neue Dump wird einmal gelesen, nur Fingerprints. Zeilen-Hashes, die im
+   neuen Dump fehlen, sind verschwundene (gelöschte oder geänderte) Zeilen.
+2. Die verschwundenen Zeilen werden im vorherigen Dump (``--old``) gesucht und
+   übersetzt: Kandidaten für ``removed``. Der Store enthält nur Hashes, für die
+   alten Tripel braucht es deshalb den alten Dump.
+3. Die neuen Dumps aller Tabellen werden ein zweites Mal gelesen. Neue oder
+   geänderte Zeilen werden übersetzt (``added``). Außerdem werden alle aktuellen
+   Zeilen mit der ID (erste Spalte) einer verschwundenen Zeile übersetzt, aus
+   jeder Tabelle; davon bleiben nur 128-Bit-Fingerprints (``rdf_dedup.hash128``).
+4. ``added - removed`` landet in ``<out>/<tabelle>.added.nt``, ``removed`` ohne
+   alles, was die aktuellen Dumps weiter erzeugen, in ``<out>/<tabelle>.removed.nt``.
+5. Die Stores werden durch den neuen Stand ersetzt, erst wenn alles geschrieben ist.
+
+Schritt 3 reicht, weil alle Erzeuger eines Tripels dieselbe ID in der ersten
+Spalte haben: Titel-Tripel und Rollen-IRIs hängen an der tconst, Tripel aus
+name.basics an der nconst. So bleiben z. B. ``rdf:type imd:Episode`` (basics und
+episode), Rollen-Knoten aus crew und principals und doppelte principals-Zeilen
+erhalten. ``removed`` und ``added`` sind damit disjunkt, die Reihenfolge beim
+Einspielen ist egal.
+
+Die Kandidaten gehen per Hash in ``K`` Buckets auf die Platte (wie in rdf_dedup);
+im Speicher ist immer nur ein Bucket. Die Ausgabe ist je Bucket sortiert.
+
+Aufruf:  python rdf_transform_delta.py --new "../uncutted files" --old "../previous files"
+         (erster Lauf ohne Store baut nur die Fingerprints auf)
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from rdf_dedup import hash128
+from rdf_emit import EMITTERS, emit_lines
+from rdf_reader import CHUNKSIZE, iter_blocks, read_block
+from rdf_writer import NTriplesWriter
+
+# ------------------ Parameter ------------------
+NEW_PATH = "../uncutted files"
+OLD_PATH = "../previous files"
+STORE_DIR = "imdb_fingerprints"
+OUT_DIR = "imdb_delta"
+
+# Anzahl führender Spalten, die eine Zeile eindeutig machen
+KEY_COLS = {"title.akas": 2, "title.principals": 2}
+
+# Speicher für einen Bucket (Bytes); bestimmt die Anzahl Buckets
+MEM_BYTES = 1 << 30
+
+# Geschätzter Speicher je übersetzter Zeile (Tripel als Strings im Set), nur für die
+# Bucket-Zahl; die Zahl der Tripel ist vor dem Übersetzen nicht bekannt
+ROW_BYTES = 4_000
+
+# 128-Bit-Fingerprint eines Tripels
+LINE_HASH = np.dtype([("h1", "<u8"), ("h2", "<u8")])
+
+
+# ------------------ Fingerprints ------------------
+def _split_lines(block: bytes):
+    return block.decode("utf-8").rstrip("\n").split("\n")
+
+
+def fingerprint(lines, key_cols=1):
+    """(Schlüssel-Hashes, Zeilen-Hashes) als uint64-Arrays für eine Liste von Zeilen."""
+    s = pd.Series(lines, dtype=object)
+    if key_cols == 1:
+        keys = s.str.partition("\t")[0]
+    else:
+        keys = s.str.extract(r"^([^\t]*\t[^\t]*)", expand=False).fillna(s)
+    return (pd.util.hash_pandas_object(keys, index=False).to_numpy(),
+            pd.util.hash_pandas_object(s, index=False).to_numpy())
+
+
+def _ids(lines):
+    """Hash der ersten Spalte (tconst bzw. nconst), tabellenübergreifend vergleichbar."""
+    return fingerprint(lines)[0]
+
+
+def load_store(store_dir, table, suffix=""):
+    path = os.path.join(store_dir, f"{table}{suffix}.npz")
+    if not os.path.exists(path):
+        return None
+    with np.load(path) as z:
+        return z["keys"], z["rows"]
+
+
+def save_store(store_dir, table, keys, rows, suffix=""):
+    os.makedirs(store_dir, exist_ok=True)
+    order = np.argsort(rows, kind="stable")
+    tmp = os.path.join(store_dir, f"{table}.tmp.npz")
+    np.savez(tmp, keys=keys[order], rows=rows[order])
+    os.replace(tmp, os.path.join(store_dir, f"{table}{suffix}.npz"))
+
+
+def _member(values, sorted_ref):
+    """Boolesche Maske: welche ``values`` kommen im sortierten ``sorted_ref`` vor."""
+    if len(sorted_ref) == 0:
+        return np.zeros(len(values), dtype=bool)
+    i = np.searchsorted(sorted_ref, values).clip(max=len(sorted_ref) - 1)
+    return sorted_ref[i] == values
+
+
+def _emit(table, header, lines):
+    if not lines:
+        return []
+    block = ("\n".join(lines) + "\n").encode("utf-8")
+    return list(emit_lines(table, read_block(header, block, table)))
+
+
+def _dump(path, table):
+    return os.path.join(path, f"{table}.tsv.gz")
+
+
+# ------------------ Buckets auf der Platte ------------------
+def _by_bucket(lines, k):
+    """(Bucket, Zeilen, h1, h2) je nicht leerem Bucket; Bucket = h1 % k wie in rdf_dedup."""
+    h1, h2 = hash128(lines)
+    b = h1 % np.uint64(k)
+    order = np.argsort(b, kind="stable")
+    bounds = np.searchsorted(b[order], np.arange(k + 1, dtype=np.uint64))
+    lines = np.asarray(lines, dtype=object)
+    for i in range(k):
+        sel = order[bounds[i]:bounds[i + 1]]
+        if len(sel):
+            yield i, lines[sel], h1[sel], h2[sel]
+
+
+def _bucket_path(work, name, b):
+    return os.path.join(work, f"{name}.{b:04d}")
+
+
+def _spill_lines(lines, k, work, name):
+    for b, part, _, _ in _by_bucket(lines, k):
+        with open(_bucket_path(work, name, b), "a", encoding="utf-8", newline="") as f:
+            f.write("".join(part))
+
+
+def _spill_hashes(lines, k, work, name):
+    for b, _, h1, h2 in _by_bucket(lines, k):
+        rec = np.empty(len(h1), dtype=LINE_HASH)
+        rec["h1"], rec["h2"] = h1, h2
+        with open(_bucket_path(work, name, b), "ab") as f:
+            rec.tofile(f)
+
+
+def _read_lines(work, name, b):
+    path = _bucket_path(work, name, b)
+    if not os.path.exists(path):
+        return set()
+    with open(path, encoding="utf-8", newline="") as f:
+        return {l + "\n" for l in f.read().split("\n")[:-1]}
+
+
+def _read_hashes(work, name, b):
+    path = _bucket_path(work, name, b)
+    if not os.path.exists(path):
+        return set()
+    rec = np.fromfile(path, dtype=LINE_HASH)
+    return set(zip(rec["h1"].tolist(), rec["h2"].tolist()))
+
+
+# ------------------ Schritte ------------------
+def scan_new(table, new_path, store_dir, chunksize=CHUNKSIZE):
+    """1) Fingerprints des neuen Dumps; ohne Store wird nur der Store angelegt (None)."""
+    key_cols = KEY_COLS.get(table, 1)
+    old = load_store(store_dir, table)
+    keys, rows = [], []
+    for _, block, _, _ in iter_blocks(_dump(new_path, table), chunksize):
+        k, r = fingerprint(_split_lines(block), key_cols)
+        keys.append(k)
+        rows.append(r)
+    keys = np.concatenate(keys) if keys else np.empty(0, dtype=np.uint64)
+    rows = np.concatenate(rows) if rows else np.empty(0, dtype=np.uint64)
+
+    if old is None:
+        save_store(store_dir, table, keys, rows)
+        print(f"[Info] {table}: kein Store vorhanden, {len(rows)} Fingerprints angelegt")
+        return None
+
+    # neuer Stand erst nach dem Schreiben der Ausgabe an seinen Platz
+    save_store(store_dir, table, keys, rows, ".next")
+    old_keys, old_rows = old
+    new_sorted = np.sort(rows)
+    gone = np.sort(old_rows[~_member(old_rows, new_sorted)])
+    new_keys, old_keys = np.unique(keys), np.unique(old_keys)
+    stats = {
+        "rows_new": int(len(rows)),
+        "keys_added": int((~_member(new_keys, old_keys)).sum()),
+        "keys_removed": int((~_member(old_keys, new_keys)).sum()),
+        "rows_changed": int(len(gone)),
+    }
+    fresh = int((~_member(rows, old_rows)).sum())
+    return {"gone": gone, "fresh": fresh, "stats": stats}
+
+
+def emit_gone(table, old_path, gone, work, k, chunksize=CHUNKSIZE):
+    """2) Verschwundene Zeilen im alten Dump übersetzen; liefert ihre IDs."""
+    ids = []
+    if not len(gone):
+        return np.empty(0, dtype=np.uint64)
+    key_cols = KEY_COLS.get(table, 1)
+    for header, block, _, _ in iter_blocks(_dump(old_path, table), chunksize):
+        lines = _split_lines(block)
+        hit = _member(fingerprint(lines, key_cols)[1], gone)
+        if hit.any():
+            lines = [l for l, h in zip(lines, hit) if h]
+            ids.append(_ids(lines))
+            _spill_lines(_emit(table, header, lines), k, work, f"{table}.removed")
+    return np.concatenate(ids) if ids else np.empty(0, dtype=np.uint64)
+
+
+def emit_current(table, new_path, store_dir, affected, work, k, delta=False, chunksize=CHUNKSIZE):
+    """3) Neuer Dump: neue/geänderte Zeilen übersetzen (nur mit ``delta``), Tripel aller
+    Zeilen mit betroffener ID als Fingerprints sammeln."""
+    if delta:
+        old_rows = load_store(store_dir, table)[1]
+        key_cols = KEY_COLS.get(table, 1)
+    elif not len(affected):
+        return
+    for header, block, _, _ in iter_blocks(_dump(new_path, table), chunksize):
+        lines = _split_lines(block)
+        if delta:
+            fresh = ~_member(fingerprint(lines, key_cols)[1], old_rows)
+            if fresh.any():
+                _spill_lines(_emit(table, header, [l for l, f in zip(lines, fresh) if f]),
+                             k, work, f"{table}.added")
+        if len(affected):
+            hit = _member(_ids(lines), affected)
+            if hit.any():
+                _spill_hashes(_emit(table, header, [l for l, h in zip(lines, hit) if h]),
+                              k, work, "current")
+
+
+def write_delta(tables, work, k, out_dir):
+    """4) Je Bucket ``added - removed`` und ``removed`` ohne aktuelle Tripel schreiben."""
+    os.makedirs(out_dir, exist_ok=True)
+    counts = {t: {"triples_added": 0, "triples_removed": 0} for t in tables}
+    writers = {}
+    try:
+        for t in tables:
+            writers[t] = (NTriplesWriter(os.path.join(out_dir, f"{t}.added.nt")),
+                          NTriplesWriter(os.path.join(out_dir, f"{t}.removed.nt")))
+        for b in range(k):
+            current = _read_hashes(work, "current", b)
+            for t in tables:
+                added = _read_lines(work, f"{t}.added", b)
+                removed = _read_lines(work, f"{t}.removed", b)
+                plus = sorted(added - removed)
+                minus = sorted(removed - added)
+                if minus and current:
+                    h1, h2 = hash128(minus)
+                    minus = [l for l, h in zip(minus, zip(h1.tolist(), h2.tolist())) if h not in current]
+                writers[t][0].write("".join(plus))
+                writers[t][1].write("".join(minus))
+                counts[t]["triples_added"] += len(plus)
+                counts[t]["triples_removed"] += len(minus)
+    finally:
+        for pair in writers.values():
+            for w in pair:
+                w.close()
+    return counts
+
+
+def run(new_path=NEW_PATH, old_path=OLD_PATH, store_dir=STORE_DIR, out_dir=OUT_DIR, tables=None,
+        mem_bytes=MEM_BYTES):
+    available = [t for t in EMITTERS if os.path.isfile(_dump(new_path, t))]
+    result, delta = {}, {}
+    for table in tables or EMITTERS:
+        if table not in available:
+            print(f"[!] {table}: nicht gefunden, übersprungen")
+            continue
+        result[table] = delta[table] = scan_new(table, new_path, store_dir)
+    delta = {t: s for t, s in delta.items() if s is not None}
+    if not delta:
+        return result
+
+    rows = sum(len(s["gone"]) + s["fresh"] for s in delta.values())
+    k = max(1, -(-rows * ROW_BYTES // mem_bytes))
+    os.makedirs(out_dir, exist_ok=True)
+    work = tempfile.mkdtemp(prefix="delta_", dir=out_dir)
+    try:
+        affected = [emit_gone(t, old_path, s["gone"], work, k) for t, s in delta.items()]
+        affected = np.unique(np.concatenate(affected))
+        # alle Tabellen, auch nicht ausgewählte: sie können entfernte Tripel weiter erzeugen
+        for t in available:
+            emit_current(t, new_path, store_dir, affected, work, k, delta=t in delta)
+        counts = write_delta(list(delta), work, k, out_dir)
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+    # 5) Stores auf den neuen Stand bringen
+    for t, s in delta.items():
+        os.replace(os.path.join(store_dir, f"{t}.next.npz"), os.path.join(store_dir, f"{t}.npz"))
+        stats = result[t] = {**s["stats"], **counts[t]}
+        print(f"[✓] {t}: +{stats['triples_added']} / -{stats['triples_removed']} Tripel "
+              f"({stats['keys_added']} neue, {stats['keys_removed']} gelöschte Schlüssel)")
+    return result
+
+
+def main():
+    ap = argparse.ArgumentParser(description="IMDb -> RDF, nur Änderungen seit dem letzten Lauf")
+    ap.add_argument("--new", default=NEW_PATH, help="Ordner mit den aktuellen .tsv.gz")
+    ap.add_argument("--old", default=OLD_PATH, help="Ordner mit den Dumps des letzten Laufs")
+    ap.add_argument("--store", default=STORE_DIR, help="Fingerprint-Store")
+    ap.add_argument("--out", default=OUT_DIR, help="Zielordner für *.added.nt / *.removed.nt")
+    ap.add_argument("--table", action="append", help="nur diese Tabelle(n)")
+    ap.add_argument("--mem", type=int, default=MEM_BYTES, help="Bytes pro Bucket")
+    args = ap.parse_args()
+    run(args.new, args.old, args.store, args.out, args.table, args.mem)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+# ---------------------- TRANSFORMATION (parallel, Prozess-Pool) -----------------------
+"""
+Verteilt die sieben IMDb-Tabellen und die Chunks innerhalb großer Tabellen auf
+einen Prozess-Pool.
+
+- Pro Tabelle liest ein Thread die .tsv.gz und schneidet sie in Blöcke zu
+  ``CHUNKSIZE`` Zeilen (nur Dekompression, kein Parsen; zlib gibt die GIL frei,
+  die Tabellen werden also gleichzeitig gelesen).
+- Die Worker parsen ihren Block mit pandas, erzeugen die Tripel über
+  ``rdf_emit`` und schreiben jeweils einen eigenen N-Triples-Shard.
+- Mit Parquet-Kopie (rdf_parquet) entfällt das Schneiden: jeder Worker liest
+  eine Row Group selbst aus der memory-mappten Datei, die Chunks entsprechen
+  dann den Row Groups der Kopie.
+- Zum Schluss werden die Shards in fester Reihenfolge (Tabelle, Chunk) an die
+  Ausgabedatei gehängt, das Ergebnis ist also unabhängig von der Worker-Zahl.
+
+Die Tabellen hängen nicht voneinander ab (alle Tripel sind über tconst/nconst
+geschlüsselt), deshalb ist keine Synchronisation zwischen Workern nötig.
+
+Aufruf:  python rdf_transform_parallel.py --workers 32
+"""
+
+import argparse
+import os
+import shutil
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from rdflib import Graph
+
+from rdf_emit import EMITTERS, emit_chunk
+from rdf_parquet import read_group
+from rdf_reader import iter_blocks, read_block, staged_source
+from rdf_writer import NTriplesWriter
+
+# ------------------ Parameter ------------------
+IMDB_PATH = "../uncutted files"
+ONTOLOGY_FILE = "imdb_ontology.ttl"
+OUT_FILE = "imdb_transformed.ttl"
+SHARD_DIR = "imdb_shards_tmp"
+CHUNKSIZE = 100_000
+
+# Reihenfolge der Tabellen in der Ausgabe (wie im sequentiellen Skript)
+TABLES = list(EMITTERS)
+
+
+# ------------------ Worker ------------------
+def shard_path(shard_dir, table, idx):
+    return os.path.join(shard_dir, f"{TABLES.index(table):02d}-{table}", f"{idx:06d}.nt")
+
+
+def transform_block(table, idx, header, block, shard_dir):
+    """Parst einen Block, schreibt seinen Shard und gibt (Tabelle, Index, Tripel) zurück."""
+    df = read_block(header, block, table)
+    out = shard_path(shard_dir, table, idx)
+    with NTriplesWriter(out) as w:
+        w.write(emit_chunk(table, df))
+        return table, idx, w.triples
+
+
+def transform_group(table, idx, part, group, shard_dir):
+    """Wie ``transform_block``, liest aber Row Group ``group`` der Parquet-Datei ``part``."""
+    df = read_group(part, group, table)
+    out = shard_path(shard_dir, table, idx)
+    with NTriplesWriter(out) as w:
+        w.write(emit_chunk(table, df))
+        return table, idx, w.triples
+
+
+# ------------------ Steuerung ------------------
+def run(path=IMDB_PATH, out_file=OUT_FILE, workers=None, chunksize=CHUNKSIZE,
+        shard_dir=SHARD_DIR, ontology_file=ONTOLOGY_FILE, keep_shards=False):
+    workers = workers or os.cpu_count()
+    tables = [t for t in TABLES if os.path.isfile(os.path.join(path, f"{t}.tsv.gz"))]
+    for t in tables:
+        os.makedirs(os.path.dirname(shard_path(shard_dir, t, 0)), exist_ok=True)
+
+    # Höchstens 2 Blöcke pro Worker gleichzeitig im Speicher
+    slots = threading.BoundedSemaphore(2 * workers)
+    chunks = {t: 0 for t in tables}
+    triples = {t: 0 for t in tables}
+    errors = []
+    lock = threading.Lock()
+
+    def _done(fut):
+        slots.release()
+        try:
+            table, _, n = fut.result()
+        except Exception as e:  # Fehler im Worker erst am Ende melden
+            errors.append(e)
+            return
+        with lock:
+            triples[table] += n
+
+    def _feed(pool, table):
+        # Lesefehler (defekte .tsv.gz, Parquet-Kopie) wie Worker-Fehler sammeln, sonst
+        # endet nur dieser Thread und die Ausgabe würde stillschweigend unvollständig
+        try:
+            src = os.path.join(path, f"{table}.tsv.gz")
+            staged = staged_source(src)
+            if staged is not None:
+                tasks = ((transform_group, table, idx, part, group, shard_dir)
+                         for idx, (part, group) in enumerate(staged.groups()))
+            else:
+                tasks = ((transform_block, table, idx, header, block, shard_dir)
+                         for idx, (header, block, _, _) in enumerate(iter_blocks(src, chunksize)))
+            for fn, *task in tasks:
+                slots.acquire()
+                pool.submit(fn, *task).add_done_callback(_done)
+                chunks[table] += 1
+        except Exception as e:
+            print(f"[!] Lesefehler in {table}: {e}")
+            errors.append(e)
+            return
+        print(f"[✓] Gelesen: {table} ({chunks[table]} Chunks)")
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        readers = [threading.Thread(target=_feed, args=(pool, t)) for t in tables]
+        for r in readers:
+            r.start()
+        for r in readers:
+            r.join()
+    # vor dem Zusammenfügen: Fehler aus Lese-Threads und Workern
+    if errors:
+        raise errors[0]
+
+    # Geordnete Konkatenation: Kopf + Ontologie, dann Tabelle für Tabelle, Chunk für Chunk
+    with NTriplesWriter(out_file) as sink:
+        sink.write_raw('@prefix res: <http://example.org/imdb/resource/> .\n')
+        sink.write_raw('@prefix imd: <http://example.org/imdb#> .\n\n')
+        ontology = Graph()
+        ontology.parse(ontology_file, format="turtle")
+        sink.write_graph(ontology)
+        for t in tables:
+            for idx in range(chunks[t]):
+                sink.append_file(shard_path(shard_dir, t, idx))
+    if not keep_shards:
+        shutil.rmtree(shard_dir, ignore_errors=True)
+
+    for t in tables:
+        print(f"    {t}: {triples[t]} Tripel in {chunks[t]} Chunks")
+    print(f"[✓] Fertig. Tripel in '{out_file}' geschrieben ({workers} Worker).")
+    return triples
+
+
+def main():
+    ap = argparse.ArgumentParser(description="IMDb -> RDF, parallel über Tabellen und Chunks")
+    ap.add_argument("--path", default=IMDB_PATH, help="Ordner mit den .tsv.gz")
+    ap.add_argument("--out", default=OUT_FILE)
+    ap.add_argument("--workers", type=int, default=None, help="Standard: alle Kerne")
+    ap.add_argument("--chunksize", type=int, default=CHUNKSIZE)
+    ap.add_argument("--shard-dir", default=SHARD_DIR)
+    ap.add_argument("--keep-shards", action="store_true", help="Worker-Shards nach dem Zusammenfügen behalten")
+    args = ap.parse_args()
+    run(args.path, args.out, args.workers, args.chunksize, args.shard_dir,
+        keep_shards=args.keep_shards)
+
+
+if __name__ == "__main__":
+    main()
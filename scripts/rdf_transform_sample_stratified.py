@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+"""
+Geschichtetes, reproduzierbares IMDb-RDF-Sample mit max. ``MAX_TRIPLES`` Tripeln.
+
+Anders als ``rdf_transform_100k_everyTable.py`` (erste 4000 Titel der Datei,
+Budget gierig verteilt) bekommt hier jede Klasse einen festen Anteil am Budget
+(``QUOTAS``) und wird per Reservoir-Sampling mit festem ``SEED`` gezogen:
+
+1. title.basics einmal lesen, Titel nach titleType auf Movie, TVSeries,
+   Episode und ShortFilm verteilen (je ein Reservoir); title.episode liefert
+   die Episodendaten der Episoden-Kandidaten.
+2. Titelklassen in ihre Quoten einpassen.
+3. title.ratings, title.akas, title.principals + title.crew: nur Zeilen
+   ausgewählter Titel, je ein Reservoir für Rating, AlternateTitle und Role,
+   danach einpassen. Regie und Drehbuch aus title.crew werden dafür in
+   Rollen-Zeilen im Schema von title.principals zerlegt (eine je Person).
+4. name.basics: Personen der ausgewählten Rollen, Reservoir für Person.
+
+Jede Datei wird höchstens einmal gelesen, der Speicher hängt nur vom
+Budget ab: ein Reservoir fasst höchstens so viele Zeilen, wie seiner Klasse
+Tripel zustehen können. Nicht genutzte Tripel einer Klasse gehen an die nächste Klasse.
+Seed, Quoten und Ergebnis stehen im Manifest ``<OUT_FILE>.manifest.json``;
+gleicher Seed + gleiche Quellen = gleiches Sample.
+"""
+
+import json
+import os
+
+import pandas as pd
+from rdflib import Graph
+
+from rdf_emit import emit_lines, split_list, valid
+from rdf_index import open_index
+from rdf_iri import iris
+from rdf_reader import iter_chunks
+from rdf_sampling import Budget, StratifiedReservoir, class_seed, fit
+from rdf_writer import NTriplesWriter
+
+# ------------------ Parameter ------------------
+IMDB_PATH = "../uncutted files"   # Pfad zu den .tsv.gz
+ONTOLOGY_FILE = "imdb_ontology.ttl"
+OUT_FILE = "imdb_sample_stratified.ttl"
+MAX_TRIPLES = 100_000             # inkl. Ontologie
+SEED = 42
+
+# Anteil am Budget (nach Abzug der Ontologie), Reihenfolge = Reihenfolge des Einpassens
+QUOTAS = {
+    "Movie": 0.15,
+    "TVSeries": 0.10,
+    "Episode": 0.15,
+    "ShortFilm": 0.05,
+    "Rating": 0.10,
+    "AlternateTitle": 0.10,
+    "Role": 0.20,
+    "Person": 0.15,
+}
+
+# titleType -> Klasse (andere Typen wie video oder videoGame werden nicht gezogen)
+TITLE_CLASSES = {
+    "movie": "Movie", "tvMovie": "Movie",
+    "tvSeries": "TVSeries", "tvMiniSeries": "TVSeries",
+    "tvEpisode": "Episode",
+    "short": "ShortFilm", "tvShort": "ShortFilm",
+}
+
+# True: abhängige Tabellen über den Offset-Index (rdf_index) lesen
+USE_INDEX = True
+
+CHUNKSIZE = 200_000
+
+PRINCIPAL_COLUMNS = ["tconst", "ordering", "nconst", "category", "job", "characters"]
+
+
+# ------------------ Hilfen ------------------
+def source(table):
+    return os.path.join(IMDB_PATH, f"{table}.tsv.gz")
+
+
+def chunks(table, keys=None):
+    """Chunks einer Tabelle; mit Index nur die Zeilen zu ``keys``."""
+    if USE_INDEX and keys is not None:
+        return open_index(source(table), table).iter_chunks(keys, chunksize=CHUNKSIZE)
+    return iter_chunks(source(table), table, chunksize=CHUNKSIZE)
+
+
+def emit(table, df):
+    return list(emit_lines(table, df)) if len(df) else []
+
+
+def crew_roles(df):
+    """title.crew als Rollen-Zeilen im Schema von title.principals (eine je Regisseur/Autor);
+    ``emit("title.principals", ...)`` erzeugt daraus dieselben Tripel wie der crew-Emitter."""
+    parts = []
+    for category, col in (("director", "directors"), ("writer", "writers")):
+        n = split_list(df[col][valid(df[col])])
+        parts.append(pd.DataFrame({"tconst": df["tconst"].loc[n.index].to_numpy(),
+                                   "nconst": n.to_numpy(), "category": category}))
+    return pd.concat(parts, ignore_index=True).reindex(columns=PRINCIPAL_COLUMNS)
+
+
+def select(name, rows, emit_n):
+    """Klasse ``name`` in ihre Quote einpassen; liefert die gewählten Zeilen."""
+    n, new = fit(emit_n, len(rows), budget.available(name), seen)
+    budget.spend(name, len(new))
+    seen.update(new)
+    out[name] = new
+    entities[name] = n
+    print(f"[✓] {name}: {n} von {len(rows)} Kandidaten, {len(new)} Tripel "
+          f"(reserviert {budget.reserved[name]})")
+    return rows.iloc[:n]
+
+
+# ------------------ 0) Ontologie ------------------
+ontology = Graph()
+if os.path.exists(ONTOLOGY_FILE):
+    ontology.parse(ONTOLOGY_FILE, format="turtle")
+if len(ontology) >= MAX_TRIPLES:
+    raise RuntimeError("Ontologie allein überschreitet das Budget.")
+
+budget = Budget(MAX_TRIPLES - len(ontology), QUOTAS)
+seen = set()
+out = {}
+entities = {}
+title_classes = [c for c in QUOTAS if c in TITLE_CLASSES.values()]
+
+# Reservoirgröße: jede Einheit bringt mindestens ein Tripel, mehr Einheiten als ihre
+# Quote plus die Reste der Klassen davor kann eine Klasse also nicht brauchen
+
+# ------------------ 1) Titel nach Klasse ziehen ------------------
+titles = StratifiedReservoir({c: budget.max_available(c) for c in title_classes},
+                             class_seed(SEED, "title.basics"))
+for df in chunks("title.basics"):
+    titles.offer(df, df["titleType"].astype(object).map(TITLE_CLASSES))
+
+# Episodendaten (Staffel, Folge, Serie) nur für die Episoden-Kandidaten;
+# der Index von title.episode ist nach parentTconst sortiert, deshalb ganz lesen
+episode_ids = set(titles["Episode"].rows().get("tconst", pd.Series(dtype=object)))
+episode_rows = [df[df["tconst"].isin(episode_ids)] for df in chunks("title.episode")]
+episode_rows = pd.concat(episode_rows, ignore_index=True) if episode_rows else pd.DataFrame(columns=["tconst"])
+
+# ------------------ 2) Titelklassen einpassen ------------------
+selected_titles = set()
+for c in title_classes:
+    rows = titles[c].rows()
+    if c == "Episode":
+        def emit_n(n, rows=rows):
+            head = rows.iloc[:n]
+            return emit("title.basics", head) + emit(
+                "title.episode", episode_rows[episode_rows["tconst"].isin(set(head["tconst"]))])
+    else:
+        def emit_n(n, rows=rows):
+            return emit("title.basics", rows.iloc[:n])
+    chosen = select(c, rows, emit_n)
+    if len(chosen):
+        selected_titles.update(chosen["tconst"])
+
+# ------------------ 3) Ratings, AKAs, Rollen der ausgewählten Titel ------------------
+# (Klasse, Tabelle für die Tripel, Quellen als (Tabelle, Schlüsselspalte, Umformung))
+dependent = [("Rating", "title.ratings", [("title.ratings", "tconst", None)]),
+             ("AlternateTitle", "title.akas", [("title.akas", "titleId", None)]),
+             ("Role", "title.principals", [("title.principals", "tconst", None),
+                                           ("title.crew", "tconst", crew_roles)])]
+people = set()
+for name, table, sources in dependent:
+    # Reste der Titelklassen stehen jetzt fest, die Größe ist also genau das Verfügbare
+    res = StratifiedReservoir({name: budget.available(name)}, class_seed(SEED, table))
+    for src, key, convert in sources:
+        for df in chunks(src, selected_titles):
+            df = df[df[key].isin(selected_titles)]
+            res.offer(convert(df) if convert else df)
+    rows = res[name].rows()
+    chosen = select(name, rows, lambda n, rows=rows, table=table: emit(table, rows.iloc[:n]))
+    if name == "Role" and len(chosen):
+        people.update(chosen["nconst"])
+
+# ------------------ 4) Personen der ausgewählten Rollen ------------------
+res = StratifiedReservoir({"Person": budget.available("Person")}, class_seed(SEED, "name.basics"))
+for df in chunks("name.basics", people):
+    res.offer(df, mask=df["nconst"].isin(people).to_numpy())
+rows = res["Person"].rows()
+select("Person", rows, lambda n: emit("name.basics", rows.iloc[:n]))
+
+# ------------------ 5) Schreiben + Manifest ------------------
+with NTriplesWriter(OUT_FILE) as sink:
+    sink.write_raw('@prefix res: <http://example.org/imdb/resource/> .\n')
+    sink.write_raw('@prefix imd: <http://example.org/imdb#> .\n\n')
+    for triple in sorted(ontology):  # feste Reihenfolge, damit gleicher Seed = gleiche Datei
+        sink.add(triple)
+    for c in QUOTAS:
+        sink.write("".join(out.get(c, [])))
+    total = sink.triples
+
+manifest = {
+    "seed": SEED,
+    "max_triples": MAX_TRIPLES,
+    "triples": total,
+    "ontology_triples": len(ontology),
+    "quotas": QUOTAS,
+    "title_classes": TITLE_CLASSES,
+    "reserved": budget.reserved,
+    "used": budget.used,
+    "entities": entities,
+    "sources": {t: {"size": os.path.getsize(source(t)), "mtime": os.path.getmtime(source(t))}
+                for t in ("title.basics", "title.episode", "title.ratings", "title.akas",
+                          "title.principals", "title.crew", "name.basics")},
+}
+with open(OUT_FILE + ".manifest.json", "w", encoding="utf-8") as f:
+    json.dump(manifest, f, indent=1)
+
+print(f"[OK] Geschrieben: {OUT_FILE}  | Tripel: {total}  | Restbudget: {MAX_TRIPLES - total}")
+iris.report()
@@ -0,0 +1,301 @@
+# ---------------------- PARALLELER, FORTSETZBARER SHARD-UPLOAD -------------------------------
+"""
+Lädt die Shards aus dem Manifest (``rdf_shards``) per HTTP hoch, mehrere
+gleichzeitig, mit Wiederholungen und einer Zustandsdatei.
+
+Ersetzt ``different scripts/triply_upload.js``, das jede Datei einzeln und
+ohne Wiederholung hochlädt und sich nicht merkt, was schon angekommen ist:
+
+- höchstens ``CONCURRENCY`` Uploads gleichzeitig (asyncio, die eigentliche
+  Übertragung läuft mit urllib in Threads, die Datei wird gestreamt)
+- Wiederholung bei Netzwerkfehlern, Timeouts, HTTP 429 und 5xx mit
+  exponentiellem Backoff (``BACKOFF`` · 2^Versuch, begrenzt auf ``BACKOFF_MAX``,
+  mit Jitter; ``Retry-After`` wird beachtet); andere 4xx brechen den Shard ab
+- Zustand pro Shard in ``<manifest>.upload.json`` (nach jedem Shard atomar
+  geschrieben). Ein neuer Lauf überspringt Shards, die mit gleicher Prüfsumme
+  schon hochgeladen sind.
+- Durchsatz pro Shard und insgesamt
+
+Ziel ist eine URL-Vorlage mit ``{file}`` (``ENDPOINT`` bzw. ``UPLOAD_URL``),
+das Token kommt wie beim JS-Skript aus ``TOKEN``. Zum Ausprobieren gibt es mit
+``stub`` einen lokalen Platzhalter-Server, der Uploads annimmt, die Prüfsumme
+kontrolliert und auf Wunsch zufällig mit 503 antwortet.
+
+Aufruf:  python rdf_upload.py stub --port 8765 --fail-rate 0.3 --dir uploaded
+         python rdf_upload.py upload --manifest imdb_shard_manifest.json
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+from email.utils import parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import quote, unquote, urlparse
+
+from rdf_shards import load_manifest
+
+# ------------------ Parameter ------------------
+MANIFEST = "imdb_shard_manifest.json"
+ENDPOINT = os.environ.get("UPLOAD_URL", "http://127.0.0.1:8765/upload/{file}")
+METHOD = "PUT"
+CONCURRENCY = 4
+RETRIES = 6              # Versuche nach dem ersten
+BACKOFF = 2.0            # Sekunden vor dem ersten Wiederholungsversuch
+BACKOFF_MAX = 300.0
+TIMEOUT = 3600           # Sekunden pro Request (Shards bis ~1 GiB)
+
+RETRY_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+
+class PermanentError(Exception):
+    """Upload ist ohne Änderung nicht zu retten (z. B. 401/403/413)."""
+
+
+class RetryableError(Exception):
+    def __init__(self, msg, retry_after=None):
+        super().__init__(msg)
+        self.retry_after = retry_after
+
+
+# ------------------ Zustand ------------------
+class UploadState:
+    def __init__(self, path):
+        self.path = path
+        self.shards = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.shards = json.load(f).get("shards", {})
+
+    def done(self, shard):
+        entry = self.shards.get(shard["file"], {})
+        return entry.get("status") == "done" and entry.get("sha256") == shard["sha256"]
+
+    def update(self, file, **entry):
+        self.shards[file] = {**self.shards.get(file, {}), **entry}
+        self.save()
+
+    def save(self):
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"shards": self.shards}, f, indent=1)
+        os.replace(tmp, self.path)
+
+
+# ------------------ Ein Request ------------------
+def _retry_after(value):
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+
+def _send(url, path, sha256, token, method=METHOD, timeout=TIMEOUT):
+    """Eine Datei streamen (blockierend, läuft im Thread); liefert die Antwort als Text."""
+    headers = {
+        "Content-Type": "application/n-triples",
+        "Content-Encoding": "gzip",
+        "Content-Length": str(os.path.getsize(path)),
+        "X-Content-SHA256": sha256,
+    }
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    with open(path, "rb") as f:
+        req = urllib.request.Request(url, data=f, method=method, headers=headers)
+        try:
+            with urllib.request.urlopen(req, timeout=timeout) as resp:
+                return resp.read().decode("utf-8", "replace")
+        except urllib.error.HTTPError as e:
+            body = e.read().decode("utf-8", "replace")[:200]
+            if e.code in RETRY_STATUS:
+                raise RetryableError(f"HTTP {e.code}: {body}", _retry_after(e.headers.get("Retry-After")))
+            raise PermanentError(f"HTTP {e.code}: {body}") from e
+        except (urllib.error.URLError, OSError) as e:  # Verbindung, Timeout, Abbruch
+            raise RetryableError(str(getattr(e, "reason", e))) from e
+
+
+def backoff_delay(attempt, base=BACKOFF, cap=BACKOFF_MAX, retry_after=None):
+    """Wartezeit vor Versuch ``attempt`` (1, 2, …): exponentiell mit Jitter, Retry-After hat Vorrang."""
+    delay = min(cap, base * 2 ** (attempt - 1)) * random.uniform(0.5, 1.0)
+    return max(delay, retry_after or 0.0)
+
+
+# ------------------ Upload aller Shards ------------------
+async def _upload_shard(shard, base_dir, endpoint, state, sem, opts, totals):
+    name = shard["file"]
+    path = os.path.join(base_dir, name)
+    url = endpoint.replace("{file}", quote(name))
+    last = None
+    for attempt in range(opts["retries"] + 1):
+        if attempt:
+            # Wartezeit ohne Slot: andere Shards können derweil übertragen
+            await asyncio.sleep(backoff_delay(attempt, opts["backoff"], retry_after=last.retry_after))
+        async with sem:
+            state.update(name, status="uploading", attempts=attempt + 1, sha256=shard["sha256"])
+            t = time.perf_counter()
+            try:
+                response = await asyncio.to_thread(_send, url, path, shard["sha256"], opts["token"],
+                                                   opts["method"], opts["timeout"])
+            except RetryableError as e:
+                last = e
+                print(f"[!] {name}: Versuch {attempt + 1} fehlgeschlagen ({e})")
+                continue
+            except PermanentError as e:
+                state.update(name, status="failed", error=str(e))
+                print(f"[!] {name}: abgebrochen ({e})")
+                return False
+            # nur die erfolgreiche Übertragung, ohne Fehlversuche und Backoff
+            sec = time.perf_counter() - t
+        state.update(name, status="done", bytes=shard["bytes"], triples=shard["triples"],
+                     seconds=round(sec, 3), finished=time.time(), response=response[:200], error=None)
+        totals["bytes"] += shard["bytes"]
+        totals["shards"] += 1
+        print(f"[✓] {name}: {shard['bytes'] / 1e6:.1f} MB in {sec:.1f}s "
+              f"({shard['bytes'] / 1e6 / sec if sec else 0:.1f} MB/s, Versuch {attempt + 1})")
+        return True
+    state.update(name, status="failed", error=str(last))
+    print(f"[!] {name}: nach {opts['retries'] + 1} Versuchen aufgegeben")
+    return False
+
+
+async def upload(manifest_path=MANIFEST, endpoint=ENDPOINT, concurrency=CONCURRENCY, retries=RETRIES,
+                 backoff=BACKOFF, method=METHOD, timeout=TIMEOUT, token=None, partial=False):
+    """Alle noch nicht hochgeladenen Shards übertragen; liefert eine Zusammenfassung."""
+    manifest = load_manifest(manifest_path)
+    if not manifest.get("complete") and not partial:
+        raise RuntimeError(f"{manifest_path}: Transformation noch nicht abgeschlossen (--partial lädt trotzdem)")
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    state = UploadState(manifest_path + ".upload.json")
+    todo = [s for s in manifest["shards"] if not state.done(s)]
+    skipped = len(manifest["shards"]) - len(todo)
+    print(f"[Info] {len(manifest['shards'])} Shards, {skipped} schon hochgeladen, "
+          f"{len(todo)} offen ({sum(s['bytes'] for s in todo) / 1e6:.1f} MB), {concurrency} parallel")
+
+    sem = asyncio.Semaphore(concurrency)
+    opts = {"retries": retries, "backoff": backoff, "token": token, "method": method, "timeout": timeout}
+    totals = {"bytes": 0, "shards": 0}
+    t = time.perf_counter()
+    results = await asyncio.gather(*(_upload_shard(s, base_dir, endpoint, state, sem, opts, totals)
+                                     for s in todo))
+    sec = time.perf_counter() - t
+    summary = {
+        "shards": len(manifest["shards"]), "skipped": skipped,
+        "uploaded": totals["shards"], "failed": results.count(False),
+        "bytes": totals["bytes"], "seconds": round(sec, 3),
+        "mb_per_s": round(totals["bytes"] / 1e6 / sec, 2) if sec else None,
+    }
+    print(f"[OK] {summary['uploaded']} hochgeladen, {summary['failed']} fehlgeschlagen, "
+          f"{summary['bytes'] / 1e6:.1f} MB in {sec:.1f}s ({summary['mb_per_s'] or 0:.1f} MB/s)")
+    return summary
+
+
+# ------------------ Lokaler Platzhalter für die Import-API ------------------
+def serve_stub(port=8765, host="127.0.0.1", out_dir=None, fail_rate=0.0, delay=0.0):
+    """Nimmt PUT/POST /upload/<datei> an, prüft X-Content-SHA256, antwortet zufällig mit 503."""
+    lock = threading.Lock()
+    received = {}
+
+    class Handler(BaseHTTPRequestHandler):
+        def _reply(self, status, body, headers=None):
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for k, v in (headers or {}).items():
+                self.send_header(k, v)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _upload(self):
+            url_path = unquote(urlparse(self.path).path)
+            if not url_path.startswith("/upload/"):
+                return self._reply(404, {"error": "nur /upload/<datei>"})
+            name = os.path.basename(url_path)
+            length = int(self.headers.get("Content-Length", 0))
+            h = hashlib.sha256()
+            out = open(os.path.join(out_dir, name + ".part"), "wb") if out_dir else None
+            try:
+                left = length
+                while left:
+                    chunk = self.rfile.read(min(left, 1 << 20))
+                    if not chunk:
+                        break
+                    h.update(chunk)
+                    if out:
+                        out.write(chunk)
+                    left -= len(chunk)
+            finally:
+                if out:
+                    out.close()
+            if delay:
+                time.sleep(delay)
+            if random.random() < fail_rate:
+                return self._reply(503, {"error": "zufälliger Fehler"}, {"Retry-After": "1"})
+            expected = self.headers.get("X-Content-SHA256")
+            if left or (expected and expected != h.hexdigest()):
+                return self._reply(400, {"error": "unvollständig oder Prüfsumme falsch"})
+            if out_dir:
+                os.replace(os.path.join(out_dir, name + ".part"), os.path.join(out_dir, name))
+            with lock:
+                received[name] = received.get(name, 0) + 1
+            self._reply(200, {"file": name, "bytes": length, "sha256": h.hexdigest()})
+
+        do_PUT = do_POST = _upload
+
+        def log_message(self, *args):
+            pass
+
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+    httpd = ThreadingHTTPServer((host, port), Handler)
+    print(f"[Info] Upload-Platzhalter: http://{host}:{port}/upload/{{file}} (Fehlerquote {fail_rate:.0%})")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+        print(f"[Info] Empfangen: {len(received)} Dateien, {sum(received.values())} Uploads")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Shards laut Manifest hochladen (parallel, fortsetzbar)")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    up = sub.add_parser("upload", help="Shards hochladen")
+    up.add_argument("--manifest", default=MANIFEST)
+    up.add_argument("--endpoint", default=ENDPOINT, help="URL-Vorlage mit {file}")
+    up.add_argument("--method", default=METHOD, choices=["PUT", "POST"])
+    up.add_argument("--concurrency", type=int, default=CONCURRENCY)
+    up.add_argument("--retries", type=int, default=RETRIES)
+    up.add_argument("--backoff", type=float, default=BACKOFF, help="Sekunden vor dem ersten Wiederholungsversuch")
+    up.add_argument("--timeout", type=float, default=TIMEOUT)
+    up.add_argument("--partial", action="store_true", help="auch bei unvollständigem Manifest")
+    st = sub.add_parser("stub", help="lokaler Platzhalter-Server für Tests")
+    st.add_argument("--host", default="127.0.0.1")
+    st.add_argument("--port", type=int, default=8765)
+    st.add_argument("--dir", default=None, help="empfangene Dateien hier ablegen")
+    st.add_argument("--fail-rate", type=float, default=0.0, help="Anteil Uploads mit Antwort 503")
+    st.add_argument("--delay", type=float, default=0.0, help="Sekunden Verzögerung pro Upload")
+    args = ap.parse_args()
+
+    if args.cmd == "stub":
+        return serve_stub(args.port, args.host, args.dir, args.fail_rate, args.delay)
+    summary = asyncio.run(upload(args.manifest, args.endpoint, args.concurrency, args.retries, args.backoff,
+                                 args.method, args.timeout, os.environ.get("TOKEN"), args.partial))
+    if summary["failed"]:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
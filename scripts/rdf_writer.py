@@ -0,0 +1,380 @@
+# ---------------------- STREAMING N-TRIPLES / N-QUADS WRITER -------------------------------
+"""
+Schreibt Tripel direkt als N-Triples (oder N-Quads) in einen gepufferten,
+optional gzip-komprimierten Ausgabestrom.
+
+Im Gegensatz zu ``_flush_graph()`` wird nichts in einem rdflib-Store
+zwischengespeichert: jede Zeile wird einmal formatiert und landet im Puffer,
+der Speicherbedarf bleibt konstant. Der rdflib-Graph wird nur noch für die
+Ontologie und für kleine Vorschauen gebraucht (``write_graph``).
+
+``TurtleWriter`` schreibt dieselben Tripel als kompaktes Turtle: Präfixe statt
+ausgeschriebener IRIs, aufeinanderfolgende Tripel eines Subjekts als
+``;``-Liste, gleiche Prädikate als ``,``-Liste.
+"""
+
+import gzip
+import io
+import os
+import re
+import shutil
+
+import numpy as np
+import pandas as pd
+from rdflib.term import BNode, Literal, URIRef
+
+from rdf_gzip import WRITE_THREADS, ParallelGzipWriter
+
+# Puffergröße des Ausgabestroms (1 MiB reicht, um Syscalls selten zu halten)
+BUFFER_SIZE = 1 << 20
+
+# Präfixe der Turtle-Ausgabe; eine IRI wird gekürzt, wenn alles bis zum letzten
+# '/' bzw. '#' genau einer dieser Namensräume ist
+TURTLE_PREFIXES = {
+    "res": "http://example.org/imdb/resource/",
+    "title": "http://example.org/imdb/resource/title/",
+    "person": "http://example.org/imdb/resource/person/",
+    "rating": "http://example.org/imdb/resource/rating/",
+    "imd": "http://example.org/imdb#",
+    "rdf": "http://www.w3.org/1999/02/22-rdf-syntax-ns#",
+    "rdfs": "http://www.w3.org/2000/01/rdf-schema#",
+    "owl": "http://www.w3.org/2002/07/owl#",
+    "xsd": "http://www.w3.org/2001/XMLSchema#",
+    "dc": "http://purl.org/dc/terms/",
+}
+
+
+def _quote(lex: str) -> str:
+    # gleiches Escaping wie rdflib.plugins.serializers.nt._quote_encode
+    return '"%s"' % lex.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"').replace("\r", "\\r")
+
+
+def term_nt(t) -> str:
+    """Ein rdflib-Term in N-Triples-Schreibweise (wie der nt-Serializer von rdflib)."""
+    if isinstance(t, Literal):
+        nt = getattr(t, "nt", None)  # vorberechnet (rdf_literals.CachedLiteral)
+        if nt is not None:
+            return nt
+        if t.language:
+            return "%s@%s" % (_quote(t), t.language)
+        if t.datatype:
+            return "%s^^<%s>" % (_quote(t), t.datatype)
+        return _quote(t)
+    if isinstance(t, BNode):
+        return "_:%s" % t
+    if isinstance(t, URIRef):
+        return "<%s>" % t
+    raise TypeError(f"Unbekannter RDF-Term: {t!r}")
+
+
+class NTriplesWriter:
+    """Gepufferter Zeilen-Writer für N-Triples bzw. N-Quads.
+
+    ``graph_iri`` gesetzt -> N-Quads, jede Zeile bekommt den benannten Graphen.
+    ``compress=True`` -> gzip-Ausgabe (Endung .gz wird nicht automatisch angehängt),
+    bei ``threads > 1`` block-parallel komprimiert (siehe rdf_gzip.ParallelGzipWriter).
+    ``mode='ab'`` hängt an eine bestehende Datei an (Fortsetzen nach Abbruch).
+    Hat ``add((s, p, o))`` wie ein rdflib-Graph, damit der zeilenweise Pfad
+    unverändert weiterschreiben kann.
+    """
+
+    def __init__(self, path, compress=False, mode='wb', graph_iri=None,
+                 compresslevel=6, buffer_size=BUFFER_SIZE, threads=WRITE_THREADS):
+        self.path = path
+        self.compress = compress
+        self._compresslevel = compresslevel
+        self._threads = threads
+        self._buffer_size = buffer_size
+        self._file = open(path, mode, buffering=buffer_size)
+        self._open_stream()
+        self._end = f" <{graph_iri}> .\n" if graph_iri else " .\n"
+        self.triples = 0
+
+    def _open_stream(self):
+        self._pgz = None
+        if self.compress and self._threads > 1:
+            # Blöcke werden eigene Member, flush() endet an einer Member-Grenze
+            self._gz = None
+            self._pgz = ParallelGzipWriter(self._file, self._threads, self._compresslevel)
+            self._out = self._pgz  # puffert selbst bis BLOCK_SIZE
+        elif self.compress:
+            # eigenes gzip-Member über der offenen Datei (siehe sync());
+            # mtime=0, damit gleiche Daten gleiche Bytes (und Prüfsummen) ergeben
+            self._gz = gzip.GzipFile(fileobj=self._file, mode='wb', compresslevel=self._compresslevel,
+                                     mtime=0)
+            self._out = io.BufferedWriter(self._gz, buffer_size=self._buffer_size)
+        else:
+            self._gz = None
+            self._out = self._file
+
+    # -------- Schreiben --------
+    def add(self, triple):
+        s, p, o = triple
+        self._out.write(f"{term_nt(s)} {term_nt(p)} {term_nt(o)}{self._end}".encode('utf-8'))
+        self.triples += 1
+
+    def write(self, data: str):
+        """Bereits formatierte N-Triples-Zeilen (z. B. aus rdf_emit) übernehmen."""
+        if not data:
+            return
+        if self._end != " .\n":
+            data = data.replace(" .\n", self._end)
+        self._out.write(data.encode('utf-8'))
+        self.triples += data.count("\n")
+
+    def write_raw(self, data: str):
+        """Text ohne Zählung/Umschreiben (z. B. @prefix-Kopf einer .ttl-Datei)."""
+        self._out.write(data.encode('utf-8'))
+
+    def append_file(self, path, triples=0):
+        """Fertigen Shard unverändert anhängen (z. B. beim Zusammenfügen der Worker-Ausgaben)."""
+        with open(path, 'rb') as f:
+            shutil.copyfileobj(f, self._out, BUFFER_SIZE)
+        self.triples += triples
+
+    def write_graph(self, graph):
+        """Kleinen rdflib-Graphen (Ontologie, Vorschau) übernehmen."""
+        for triple in graph:
+            self.add(triple)
+
+    # -------- Verwaltung --------
+    def flush(self):
+        self._out.flush()
+
+    def tell(self) -> int:
+        """Bisher geschriebene (bei gzip: komprimierte) Bytes."""
+        return self._file.tell()
+
+    def sync(self) -> int:
+        """Alles auf die Platte bringen und die Dateigröße zurückgeben.
+
+        Bei gzip wird das laufende Member abgeschlossen und ein neues begonnen;
+        an der zurückgegebenen Position lässt sich die Datei also sauber abschneiden.
+        """
+        if self._gz is not None:
+            self._out.close()  # schließt nur das Member, nicht die Datei
+        elif self._pgz is not None:
+            self._pgz.flush()
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        pos = self._file.tell()
+        if self._gz is not None:
+            self._open_stream()
+        return pos
+
+    def close(self):
+        if self._gz is not None:
+            self._out.close()
+        elif self._pgz is not None:
+            self._pgz.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+# ------------------ Eingabe prüfen ------------------
+# Zeilenanfang, der in N-Triples (mit @prefix-Kopf wie in den .ttl der Skripte)
+# nicht vorkommt: Präfix-Namen, eingerückte ;/,-Fortsetzungen, @base, PREFIX
+# (am Zeilenumbruch davor verankert, das ist um ein Vielfaches schneller als ^ mit re.M)
+_NOT_NT = re.compile(r'\n(?![<#\r\n]|_:|@prefix |\Z)')
+
+
+def check_ntriples(data: str, source="") -> None:
+    """ValueError, wenn ``data`` kein zeilenweises N-Triples ist.
+
+    Die Leser fertiger Ausgaben (rdf_stats, rdf_integrity, rdf_hdt, rdf_dedup)
+    arbeiten mit Zeilen-Regexen; echtes Turtle (``TurtleWriter``) ergäbe dort
+    stillschweigend 0 Tripel. Entscheidend ist der Inhalt, nicht die Endung.
+    """
+    if _NOT_NT.match("\n" + data[:8]):
+        start = 0
+    else:
+        m = _NOT_NT.search(data)
+        start = None if m is None else m.start() + 1
+    if start is not None:
+        end = data.find("\n", start)
+        line = data[start:end if end >= 0 else len(data)]
+        raise ValueError(f"{source}: kein zeilenweises N-Triples, Zeile {line[:80]!r}. "
+                         "Echtes Turtle wird hier nicht gelesen, als N-Triples erzeugen "
+                         "(OUT_TURTLE = False) oder vorher umwandeln.")
+
+
+# ------------------ Turtle ------------------
+_RDF_TYPE = "<http://www.w3.org/1999/02/22-rdf-syntax-ns#type>"
+# lokaler Name ohne Escapes (Turtle PN_LOCAL, ASCII-Teilmenge)
+_LOCAL = re.compile(r"[A-Za-z0-9_](?:[A-Za-z0-9_.\-]*[A-Za-z0-9_\-])?")
+# Zahlen/Wahrheitswerte, deren Kurzform in Turtle dieselbe Lexikalform ergibt;
+# xsd:string bleibt ausgeschrieben, damit rdflib beim Einlesen dieselben Literale baut
+_SHORT = {
+    "<http://www.w3.org/2001/XMLSchema#integer>": r"[+-]?[0-9]+",
+    "<http://www.w3.org/2001/XMLSchema#decimal>": r"[+-]?[0-9]*\.[0-9]+",
+    "<http://www.w3.org/2001/XMLSchema#boolean>": r"true|false",
+}
+# eine N-Triples-Zeile: Subjekt, Prädikat und entweder Literal + Datentyp oder Objekt
+_LINE = re.compile(r'^(\S+) (\S+) (?:(".*")\^\^(<[^>]*>)|(.*)) \.$', re.M)
+
+
+class TurtleWriter(NTriplesWriter):
+    """Streaming-Turtle mit Präfixen, gruppiert nach Subjekt.
+
+    Nimmt dasselbe wie ``NTriplesWriter`` (``write`` mit N-Triples-Text, ``add``
+    mit rdflib-Termen). Gehalten wird nur das offene Subjekt und Prädikat: folgt
+    dasselbe Subjekt, geht die Aussage mit ``;`` bzw. ``,`` weiter, sonst wird sie
+    mit `` .`` geschlossen. Bei subjekt-sortierter Eingabe steht also jedes
+    Subjekt genau einmal in der Datei, bei konstantem Speicher.
+
+    ``group=True`` sortiert zusätzlich jeden ``write``-Block stabil nach Subjekt
+    und Prädikat (rdf_emit erzeugt spaltenweise, ein Titel stünde sonst in
+    jeder Spalte neu).
+    ``sync()``/``flush()`` schließen die offene Aussage, damit die Datei an der
+    Checkpoint-Position gültiges Turtle ist.
+    """
+
+    def __init__(self, path, compress=False, mode='wb', prefixes=None, group=True, **kwargs):
+        super().__init__(path, compress=compress, mode=mode, **kwargs)
+        self.prefixes = dict(TURTLE_PREFIXES if prefixes is None else prefixes)
+        self._ns = {f"<{iri}": name for name, iri in self.prefixes.items()}
+        self._cache = {}        # Prädikate und Datentypen (wenige, oft wiederholt)
+        self._short = {dt: re.compile(pat) for dt, pat in _SHORT.items()}
+        self.group = group
+        self._s = self._p = None
+        if 'a' not in mode:
+            self.write_raw("".join(f"@prefix {n}: <{iri}> .\n" for n, iri in self.prefixes.items()) + "\n")
+
+    # -------- Terme kürzen --------
+    def _iri(self, t: str) -> str:
+        cut = max(t.rfind("/"), t.rfind("#")) + 1
+        name = self._ns.get(t[:cut])
+        if name is not None and _LOCAL.fullmatch(t, cut, len(t) - 1):
+            return f"{name}:{t[cut:-1]}"
+        return t
+
+    def _cached(self, t: str) -> str:
+        c = self._cache.get(t)
+        if c is None:
+            c = self._cache[t] = "a" if t == _RDF_TYPE else self._iri(t)
+        return c
+
+    def _object(self, o: str) -> str:
+        if o[0] == "<":
+            return self._iri(o)
+        if o[0] != '"' or o[-1] != ">":
+            return o  # Blank Node, einfaches Literal, Sprach-Literal
+        i = o.rfind('"^^<')
+        dt = o[i + 3:]
+        short = self._short.get(dt)
+        if short is not None and short.fullmatch(o, 1, i):
+            return o[1:i]
+        return f"{o[:i + 1]}^^{self._cached(dt)}"
+
+    # -------- Schreiben --------
+    def _emit(self, rows):
+        """(s, p, o) in N-Triples-Schreibweise an die offene Aussage anhängen."""
+        out = []
+        cur_s, cur_p = self._s, self._p
+        for s, p, o in rows:
+            if s == cur_s:
+                if p == cur_p:
+                    out.append(f", {self._object(o)}")
+                else:
+                    out.append(f" ;\n    {self._cached(p)} {self._object(o)}")
+            else:
+                if cur_s is not None:
+                    out.append(" .\n")
+                out.append(f"{self._iri(s)} {self._cached(p)} {self._object(o)}")
+            cur_s, cur_p = s, p
+        self._s, self._p = cur_s, cur_p
+        self._out.write("".join(out).encode('utf-8'))
+        self.triples += len(rows)
+
+    def add(self, triple):
+        s, p, o = triple
+        self._emit([(term_nt(s), term_nt(p), term_nt(o))])
+
+    def write(self, data: str):
+        """N-Triples-Text (z. B. ein Chunk aus rdf_emit), spaltenweise: gekürzt wird
+        je distinktem Prädikat, Datentyp und Objekt, getrennt per Maske."""
+        if not data:
+            return
+        rows = _LINE.findall(data)
+        if not rows:
+            return
+        s, p, lex, dt, other = np.array(rows, dtype=object).T
+        s_codes, _ = pd.factorize(s)
+        p_codes, p_uniq = pd.factorize(p)
+        pred = np.array([self._cached(x) for x in p_uniq], dtype=object)[p_codes]
+        if self.group:
+            # stabil: Subjekte in der Reihenfolge ihres ersten Auftretens, rdf:type ("a") zuerst
+            order = np.lexsort((p_codes, pred != "a", s_codes))
+            s, p, lex, dt, other, pred = s[order], p[order], lex[order], dt[order], other[order], pred[order]
+            s_codes, p_codes = s_codes[order], p_codes[order]
+        obj = self._objects(lex, dt, other)
+        n = len(s)
+        new_s = np.empty(n, dtype=bool)
+        new_s[0] = s[0] != self._s
+        new_s[1:] = s_codes[1:] != s_codes[:-1]
+        new_p = new_s.copy()
+        new_p[0] |= p[0] != self._p
+        new_p[1:] |= p_codes[1:] != p_codes[:-1]
+        sep = np.full(n, ", ", dtype=object)
+        subj = np.array([self._iri(x) for x in s[new_s]], dtype=object)
+        sep[new_s] = " .\n" + subj + " " + pred[new_s] + " "
+        if self._s is None and new_s[0]:
+            sep[0] = sep[0][3:]  # keine offene Aussage zu schließen
+        j = new_p & ~new_s
+        sep[j] = " ;\n    " + pred[j] + " "
+        self._out.write("".join((sep + obj).tolist()).encode('utf-8'))
+        self._s, self._p = s[-1], p[-1]
+        self.triples += n
+
+    def _objects(self, lex, dt, other):
+        """Objekt-Spalte wie ``_object``, aber je distinktem Wert bzw. Datentyp."""
+        obj = other.copy()
+        codes, uniq = pd.factorize(other)
+        forms = np.array([self._iri(x) if x[:1] == "<" else x for x in uniq], dtype=object)
+        typed = other == ""
+        obj[~typed] = forms[codes[~typed]]
+        if typed.any():
+            codes, uniq = pd.factorize(dt[typed])
+            tl, td = lex[typed], dt[typed]
+            out = tl + "^^" + np.array([self._cached(x) for x in uniq], dtype=object)[codes]
+            for k, d in enumerate(uniq):
+                short = self._short.get(d)
+                if short is not None:
+                    m = codes == k
+                    bare = pd.Series(tl[m]).str[1:-1]
+                    ok = bare.str.fullmatch(short).to_numpy(dtype=bool)
+                    idx = np.flatnonzero(m)[ok]
+                    out[idx] = bare.to_numpy()[ok]
+            obj[typed] = out
+        return obj
+
+    def write_graph(self, graph):
+        self.write("".join(f"{term_nt(s)} {term_nt(p)} {term_nt(o)} .\n" for s, p, o in graph))
+
+    def write_raw(self, data: str):
+        self._end_statement()
+        super().write_raw(data)
+
+    # -------- Verwaltung --------
+    def _end_statement(self):
+        if self._s is not None:
+            self._out.write(b" .\n")
+            self._s = self._p = None
+
+    def flush(self):
+        self._end_statement()
+        super().flush()
+
+    def sync(self) -> int:
+        self._end_statement()
+        return super().sync()
+
+    def close(self):
+        self._end_statement()
+        super().close()